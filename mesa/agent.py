@@ -7,15 +7,27 @@ Core Objects: Agent and AgentSet.
 # Remove this __future__ import once the oldest supported Python is 3.10
 from __future__ import annotations
 
+import bisect
 import contextlib
 import copy
-import functools
+import heapq
 import itertools
+import math
 import operator
+import os
 import warnings
 import weakref
 from collections import defaultdict
-from collections.abc import Callable, Hashable, Iterable, Iterator, MutableSet, Sequence
+from collections.abc import (
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    MutableSet,
+    Sequence,
+    Sized,
+)
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from random import Random
 
 # mypy
@@ -23,9 +35,12 @@ from typing import TYPE_CHECKING, Any, Literal, overload
 
 import numpy as np
 
+from mesa.profiling import _active_profilers
+
 if TYPE_CHECKING:
     # We ensure that these are not imported during runtime to prevent cyclic
     # dependency.
+    from mesa.experimental.columnar import AgentColumnStore
     from mesa.model import Model
     from mesa.space import Position
 
@@ -43,11 +58,6 @@ class Agent:
 
     """
 
-    # this is a class level attribute
-    # it is a dictionary, indexed by model instance
-    # so, unique_id is unique relative to a model, and counting starts from 1
-    _ids = defaultdict(functools.partial(itertools.count, 1))
-
     def __init__(self, model: Model, *args, **kwargs) -> None:
         """Create a new agent.
 
@@ -63,7 +73,7 @@ class Agent:
         super().__init__(*args, **kwargs)
 
         self.model: Model = model
-        self.unique_id: int = next(self._ids[model])
+        self.unique_id: int = model._agent_ids.for_agent(self)
         self.pos: Position | None = None
         self.model.register_agent(self)
 
@@ -78,6 +88,21 @@ class Agent:
         with contextlib.suppress(KeyError):
             self.model.deregister_agent(self)
 
+    @classmethod
+    def _remove_many(cls, model: Model, agents: list[Agent]) -> None:
+        """Remove multiple agents of this class from the model in one operation.
+
+        This is the bulk counterpart of ``remove``, used by ``Model.remove_agents``. A class that
+        extends ``remove``, for example to remove the agent from a space, should extend this
+        classmethod in the same way. Otherwise, ``Model.remove_agents`` falls back to calling
+        ``remove`` on each agent of that class.
+
+        Args:
+            model: the model from which to remove the agents
+            agents: the agents to remove
+        """
+        model.deregister_agents(agents)
+
     def step(self) -> None:
         """A single step of the agent."""
 
@@ -99,40 +124,47 @@ class Agent:
         Returns:
             AgentSet containing the agents created.
 
-        """
-
-        class ListLike:
-            """Make default arguments act as if they are in a list of length N.
-
-            This is a helper class.
-            """
+        Notes:
+            The agents are registered with the model in one operation once all of them have been
+            created. So, within ``__init__``, the agents being created are not yet part of ``model.agents``.
 
-            def __init__(self, value):
-                self.value = value
+            The agents get their unique_id from a block of n consecutive ids reserved up front,
+            even if their ``__init__`` creates other agents after calling ``super().__init__``.
 
-            def __getitem__(self, i):
-                return self.value
+        """
 
-        listlike_args = []
-        for arg in args:
-            if isinstance(arg, (list | np.ndarray | tuple)) and len(arg) == n:
-                listlike_args.append(arg)
-            else:
-                listlike_args.append(ListLike(arg))
+        def as_column(value):
+            if isinstance(value, (list | np.ndarray | tuple)) and len(value) == n:
+                return value
+            return itertools.repeat(value, n)
 
-        listlike_kwargs = {}
-        for k, v in kwargs.items():
-            if isinstance(v, (list | np.ndarray | tuple)) and len(v) == n:
-                listlike_kwargs[k] = v
-            else:
-                listlike_kwargs[k] = ListLike(v)
+        instance_args = (
+            zip(*(as_column(arg) for arg in args)) if args else itertools.repeat((), n)
+        )
+        keys = list(kwargs)
+        instance_kwargs = (
+            (
+                dict(zip(keys, values))
+                for values in zip(*(as_column(v) for v in kwargs.values()))
+            )
+            if kwargs
+            else itertools.repeat({}, n)
+        )
 
+        # each agent is assigned its id before it is constructed, so agents that its
+        # __init__ creates in turn get ids from outside the block
+        agent_ids = model._agent_ids
+        previous = agent_ids._pending
         agents = []
-        for i in range(n):
-            instance_args = [arg[i] for arg in listlike_args]
-            instance_kwargs = {k: v[i] for k, v in listlike_kwargs.items()}
-            agent = cls(model, *instance_args, **instance_kwargs)
-            agents.append(agent)
+        with model._deferred_registration():
+            try:
+                for unique_id, agent_args, agent_kwargs in zip(
+                    agent_ids.reserve(n), instance_args, instance_kwargs
+                ):
+                    agent_ids._pending = (cls, unique_id)
+                    agents.append(cls(model, *agent_args, **agent_kwargs))
+            finally:
+                agent_ids._pending = previous
         return AgentSet(agents, random=model.random)
 
     @property
@@ -161,7 +193,10 @@ class AgentSet(MutableSet, Sequence):
         interactions with the model's environment and other agents.The implementation uses a WeakKeyDictionary to store agents,
         which means that agents not referenced elsewhere in the program may be automatically removed from the AgentSet.
 
-    Notes:
+        The AgentSets in ``model.agents_by_type`` of agent classes with ``ColumnarAttribute``
+        descriptors are backed by the model's column store. For these, ``get``, ``set`` and
+        ``agg`` on a columnar attribute operate directly on the NumPy column.
+
         If random is None then the random number generator in the model of the first agent is used.
         If the agents list is empty and random is also None a user warning is issued and the AgentSet
         is an empty list and a default random number generator.  This can make models non-reproducible.
@@ -169,6 +204,18 @@ class AgentSet(MutableSet, Sequence):
 
     """
 
+    # the column store whose rows line up with this AgentSet, set by the model
+    _column_store: AgentColumnStore | None = None
+
+    # positional index, only built once the AgentSet is accessed by position
+    # it holds a weakref per slot, with None for slots of removed agents, whose slots are
+    # kept sorted in _holes. While it exists, the values in self._agents are the slots of the agents.
+    _sequence: list[weakref.ref | None] | None = None
+    _holes: list[int] | tuple[()] = ()
+
+    # secondary indexes by attribute value, see index_by
+    _indexes: dict[str, _AttributeIndex] | None = None
+
     def __init__(
         self,
         agents: Iterable[Agent],
@@ -214,6 +261,7 @@ class AgentSet(MutableSet, Sequence):
         at_most: int | float = float("inf"),
         inplace: bool = False,
         agent_type: type[Agent] | None = None,
+        where: dict[str, Any] | None = None,
     ) -> AgentSet:
         """Select a subset of agents from the AgentSet based on a filter function and/or quantity limit.
 
@@ -225,6 +273,8 @@ class AgentSet(MutableSet, Sequence):
               - If a float between 0 and 1, at most that fraction of original the agents are selected.
             inplace (bool, optional): If True, modifies the current AgentSet; otherwise, returns a new AgentSet. Defaults to False.
             agent_type (type[Agent], optional): The class type of the agents to select. Defaults to None, meaning no type filtering is applied.
+            where (dict[str, Any], optional): A mapping from attribute names to values. Only agents for which all these
+                attributes are equal to the given value are selected. Defaults to None, meaning no filtering is applied.
 
         Returns:
             AgentSet: A new AgentSet containing the selected agents, unless inplace is True, in which case the current AgentSet is updated.
@@ -232,22 +282,29 @@ class AgentSet(MutableSet, Sequence):
         Notes:
             - at_most just return the first n or fraction of agents. To take a random sample, shuffle() beforehand.
             - at_most is an upper limit. When specifying other criteria, the number of agents returned can be smaller.
+            - If one of the attributes in ``where`` is indexed (see ``index_by``), only the agents with the given
+              value are visited. These agents are ordered by when they obtained their current value, rather than
+              by their order in the AgentSet.
         """
         inf = float("inf")
-        if filter_func is None and agent_type is None and at_most == inf:
+        if filter_func is None and agent_type is None and at_most == inf and not where:
             return self if inplace else copy.copy(self)
 
         # Check if at_most is of type float
         if at_most <= 1.0 and isinstance(at_most, float):
             at_most = int(len(self) * at_most)  # Note that it rounds down (floor)
 
+        candidates, where_func = self._where(where)
+
         def agent_generator(filter_func, agent_type, at_most):
             count = 0
-            for agent in self:
+            for agent in candidates:
                 if count >= at_most:
                     break
-                if (not filter_func or filter_func(agent)) and (
-                    not agent_type or isinstance(agent, agent_type)
+                if (
+                    (not filter_func or filter_func(agent))
+                    and (not agent_type or isinstance(agent, agent_type))
+                    and (not where_func or where_func(agent))
                 ):
                     yield agent
                     count += 1
@@ -256,6 +313,71 @@ class AgentSet(MutableSet, Sequence):
 
         return AgentSet(agents, self.random) if not inplace else self._update(agents)
 
+    def _where(
+        self, where: dict[str, Any] | None
+    ) -> tuple[Iterable[Agent], Callable[[Agent], bool] | None]:
+        """Return the candidate agents for where and a filter function for its unindexed part."""
+        if not where:
+            return self, None
+
+        candidates = self
+        where = dict(where)
+        indexed = [name for name in where if self._indexes and name in self._indexes]
+        if indexed:
+            # we only visit the agents in the smallest matching bucket
+            buckets = [self._indexes[name].get(where[name]) for name in indexed]
+            name, candidates = min(zip(indexed, buckets), key=lambda item: len(item[1]))
+            del where[name]
+        return candidates, _where_filter(where) if where else None
+
+    def query(self) -> AgentSetQuery:
+        """Return a lazy query on the AgentSet.
+
+        Calls to ``select``, ``sort``, and ``shuffle`` on the query are only recorded. They are
+        executed in a single pass, without building intermediate AgentSets, once the query is
+        iterated over or ``do``, ``map``, ``get`` or ``agg`` is called.
+
+        Examples:
+            model.agents.query().select(agent_type=Sheep).shuffle().do("step")
+
+        Returns:
+            AgentSetQuery: A query on this AgentSet without any operations.
+        """
+        return AgentSetQuery(self)
+
+    def sample(
+        self,
+        k: int = 1,
+        replace: bool = False,
+        weights: Sequence[float] | str | None = None,
+    ) -> list[Agent]:
+        """Draw a random sample of agents from the AgentSet.
+
+        Args:
+            k (int, optional): The number of agents to draw. Defaults to 1.
+            replace (bool, optional): If True, agents can be drawn more than once. Defaults to False.
+            weights (Sequence[float] | str, optional): The relative weight of each agent, in the order of
+                the AgentSet, or the name of an attribute holding the weights. Defaults to None, meaning
+                all agents are equally likely to be drawn.
+
+        Returns:
+            list[Agent]: The sampled agents, in the order in which they were drawn.
+
+        Raises:
+            ValueError: If k is larger than the number of agents that can be drawn without replacement,
+                or if the number of weights does not match the number of agents.
+
+        Notes:
+            Unlike ``shuffle().select(at_most=k)``, this does not touch all agents. Unweighted sampling
+            costs O(k) once the positional index exists (see ``__getitem__``). Weighted sampling costs
+            O(N + k log N) with replacement and O(N log k) without.
+        """
+        self._get_sequence()  # make sure the positions are up to date
+        if isinstance(weights, str):
+            weights = self.get(weights)
+        positions = _sample_positions(self.random, len(self), k, replace, weights)
+        return [self[position] for position in positions]
+
     def shuffle(self, inplace: bool = False) -> AgentSet:
         """Randomly shuffle the order of agents in the AgentSet.
 
@@ -274,6 +396,8 @@ class AgentSet(MutableSet, Sequence):
 
         if inplace:
             self._agents.data = dict.fromkeys(weakrefs)
+            self._column_store = None
+            self._sequence = None
             return self
         else:
             return AgentSet(
@@ -313,8 +437,17 @@ class AgentSet(MutableSet, Sequence):
         This is a private method primarily used internally by other methods like select, shuffle, and sort.
         """
         self._agents = weakref.WeakKeyDictionary(dict.fromkeys(agents))
+        self._column_store = None  # order no longer lines up with the column store
+        self._sequence = None
+        if self._indexes:
+            for index in self._indexes.values():
+                index.reset()
         return self
 
+    def _live_agents(self) -> Iterator[Agent]:
+        """Iterate over the agents, skipping agents that are garbage collected in the meantime."""
+        return (agent for ref in self._agents.keyrefs() if (agent := ref()) is not None)
+
     def do(self, method: str | Callable, *args, **kwargs) -> AgentSet:
         """Invoke a method or function on each agent in the AgentSet.
 
@@ -330,6 +463,10 @@ class AgentSet(MutableSet, Sequence):
         Returns:
             AgentSet | list[Any]: The results of the callable calls if return_results is True, otherwise the AgentSet itself.
         """
+        if _active_profilers and _active_profilers[-1] is not None:
+            _active_profilers[-1]._activate(self._live_agents(), method, args, kwargs)
+            return self
+
         # we iterate over the actual weakref keys and check if weakref is alive before calling the method
         if isinstance(method, str):
             for agentref in self._agents.keyrefs():
@@ -350,6 +487,11 @@ class AgentSet(MutableSet, Sequence):
         weakrefs = list(self._agents.keyrefs())
         self.random.shuffle(weakrefs)
 
+        if _active_profilers and _active_profilers[-1] is not None:
+            agents = (agent for ref in weakrefs if (agent := ref()) is not None)
+            _active_profilers[-1]._activate(agents, method, args, kwargs)
+            return self
+
         if isinstance(method, str):
             for ref in weakrefs:
                 if (agent := ref()) is not None:
@@ -376,6 +518,11 @@ class AgentSet(MutableSet, Sequence):
         Returns:
            list[Any]: The results of the callable calls
         """
+        if _active_profilers and _active_profilers[-1] is not None:
+            return _active_profilers[-1]._activate(
+                self._live_agents(), method, args, kwargs
+            )
+
         # we iterate over the actual weakref keys and check if weakref is alive before calling the method
         if isinstance(method, str):
             res = [
@@ -392,6 +539,101 @@ class AgentSet(MutableSet, Sequence):
 
         return res
 
+    def map_parallel(
+        self,
+        method: str | Callable,
+        *args,
+        executor: Executor | Literal["thread", "process"] = "thread",
+        n_partitions: int | None = None,
+        rng: bool = False,
+        **kwargs,
+    ) -> list[Any]:
+        """Invoke a method or function on each agent in parallel and return the results.
+
+        The agents are split into ``n_partitions`` contiguous partitions, each of which is
+        handled by a single task on the executor. The results are in the order of the AgentSet.
+
+        Args:
+            method (str, callable): the callable to apply on each agent
+
+                                        * in case of str, the name of the method to call on each agent.
+                                        * in case of callable, the function to be called with each agent as first argument
+
+            *args: Variable length argument list passed to the callable being called.
+            executor: A ``concurrent.futures.Executor``, or "thread" or "process" to use a thread or process
+                pool that only lives for the duration of this call.
+            n_partitions: The number of partitions, defaults to the number of CPUs.
+            rng: If True, the callable receives an ``rng`` keyword argument with a numpy Generator. Each
+                chunk of 64 consecutive agents has its own Generator, seeded from the random number
+                generator of the AgentSet, and partitions consist of whole chunks.
+            **kwargs: Arbitrary keyword arguments passed to the callable being called.
+
+        Returns:
+           list[Any]: The results of the callable calls
+
+        Notes:
+            Runs are reproducible if the callable draws its random numbers from ``rng``, regardless of
+            n_partitions, the number of CPUs, the executor, or the order in which partitions complete.
+            The model's own random number generators are not safe to use from multiple threads.
+
+            With a process pool, the agents of each partition are pickled together with everything they
+            reference, including the model, and changes made to them in the worker process are lost.
+            The callable must be picklable as well.
+
+        """
+        chunk_size = _RNG_CHUNK_SIZE if rng else 1
+        partitions = _partition(list(self), n_partitions, chunk_size)
+        results = _run_partitions(
+            partitions,
+            method,
+            args,
+            kwargs,
+            executor,
+            self.random if rng else None,
+            chunk_size,
+        )
+        return list(itertools.chain.from_iterable(results))
+
+    def do_parallel(
+        self,
+        method: str | Callable,
+        *args,
+        executor: Executor | Literal["thread"] = "thread",
+        n_partitions: int | None = None,
+        rng: bool = False,
+        **kwargs,
+    ) -> AgentSet:
+        """Invoke a method or function on each agent in parallel.
+
+        The callable has to be safe to run concurrently for different agents. See ``map_parallel``
+        for the arguments and for how partitions and random number generators are handled.
+
+        Returns:
+            AgentSet: The AgentSet itself.
+
+        Raises:
+            ValueError: If executor is a process pool, because the changes made to agents in other
+                processes would be lost.
+
+        """
+        if executor == "process" or isinstance(executor, ProcessPoolExecutor):
+            raise ValueError(
+                "do_parallel cannot use a process pool, changes to agents in worker processes are lost; "
+                "use map_parallel instead"
+            )
+        chunk_size = _RNG_CHUNK_SIZE if rng else 1
+        partitions = _partition(list(self), n_partitions, chunk_size)
+        _run_partitions(
+            partitions,
+            method,
+            args,
+            kwargs,
+            executor,
+            self.random if rng else None,
+            chunk_size,
+        )
+        return self
+
     def agg(
         self, attribute: str, func: Callable | Iterable[Callable]
     ) -> Any | list[Any]:
@@ -412,8 +654,18 @@ class AgentSet(MutableSet, Sequence):
 
             # Multiple functions
             min_wealth, max_wealth, total_wealth = model.agents.agg("wealth", [min, max, sum])
+
+        Notes:
+            For columnar attributes, the builtins min, max, and sum are replaced by their
+            NumPy counterparts.
         """
-        values = self.get(attribute)
+        values = self.get(attribute, view=True)
+
+        if isinstance(values, np.ndarray):
+            if isinstance(func, Callable):
+                return _NUMPY_AGGREGATES.get(func, func)(values)
+            else:
+                return [_NUMPY_AGGREGATES.get(f, f)(values) for f in func]
 
         if isinstance(func, Callable):
             return func(values)
@@ -426,7 +678,8 @@ class AgentSet(MutableSet, Sequence):
         attr_names: str,
         handle_missing: Literal["error", "default"] = "error",
         default_value: Any = None,
-    ) -> list[Any]: ...
+        view: bool = False,
+    ) -> list[Any] | np.ndarray: ...
 
     @overload
     def get(
@@ -434,6 +687,7 @@ class AgentSet(MutableSet, Sequence):
         attr_names: list[str],
         handle_missing: Literal["error", "default"] = "error",
         default_value: Any = None,
+        view: bool = False,
     ) -> list[list[Any]]: ...
 
     def get(
@@ -441,6 +695,7 @@ class AgentSet(MutableSet, Sequence):
         attr_names,
         handle_missing="error",
         default_value=None,
+        view=False,
     ):
         """Retrieve the specified attribute(s) from each agent in the AgentSet.
 
@@ -451,10 +706,15 @@ class AgentSet(MutableSet, Sequence):
                                             - 'default': returns the specified default_value.
             default_value (Any, optional): The default value to return if 'handle_missing' is set to 'default'
                                            and the agent does not have the attribute.
+            view (bool, optional): If True, and attr_names is a columnar attribute of a column backed
+                                   AgentSet, return a NumPy view on the column instead of a list.
 
         Returns:
             list[Any]: A list with the attribute value for each agent if attr_names is a str.
             list[list[Any]]: A list with a lists of attribute values for each agent if attr_names is a list of str.
+            np.ndarray: A view on the column if view is True, attr_names is a columnar attribute, and this
+                        AgentSet is backed by a column store. Writing to it changes the attribute of the agents,
+                        and it no longer lines up with the AgentSet once agents are added or removed.
 
         Raises:
             AttributeError: If 'handle_missing' is 'error' and the agent does not have the specified attribute(s).
@@ -462,6 +722,14 @@ class AgentSet(MutableSet, Sequence):
         """
         is_single_attr = isinstance(attr_names, str)
 
+        if (
+            is_single_attr
+            and self._column_store is not None
+            and attr_names in self._column_store
+        ):
+            column = self._column_store.column(attr_names)
+            return column if view else column.tolist()
+
         if handle_missing == "error":
             if is_single_attr:
                 return [getattr(agent, attr_names) for agent in self._agents]
@@ -497,7 +765,14 @@ class AgentSet(MutableSet, Sequence):
 
         Returns:
             AgentSet: The AgentSet instance itself, after setting the attribute.
+
+        Notes:
+            For columnar attributes value can also be an array with one value per agent.
         """
+        if self._column_store is not None and attr_name in self._column_store:
+            self._column_store.column(attr_name)[:] = value
+            return self
+
         for agent in self:
             setattr(agent, attr_name, value)
         return self
@@ -510,8 +785,82 @@ class AgentSet(MutableSet, Sequence):
 
         Returns:
             Agent | list[Agent]: The selected agent or list of agents based on the index or slice provided.
+
+        Notes:
+            The first positional access builds a positional index, which is maintained while
+            agents are added. Removing agents leaves holes in this index, which positional access
+            skips in O(log H) for H holes. The index is dropped, and rebuilt on the next positional
+            access, once half of it are holes.
+        """
+        sequence = self._get_sequence()
+        if isinstance(item, slice):
+            if self._holes:
+                return [sequence[self._slot(i)]() for i in range(len(self))[item]]
+            return [ref() for ref in sequence[item]]
+        return sequence[self._slot(item) if self._holes else item]()
+
+    def index(self, agent: Agent, start: int = 0, stop: int | None = None) -> int:
+        """Return the position of the agent in the AgentSet.
+
+        Args:
+            agent (Agent): The agent to look up.
+            start (int): Only consider positions from start onwards
+            stop (int, optional): Only consider positions before stop
+
+        Raises:
+            ValueError: If the agent is not in the AgentSet (between start and stop).
         """
-        return list(self._agents.keys())[item]
+        self._get_sequence()
+        try:
+            slot = self._agents[agent]
+        except KeyError:
+            raise ValueError(f"{agent} is not in AgentSet") from None
+
+        position = slot - bisect.bisect_left(self._holes, slot)
+        n = len(self._sequence) - len(self._holes)
+        start = max(start + n, 0) if start < 0 else start
+        stop = n if stop is None else (max(stop + n, 0) if stop < 0 else stop)
+        if not start <= position < stop:
+            raise ValueError(f"{agent} is not in AgentSet")
+        return position
+
+    def count(self, agent: Agent) -> int:
+        """Return the number of occurrences of the agent in the AgentSet, which is either 0 or 1."""
+        return int(agent in self._agents)
+
+    def __reversed__(self) -> Iterator[Agent]:
+        """Provide an iterator over the agents in the AgentSet in reversed order."""
+        for ref in reversed(list(self._agents.keyrefs())):
+            if (agent := ref()) is not None:
+                yield agent
+
+    def _get_sequence(self) -> list[weakref.ref | None]:
+        """Return the positional index, building it if needed."""
+        sequence = self._sequence
+        if (
+            sequence is None
+            # agents that have been garbage collected leave unaccounted holes
+            or len(sequence) - len(self._holes) != len(self._agents)
+        ):
+            sequence = list(self._agents.keyrefs())
+            self._agents.data.update(zip(sequence, range(len(sequence))))
+            self._sequence = sequence
+            self._holes = []
+        return sequence
+
+    def _slot(self, position: int) -> int:
+        """Return the slot in the positional index of the agent at position, skipping the holes."""
+        holes = self._holes
+        n = len(self._sequence) - len(holes)
+        position = operator.index(position)
+        if position < 0:
+            position += n
+        if not 0 <= position < n:
+            raise IndexError("AgentSet index out of range")
+        # holes[k] - k is the number of agents before hole k, so this counts the holes before the agent
+        return position + bisect.bisect_right(
+            range(len(holes)), position, key=lambda k: holes[k] - k
+        )
 
     def add(self, agent: Agent):
         """Add an agent to the AgentSet.
@@ -522,7 +871,53 @@ class AgentSet(MutableSet, Sequence):
         Note:
             This method is an implementation of the abstract method from MutableSet.
         """
-        self._agents[agent] = None
+        if self._indexes and agent not in self._agents:
+            for index in self._indexes.values():
+                index.add(agent)
+
+        if self._sequence is None:
+            self._agents[agent] = None
+        elif agent not in self._agents:
+            self._agents[agent] = len(self._sequence)
+            self._sequence.append(weakref.ref(agent))
+
+    def remove_many(self, agents: Iterable[Agent] | np.ndarray) -> AgentSet:
+        """Remove multiple agents from the AgentSet in one operation.
+
+        Agents that are not in the AgentSet are ignored.
+
+        Args:
+            agents (Iterable[Agent] | np.ndarray): The agents to remove, or a boolean mask
+                with one entry per agent in the AgentSet.
+
+        Returns:
+            AgentSet: The AgentSet instance itself, after removing the agents.
+        """
+        agents = self._from_mask(agents)
+        if self._sequence is not None and len(agents) > len(self._sequence) // 2:
+            self._sequence = None  # cheaper to rebuild than to punch many holes
+
+        for agent in agents:
+            self.discard(agent)
+        return self
+
+    def _from_mask(self, agents: Iterable[Agent] | np.ndarray) -> list[Agent]:
+        """Return the agents selected by a boolean mask, or the agents themselves."""
+        if isinstance(agents, np.ndarray) and agents.dtype == bool:
+            if agents.shape != (len(self),):
+                raise ValueError(
+                    f"Boolean mask of shape {agents.shape} does not match AgentSet of length {len(self)}"
+                )
+            return list(itertools.compress(self, agents))
+        return list(agents)
+
+    def _add_many(self, agents: Iterable[Agent]):
+        """Add multiple agents to the AgentSet in one operation."""
+        if self._sequence is None and not self._indexes:
+            self._agents.update(dict.fromkeys(agents))
+        else:
+            for agent in agents:
+                self.add(agent)
 
     def discard(self, agent: Agent):
         """Remove an agent from the AgentSet if it exists.
@@ -536,7 +931,7 @@ class AgentSet(MutableSet, Sequence):
             This method is an implementation of the abstract method from MutableSet.
         """
         with contextlib.suppress(KeyError):
-            del self._agents[agent]
+            self.remove(agent)
 
     def remove(self, agent: Agent):
         """Remove an agent from the AgentSet.
@@ -549,7 +944,17 @@ class AgentSet(MutableSet, Sequence):
         Note:
             This method is an implementation of the abstract method from MutableSet.
         """
-        del self._agents[agent]
+        position = self._agents.pop(agent)
+        if self._indexes:
+            for index in self._indexes.values():
+                index.discard(agent)
+        if self._sequence is not None:
+            self._sequence[position] = None
+            if len(self._holes) >= len(self._sequence) // 2:
+                # drop the index, it is rebuilt on the next positional access
+                self._sequence = None
+            else:
+                bisect.insort(self._holes, position)
 
     def __getstate__(self):
         """Retrieve the state of the AgentSet for serialization.
@@ -557,7 +962,12 @@ class AgentSet(MutableSet, Sequence):
         Returns:
             dict: A dictionary representing the state of the AgentSet.
         """
-        return {"agents": list(self._agents.keys()), "random": self.random}
+        return {
+            "agents": list(self._agents.keys()),
+            "random": self.random,
+            "column_store": self._column_store,
+            "indexes": list(self._indexes or ()),
+        }
 
     def __setstate__(self, state):
         """Set the state of the AgentSet during deserialization.
@@ -567,6 +977,13 @@ class AgentSet(MutableSet, Sequence):
         """
         self.random = state["random"]
         self._update(state["agents"])
+        self._column_store = state.get("column_store")
+        if indexes := state.get("indexes"):
+            # the agents might not be fully unpickled yet, so the indexes are built on first use
+            self._indexes = {
+                attribute: _AttributeIndex(self, attribute, build=False)
+                for attribute in indexes
+            }
 
     def groupby(self, by: Callable | str, result_type: str = "agentset") -> GroupBy:
         """Group agents by the specified attribute or return from the callable.
@@ -588,10 +1005,19 @@ class AgentSet(MutableSet, Sequence):
         There might be performance benefits to using `result_type='list'` if you don't need the advanced functionality
         of an AgentSet.
 
+        If ``by`` is an indexed attribute (see ``index_by``), the groups are taken from the index. Agents
+        without the attribute are left out in that case.
+
         """
         groups = defaultdict(list)
 
-        if isinstance(by, Callable):
+        if isinstance(by, str) and self._indexes and by in self._indexes:
+            groups = {
+                value: list(bucket)
+                for value, bucket in self._indexes[by].buckets.items()
+                if bucket
+            }
+        elif isinstance(by, Callable):
             for agent in self:
                 groups[by(agent)].append(agent)
         else:
@@ -605,9 +1031,819 @@ class AgentSet(MutableSet, Sequence):
         else:
             return GroupBy(groups)
 
+    def index_by(self, attribute: str) -> AgentSet:
+        """Maintain a secondary index of the agents by the value of an attribute.
+
+        Once indexed, ``select(where={attribute: value})`` and ``groupby(attribute)`` only visit the
+        agents with the requested values instead of scanning the entire AgentSet.
+
+        Args:
+            attribute (str): The name of the attribute to index. While indexed, every value assigned to it
+                on an agent in this AgentSet must be hashable, otherwise the assignment raises a TypeError.
+
+        Returns:
+            AgentSet: The AgentSet instance itself, so calls can be chained.
+
+        Raises:
+            TypeError: If the attribute is a property, slot, or other data descriptor on one of the agent
+                classes, because changes to it cannot be tracked.
+
+        Notes:
+            The index is kept current as agents change the attribute. For a mesa_signals ``Observable``, the
+            index subscribes to its change signal. For a plain instance attribute, a data descriptor that
+            notifies the index is installed on the agent class, which makes reading and writing the attribute
+            somewhat slower for all instances of that class. The descriptor is removed again once no index on
+            the attribute is left, because all of them were dropped or their AgentSets were garbage collected.
+
+        """
+        if self._indexes is None:
+            self._indexes = {}
+        if attribute not in self._indexes:
+            self._indexes[attribute] = _AttributeIndex(self, attribute)
+        return self
+
+    def drop_index(self, attribute: str) -> AgentSet:
+        """Stop maintaining the secondary index on the attribute.
+
+        Args:
+            attribute (str): The name of the indexed attribute
+
+        Returns:
+            AgentSet: The AgentSet instance itself, so calls can be chained.
+        """
+        if self._indexes and attribute in self._indexes:
+            self._indexes.pop(attribute).detach()
+        return self
+
     # consider adding for performance reasons
-    # for Sequence: __reversed__, index, and count
-    # for MutableSet clear, pop, remove, __ior__, __iand__, __ixor__, and __isub__
+    # for MutableSet clear, pop, __ior__, __iand__, __ixor__, and __isub__
+
+
+class _HardKeyAgentSet(AgentSet):
+    """An AgentSet that holds strong references to its agents.
+
+    The model holds its agents strongly anyway, so for ``model.agents`` and ``model.agents_by_type``
+    the weakref bookkeeping of AgentSet is pure overhead. This variant uses a plain dict instead of
+    a WeakKeyDictionary. Agents are only removed through explicit deregistration.
+
+    Notes:
+        Derived AgentSets, like those returned by ``select``, ``shuffle``, ``sort``, and ``copy.copy``,
+        are regular AgentSets with weak references.
+
+    """
+
+    def __init__(self, agents: Iterable[Agent], random: Random):
+        """Initializes the AgentSet.
+
+        Args:
+            agents (Iterable[Agent]): An iterable of Agent objects to be included in the set.
+            random (Random): the random number generator
+        """
+        self._agents = dict.fromkeys(agents)
+        self.random = random
+
+    def _update(self, agents: Iterable[Agent]):
+        self._agents = dict.fromkeys(agents)
+        self._column_store = None  # order no longer lines up with the column store
+        self._sequence = None
+        if self._indexes:
+            for index in self._indexes.values():
+                index.reset()
+        return self
+
+    def __iter__(self) -> Iterator[Agent]:
+        return iter(self._agents)
+
+    def __copy__(self) -> AgentSet:
+        return AgentSet(self._agents, random=self.random)
+
+    def shuffle(self, inplace: bool = False) -> AgentSet:
+        agents = list(self._agents)
+        self.random.shuffle(agents)
+
+        if inplace:
+            return self._update(agents)
+        else:
+            return AgentSet(agents, self.random)
+
+    def _live_agents(self) -> Iterator[Agent]:
+        # we iterate over a copy and skip agents that have been removed in the meantime
+        agents = self._agents
+        return (agent for agent in list(agents) if agent in agents)
+
+    def do(self, method: str | Callable, *args, **kwargs) -> AgentSet:
+        if _active_profilers and _active_profilers[-1] is not None:
+            _active_profilers[-1]._activate(self._live_agents(), method, args, kwargs)
+            return self
+
+        # we iterate over a copy and skip agents that have been removed in the meantime
+        agents = self._agents
+        if isinstance(method, str):
+            for agent in list(agents):
+                if agent in agents:
+                    getattr(agent, method)(*args, **kwargs)
+        else:
+            for agent in list(agents):
+                if agent in agents:
+                    method(agent, *args, **kwargs)
+
+        return self
+
+    def shuffle_do(self, method: str | Callable, *args, **kwargs) -> AgentSet:
+        agents = self._agents
+        shuffled = list(agents)
+        self.random.shuffle(shuffled)
+
+        if _active_profilers and _active_profilers[-1] is not None:
+            live_agents = (agent for agent in shuffled if agent in agents)
+            _active_profilers[-1]._activate(live_agents, method, args, kwargs)
+            return self
+
+        if isinstance(method, str):
+            for agent in shuffled:
+                if agent in agents:
+                    getattr(agent, method)(*args, **kwargs)
+        else:
+            for agent in shuffled:
+                if agent in agents:
+                    method(agent, *args, **kwargs)
+
+        return self
+
+    def map(self, method: str | Callable, *args, **kwargs) -> list[Any]:
+        if _active_profilers and _active_profilers[-1] is not None:
+            return _active_profilers[-1]._activate(
+                self._live_agents(), method, args, kwargs
+            )
+
+        agents = self._agents
+        if isinstance(method, str):
+            return [
+                getattr(agent, method)(*args, **kwargs)
+                for agent in list(agents)
+                if agent in agents
+            ]
+        else:
+            return [
+                method(agent, *args, **kwargs)
+                for agent in list(agents)
+                if agent in agents
+            ]
+
+    def __getitem__(self, item: int | slice) -> Agent:
+        sequence = self._get_sequence()
+        if isinstance(item, slice):
+            if self._holes:
+                return [sequence[self._slot(i)] for i in range(len(self))[item]]
+            return sequence[item]
+        return sequence[self._slot(item) if self._holes else item]
+
+    def __reversed__(self) -> Iterator[Agent]:
+        return reversed(list(self._agents))
+
+    def _get_sequence(self) -> list[Agent | None]:
+        sequence = self._sequence
+        if sequence is None:
+            sequence = list(self._agents)
+            self._agents.update(zip(sequence, range(len(sequence))))
+            self._sequence = sequence
+            self._holes = []
+        return sequence
+
+    def add(self, agent: Agent):
+        if self._indexes and agent not in self._agents:
+            for index in self._indexes.values():
+                index.add(agent)
+
+        if self._sequence is None:
+            self._agents[agent] = None
+        elif agent not in self._agents:
+            self._agents[agent] = len(self._sequence)
+            self._sequence.append(agent)
+
+
+_MISSING = object()
+
+
+class _IndexedAttribute:
+    """Data descriptor that keeps the secondary indexes on an attribute current.
+
+    AgentSet.index_by installs it on agent classes for plain instance attributes. The value is still
+    stored in the instance dict, so existing instances are unaffected. Once the last index using it
+    is dropped or garbage collected, the descriptor removes itself from the class again.
+    """
+
+    def __init__(self, owner: type, name: str, default: Any = _MISSING):
+        self.owner = owner
+        self.name = name
+        self.default = (
+            default  # the attribute in the class dict that was replaced, if any
+        )
+        # a list of weakrefs is much faster to iterate over than a WeakSet
+        self.indexes: list[weakref.ref[_AttributeIndex]] = []
+
+    def install(self):
+        setattr(self.owner, self.name, self)
+
+    def add_index(self, index: _AttributeIndex):
+        self.indexes = [ref for ref in self.indexes if ref() not in (None, index)]
+        self.indexes.append(weakref.ref(index, self._on_index_collected))
+
+    def discard_index(self, index: _AttributeIndex | None = None):
+        self.indexes = [ref for ref in self.indexes if ref() not in (None, index)]
+        if not self.indexes and vars(self.owner).get(self.name) is self:
+            # restore the class as it was before the descriptor was installed
+            if self.default is _MISSING:
+                delattr(self.owner, self.name)
+            else:
+                setattr(self.owner, self.name, self.default)
+
+    def _on_index_collected(self, ref):
+        self.discard_index()
+
+    def _class_value(self) -> Any:
+        """Return the class attribute hidden by the descriptor, looking it up on the base classes if needed."""
+        if self.default is not _MISSING:
+            return self.default
+        for base in self.owner.__mro__[1:]:
+            if self.name in vars(base):
+                return vars(base)[self.name]
+        return _MISSING
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            value = self._class_value()
+            return self if value is _MISSING else value
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            value = self._class_value()
+            if value is _MISSING:
+                raise AttributeError(
+                    f"{type(instance).__name__!r} object has no attribute {self.name!r}"
+                ) from None
+            return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+        for ref in self.indexes:
+            if (index := ref()) is not None:
+                index.update(instance, value)
+
+    def __delete__(self, instance):
+        try:
+            del instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+        for ref in self.indexes:
+            if (index := ref()) is not None:
+                index.discard_value(instance)
+
+
+class _AttributeIndex:
+    """Secondary index of the agents in an AgentSet by the value of one of their attributes.
+
+    Agents without the attribute are not in any bucket. Buckets hold weak references for
+    weak AgentSets, and strong references for the AgentSets of the model.
+    """
+
+    def __init__(self, agentset: AgentSet, attribute: str, build: bool = True):
+        self.agentset = agentset
+        self.attribute = attribute
+        self._mapping_type = (
+            dict if type(agentset._agents) is dict else weakref.WeakKeyDictionary
+        )
+        self._hooked_types: dict[type, bool] = {}  # agent class -> uses signals
+
+        # these are None until the index is built
+        self._buckets: dict[Hashable, dict[Agent, None]] | None = None
+        self._values: dict[Agent, Hashable] | None = None  # agent -> current bucket
+        self._observed: dict[Agent, None] | None = None  # agents subscribed to
+
+        if build:
+            self._build()
+
+    @property
+    def buckets(self) -> dict[Hashable, dict[Agent, None]]:
+        """Mapping from attribute value to the agents with that value."""
+        if self._buckets is None:
+            self._build()
+        return self._buckets
+
+    def get(self, value: Hashable) -> list[Agent]:
+        """Return the agents for which the attribute equals value."""
+        return list(self.buckets.get(value, ()))
+
+    def _build(self):
+        self._buckets = {}
+        self._values = self._mapping_type()
+        self._observed = self._mapping_type()
+        for agent in self.agentset:
+            self.add(agent)
+
+    def add(self, agent: Agent):
+        if self._values is None:
+            return
+
+        agent_type = type(agent)
+        try:
+            uses_signals = self._hooked_types[agent_type]
+        except KeyError:
+            uses_signals = self._hook(agent_type)
+        if uses_signals:
+            agent.observe(self.attribute, "change", self._on_change)
+            self._observed[agent] = None
+
+        try:
+            value = getattr(agent, self.attribute)
+        except AttributeError:
+            return
+        self._insert(agent, value)
+
+    def discard(self, agent: Agent):
+        if self._values is None:
+            return
+        if agent in self._observed:
+            del self._observed[agent]
+            agent.unobserve(self.attribute, "change", self._on_change)
+        self.discard_value(agent)
+
+    def update(self, agent: Agent, value: Hashable):
+        """Move the agent to the bucket of its new value."""
+        if self._values is None or agent not in self.agentset:
+            return
+        old_value = self._values.get(agent, _MISSING)
+        if old_value is not _MISSING and old_value == value:
+            return
+        self.discard_value(agent)
+        self._insert(agent, value)
+
+    def discard_value(self, agent: Agent):
+        """Remove the agent from its bucket."""
+        if self._values is None:
+            return
+        try:
+            value = self._values.pop(agent)
+        except KeyError:
+            return
+        bucket = self._buckets[value]
+        del bucket[agent]
+        if not bucket:
+            del self._buckets[value]
+
+    def reset(self):
+        """Rebuild the index after the agents in the AgentSet have been replaced."""
+        if self._values is not None:
+            self.detach()
+            self._build()
+
+    def detach(self):
+        """Stop receiving updates."""
+        if self._observed:
+            for agent in list(self._observed):
+                agent.unobserve(self.attribute, "change", self._on_change)
+        for agent_type in self._hooked_types:
+            attribute = _lookup_class_attribute(agent_type, self.attribute)
+            if isinstance(attribute, _IndexedAttribute):
+                attribute.discard_index(self)
+        self._hooked_types = {}
+        self._buckets = self._values = self._observed = None
+
+    def _insert(self, agent: Agent, value: Hashable):
+        try:
+            bucket = self._buckets[value]
+        except KeyError:
+            bucket = self._buckets[value] = self._mapping_type()
+        bucket[agent] = None
+        self._values[agent] = value
+
+    def _on_change(self, signal):
+        self.update(signal.owner, signal.new)
+
+    def _hook(self, agent_type: type[Agent]) -> bool:
+        """Make sure changes to the attribute on instances of agent_type reach this index."""
+        from mesa.experimental.mesa_signals import Observable  # noqa: PLC0415
+
+        attribute = _lookup_class_attribute(agent_type, self.attribute)
+        uses_signals = False
+        if isinstance(attribute, _IndexedAttribute):
+            attribute.add_index(self)
+        elif isinstance(attribute, Observable):
+            uses_signals = True
+        elif hasattr(type(attribute), "__set__") or hasattr(
+            type(attribute), "__delete__"
+        ):
+            raise TypeError(
+                f"{agent_type.__name__}.{self.attribute} is a {type(attribute).__name__}, "
+                "changes to it cannot be tracked by an index"
+            )
+        else:
+            # only an attribute defined on agent_type itself is replaced, inherited ones stay on the base class
+            default = vars(agent_type).get(self.attribute, _MISSING)
+            descriptor = _IndexedAttribute(agent_type, self.attribute, default)
+            descriptor.install()
+            descriptor.add_index(self)
+
+        self._hooked_types[agent_type] = uses_signals
+        return uses_signals
+
+
+def _where_filter(where: dict[str, Any]) -> Callable[[Agent], bool]:
+    """Return a filter function checking the attribute values in where."""
+    if len(where) == 1:
+        ((name, value),) = where.items()
+        return lambda agent: getattr(agent, name, _MISSING) == value
+
+    items = tuple(where.items())
+    return lambda agent: all(
+        getattr(agent, name, _MISSING) == value for name, value in items
+    )
+
+
+def _lookup_class_attribute(klass: type, name: str) -> Any:
+    """Return the attribute name as defined on the class or its base classes, without invoking descriptors."""
+    for base in klass.__mro__:
+        if name in vars(base):
+            return vars(base)[name]
+    return _MISSING
+
+
+_NUMPY_AGGREGATES = {sum: np.sum, min: np.min, max: np.max}
+
+
+class AgentSetQuery:
+    """A lazy, chainable query on an AgentSet.
+
+    ``select``, ``sort``, and ``shuffle`` return a new query with the operation appended, leaving the
+    AgentSet and the original query untouched. The operations are executed each time the query is
+    evaluated, so a query can be reused across steps and always reflects the current AgentSet.
+
+    Filters and limits are applied while streaming over the agents. Only sorting, shuffling, and
+    fractional limits after another operation need a list of the agents up to that point.
+
+    Notes:
+        The AgentSet should not be modified while iterating over the query. ``do``, ``map``, ``get``,
+        and ``agg`` evaluate the query before calling anything on the agents, so this is safe there.
+
+    """
+
+    def __init__(self, agentset: AgentSet, operations: tuple[tuple, ...] = ()):
+        """Initialize an AgentSetQuery.
+
+        Args:
+            agentset (AgentSet): The AgentSet to query
+            operations (tuple): The recorded operations
+
+        """
+        self.agentset = agentset
+        self._operations = operations
+
+    def _append(self, *operation) -> AgentSetQuery:
+        return AgentSetQuery(self.agentset, (*self._operations, operation))
+
+    def select(
+        self,
+        filter_func: Callable[[Agent], bool] | None = None,
+        at_most: int | float = float("inf"),
+        agent_type: type[Agent] | None = None,
+        where: dict[str, Any] | None = None,
+    ) -> AgentSetQuery:
+        """Add a selection to the query, see ``AgentSet.select`` for the arguments.
+
+        Returns:
+            AgentSetQuery: A new query with the selection added.
+
+        Notes:
+            A float at_most is a fraction of the number of agents going into this selection.
+        """
+        return self._append("select", filter_func, at_most, agent_type, where)
+
+    def sort(
+        self, key: Callable[[Agent], Any] | str, ascending: bool = False
+    ) -> AgentSetQuery:
+        """Add sorting to the query, see ``AgentSet.sort`` for the arguments.
+
+        Returns:
+            AgentSetQuery: A new query with the sort added.
+        """
+        if isinstance(key, str):
+            key = operator.attrgetter(key)
+        return self._append("sort", key, ascending)
+
+    def shuffle(self) -> AgentSetQuery:
+        """Add shuffling to the query, using the random number generator of the AgentSet.
+
+        Returns:
+            AgentSetQuery: A new query with the shuffle added.
+        """
+        return self._append("shuffle")
+
+    def __iter__(self) -> Iterator[Agent]:
+        """Evaluate the query and iterate over the resulting agents."""
+        return iter(self._evaluate())
+
+    def __len__(self) -> int:
+        """Evaluate the query and return the number of resulting agents."""
+        agents = self._evaluate()
+        return len(agents) if isinstance(agents, Sized) else sum(1 for _ in agents)
+
+    def _evaluate(self) -> Iterable[Agent]:
+        agentset = self.agentset
+        agents: Iterable[Agent] = agentset
+
+        for operation, *args in self._operations:
+            if operation == "select":
+                filter_func, at_most, agent_type, where = args
+                if at_most <= 1.0 and isinstance(at_most, float):
+                    if not isinstance(agents, Sized):
+                        agents = list(agents)
+                    at_most = int(len(agents) * at_most)
+                if agents is agentset:
+                    agents, where_func = agentset._where(where)
+                else:
+                    where_func = _where_filter(where) if where else None
+
+                for func in (
+                    filter_func,
+                    agent_type and _type_filter(agent_type),
+                    where_func,
+                ):
+                    if func:
+                        agents = filter(func, agents)
+                if at_most != float("inf"):
+                    agents = itertools.islice(agents, at_most)
+            elif operation == "sort":
+                key, ascending = args
+                agents = sorted(agents, key=key, reverse=not ascending)
+            else:  # shuffle
+                agents = list(agents)
+                agentset.random.shuffle(agents)
+
+        return agents
+
+    def to_agentset(self) -> AgentSet:
+        """Evaluate the query into a new AgentSet."""
+        return AgentSet(self._evaluate(), random=self.agentset.random)
+
+    def do(self, method: str | Callable, *args, **kwargs) -> AgentSetQuery:
+        """Invoke a method or function on each agent resulting from the query.
+
+        Args:
+            method (str, callable): the callable to do on each agent
+
+                                        * in case of str, the name of the method to call on each agent.
+                                        * in case of callable, the function to be called with each agent as first argument
+
+            *args: Variable length argument list passed to the callable being called.
+            **kwargs: Arbitrary keyword arguments passed to the callable being called.
+
+        Returns:
+            AgentSetQuery: The query itself.
+
+        Notes:
+            Agents that are removed from the AgentSet while ``do`` is running are skipped.
+        """
+        agentset = self.agentset
+        agents = list(self._evaluate())
+        if isinstance(method, str):
+            for agent in agents:
+                if agent in agentset:
+                    getattr(agent, method)(*args, **kwargs)
+        else:
+            for agent in agents:
+                if agent in agentset:
+                    method(agent, *args, **kwargs)
+
+        return self
+
+    def map(self, method: str | Callable, *args, **kwargs) -> list[Any]:
+        """Invoke a method or function on each agent resulting from the query and return the results.
+
+        Args:
+            method (str, callable): the callable to apply on each agent
+
+                                        * in case of str, the name of the method to call on each agent.
+                                        * in case of callable, the function to be called with each agent as first argument
+
+            *args: Variable length argument list passed to the callable being called.
+            **kwargs: Arbitrary keyword arguments passed to the callable being called.
+
+        Returns:
+           list[Any]: The results of the callable calls
+
+        Notes:
+            Agents that are removed from the AgentSet while ``map`` is running are skipped.
+        """
+        agentset = self.agentset
+        agents = list(self._evaluate())
+        if isinstance(method, str):
+            return [
+                getattr(agent, method)(*args, **kwargs)
+                for agent in agents
+                if agent in agentset
+            ]
+        else:
+            return [
+                method(agent, *args, **kwargs) for agent in agents if agent in agentset
+            ]
+
+    def get(
+        self,
+        attr_names: str | list[str],
+        handle_missing: Literal["error", "default"] = "error",
+        default_value: Any = None,
+    ) -> list[Any] | list[list[Any]]:
+        """Retrieve the specified attribute(s) from each agent resulting from the query.
+
+        See ``AgentSet.get`` for the arguments.
+
+        Returns:
+            list[Any]: A list with the attribute value for each agent if attr_names is a str.
+            list[list[Any]]: A list with a lists of attribute values for each agent if attr_names is a list of str.
+        """
+        if handle_missing not in ("error", "default"):
+            raise ValueError(
+                f"Unknown handle_missing option: {handle_missing}, "
+                "should be one of 'error' or 'default'"
+            )
+
+        agents = self._evaluate()
+        if handle_missing == "error":
+            if isinstance(attr_names, str):
+                return [getattr(agent, attr_names) for agent in agents]
+            return [[getattr(agent, attr) for attr in attr_names] for agent in agents]
+        else:
+            if isinstance(attr_names, str):
+                return [getattr(agent, attr_names, default_value) for agent in agents]
+            return [
+                [getattr(agent, attr, default_value) for attr in attr_names]
+                for agent in agents
+            ]
+
+    def agg(
+        self, attribute: str, func: Callable | Iterable[Callable]
+    ) -> Any | list[Any]:
+        """Aggregate an attribute of the agents resulting from the query using one or more functions.
+
+        See ``AgentSet.agg`` for the arguments.
+
+        Returns:
+            Any | [Any, ...]: Result of applying the function(s) to the attribute values.
+        """
+        values = self.get(attribute)
+        if isinstance(func, Callable):
+            return func(values)
+        else:
+            return [f(values) for f in func]
+
+
+# the number of consecutive agents that share a Generator in map_parallel and do_parallel, which
+# is fixed so the random numbers an agent draws do not depend on how the agents are partitioned
+_RNG_CHUNK_SIZE = 64
+
+
+def _partition(
+    agents: list[Agent], n_partitions: int | None, chunk_size: int = 1
+) -> list[list[Agent]]:
+    """Split the agents into n_partitions contiguous partitions of nearly equal size.
+
+    Each partition consists of whole chunks of chunk_size consecutive agents.
+    """
+    if n_partitions is None:
+        n_partitions = os.cpu_count() or 1
+    if n_partitions < 1:
+        raise ValueError(f"n_partitions should be at least 1, got {n_partitions}")
+
+    n_chunks = -(-len(agents) // chunk_size)
+    size, remainder = divmod(n_chunks, n_partitions)
+    partitions = []
+    start = 0
+    for i in range(n_partitions):
+        stop = start + size + (i < remainder)
+        partitions.append(agents[start * chunk_size : stop * chunk_size])
+        start = stop
+    return partitions
+
+
+def _run_partitions(
+    partitions: list[list],
+    method: str | Callable,
+    args: tuple,
+    kwargs: dict,
+    executor: Executor | str,
+    random: Random | None,
+    chunk_size: int = 1,
+) -> list[list[Any]]:
+    """Run the callable on all items of each partition as one task per partition on the executor.
+
+    If random is given, each chunk of chunk_size consecutive items gets its own random number
+    stream, derived from random, so the streams do not depend on the partitions.
+    """
+    seeds = [None] * len(partitions)
+    if random is not None:
+        n_chunks = [-(-len(partition) // chunk_size) for partition in partitions]
+        chunk_seeds = iter(
+            np.random.SeedSequence(random.getrandbits(128)).spawn(sum(n_chunks))
+        )
+        seeds = [list(itertools.islice(chunk_seeds, n)) for n in n_chunks]
+
+    owns_executor = isinstance(executor, str)
+    if owns_executor:
+        try:
+            executor_class = {
+                "thread": ThreadPoolExecutor,
+                "process": ProcessPoolExecutor,
+            }[executor]
+        except KeyError:
+            raise ValueError(
+                f"Unknown executor: {executor}, should be an Executor, 'thread' or 'process'"
+            ) from None
+        executor = executor_class(max_workers=max(len(partitions), 1))
+
+    try:
+        futures = [
+            executor.submit(
+                _call_partition, partition, method, args, kwargs, seed, chunk_size
+            )
+            for partition, seed in zip(partitions, seeds)
+        ]
+        return [future.result() for future in futures]
+    finally:
+        if owns_executor:
+            executor.shutdown()
+
+
+def _call_partition(
+    items: list,
+    method: str | Callable,
+    args: tuple,
+    kwargs: dict,
+    seeds: list[np.random.SeedSequence] | None,
+    chunk_size: int = 1,
+) -> list[Any]:
+    """Call the method on all items of a partition, this runs on the executor.
+
+    If seeds are given, each chunk of chunk_size items receives a Generator seeded with its seed.
+    """
+    if seeds is None:
+        chunks = [(items, kwargs)]
+    else:
+        chunks = [
+            (
+                items[i * chunk_size : (i + 1) * chunk_size],
+                {**kwargs, "rng": np.random.default_rng(seed)},
+            )
+            for i, seed in enumerate(seeds)
+        ]
+
+    results = []
+    for chunk, chunk_kwargs in chunks:
+        if isinstance(method, str):
+            results.extend(
+                getattr(item, method)(*args, **chunk_kwargs) for item in chunk
+            )
+        else:
+            results.extend(method(item, *args, **chunk_kwargs) for item in chunk)
+    return results
+
+
+def _sample_positions(
+    random: Random,
+    n: int,
+    k: int,
+    replace: bool = False,
+    weights: Sequence[float] | None = None,
+) -> list[int]:
+    """Draw k random positions from range(n), using the stdlib random number generator.
+
+    Unweighted sampling without replacement draws the same positions as ``random.sample``,
+    so for k=1 this is equivalent to ``random.choice``.
+    """
+    if weights is None:
+        if replace:
+            return random.choices(range(n), k=k)
+        return random.sample(range(n), k)
+
+    if len(weights) != n:
+        raise ValueError(f"Got {len(weights)} weights for {n} agents")
+    if replace:
+        return random.choices(range(n), weights=weights, k=k)
+
+    # Efraimidis & Spirakis (2006): the k largest keys u ** (1 / w) form a weighted sample
+    # without replacement. We use the logarithm of the keys for numerical stability.
+    keys = [
+        math.log(1.0 - random.random()) / weight if weight > 0 else -math.inf
+        for weight in weights
+    ]
+    if not 0 <= k <= sum(weight > 0 for weight in weights):
+        raise ValueError(
+            "Sample larger than the number of agents with a positive weight"
+        )
+    return heapq.nlargest(k, range(n), key=keys.__getitem__)
+
+
+def _type_filter(agent_type: type[Agent]) -> Callable[[Agent], bool]:
+    return lambda agent: isinstance(agent, agent_type)
 
 
 class GroupBy:
@@ -655,6 +1891,37 @@ class GroupBy:
         else:
             return {k: method(v, *args, **kwargs) for k, v in self.groups.items()}
 
+    def map_parallel(
+        self,
+        method: Callable | str,
+        *args,
+        executor: Executor | Literal["thread", "process"] = "thread",
+        rng: bool = False,
+        **kwargs,
+    ) -> dict[Any, Any]:
+        """Apply the specified callable to each group in parallel and return the results.
+
+        Each group is handled by a single task on the executor, see ``AgentSet.map_parallel`` for
+        the arguments.
+
+        Returns:
+            dict with group_name as key and the return of the method as value
+
+        """
+        random = None
+        if rng and self.groups:
+            # the per group generators are seeded from the model rng of the first agent
+            random = next(iter(next(iter(self.groups.values())))).random
+        results = _run_partitions(
+            [[group] for group in self.groups.values()],
+            method,
+            args,
+            kwargs,
+            executor,
+            random,
+        )
+        return {k: result for k, (result,) in zip(self.groups, results)}
+
     def do(self, method: Callable | str, *args, **kwargs) -> GroupBy:
         """Apply the specified callable to each group.
 
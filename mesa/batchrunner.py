@@ -32,6 +32,7 @@ import inspect
 import itertools
 import multiprocessing
 import warnings
+from bisect import bisect_left
 from collections.abc import Iterable, Mapping, Sequence
 from functools import partial
 from multiprocessing import Pool
@@ -41,6 +42,7 @@ import numpy as np
 from tqdm.auto import tqdm
 
 from mesa.model import Model
+from mesa.termination import TerminationCriterion, should_terminate
 
 multiprocessing.set_start_method("spawn", force=True)
 
@@ -57,6 +59,7 @@ def batch_run(
     max_steps: int = 1000,
     display_progress: bool = True,
     rng: SeedLike | Iterable[SeedLike] | None = None,
+    termination: TerminationCriterion | Sequence[TerminationCriterion] | None = None,
 ) -> list[dict[str, Any]]:
     """Batch run a mesa model with a set of parameter values.
 
@@ -69,6 +72,8 @@ def batch_run(
         max_steps (int, optional): Maximum number of model steps after which the model halts, by default 1000
         display_progress (bool, optional): Display batch run process, by default True
         rng : a valid value or iterable of values for seeding the random number generator in the model
+        termination: optional termination criteria, see mesa.termination. Each run stops as soon as any of them
+                     is met, or when max_steps is reached.
 
     Returns:
         List[Dict[str, Any]]
@@ -111,6 +116,7 @@ def batch_run(
         model_cls,
         max_steps=max_steps,
         data_collection_period=data_collection_period,
+        termination=termination,
     )
 
     results: list[dict[str, Any]] = []
@@ -179,6 +185,7 @@ def _model_run_func(
     run: tuple[int, int, dict[str, Any]],
     max_steps: int,
     data_collection_period: int,
+    termination: TerminationCriterion | Sequence[TerminationCriterion] | None = None,
 ) -> list[dict[str, Any]]:
     """Run a single model run and collect model and agent data.
 
@@ -192,6 +199,8 @@ def _model_run_func(
         Maximum number of model steps after which the model halts, by default 1000
     data_collection_period : int
         Number of steps after which data gets collected
+    termination : TerminationCriterion | Sequence[TerminationCriterion] | None
+        Termination criteria, any of which stops the run
 
     Returns:
     -------
@@ -203,6 +212,8 @@ def _model_run_func(
     model = model_cls(**kwargs)
     while model.running and model.steps <= max_steps:
         model.step()
+        if termination is not None and should_terminate(model, termination):
+            model.running = False
 
     data = []
 
@@ -210,8 +221,9 @@ def _model_run_func(
     if not steps or steps[-1] != model.steps - 1:
         steps.append(model.steps - 1)
 
+    frames = _sink_frames(model)
     for step in steps:
-        model_data, all_agents_data = _collect_data(model, step)
+        model_data, all_agents_data = _collect_data(model, step, frames)
 
         # If there are agent_reporters, then create an entry for each agent
         if all_agents_data:
@@ -245,15 +257,38 @@ def _model_run_func(
 def _collect_data(
     model: Model,
     step: int,
+    frames: tuple[dict[str, Any], dict[int, list[dict[str, Any]]]] | None = None,
 ) -> tuple[dict[str, Any], list[dict[str, Any]]]:
-    """Collect model and agent data from a model using mesas datacollector."""
+    """Collect model and agent data from a model using mesas datacollector.
+
+    If the datacollector has a sink, the data is looked up in the frames returned by
+    _sink_frames instead, as most of it is no longer held in memory.
+    """
     if not hasattr(model, "datacollector"):
         raise AttributeError(
             "The model does not have a datacollector attribute. Please add a DataCollector to your model."
         )
     dc = model.datacollector
 
-    model_data = {param: values[step] for param, values in dc.model_vars.items()}
+    if frames is not None:
+        model_columns, agent_rows = frames
+        model_data = {
+            param: column.get(step) if param in dc.schedules else column.iloc[step]
+            for param, column in model_columns.items()
+        }
+        return model_data, agent_rows.get(step, [])
+
+    model_data = {}
+    for param, values in dc.model_vars.items():
+        if param in dc.schedules:
+            # scheduled reporters are not collected at every step, so look up the step
+            steps = dc._model_steps[param]
+            i = bisect_left(steps, step)
+            model_data[param] = (
+                values[i] if i < len(steps) and steps[i] == step else None
+            )
+        else:
+            model_data[param] = values[step]
 
     all_agents_data = []
     raw_agent_data = dc._agent_records.get(step, [])
@@ -262,3 +297,36 @@ def _collect_data(
         agent_dict.update(zip(dc.agent_reporters, data[2:]))
         all_agents_data.append(agent_dict)
     return model_data, all_agents_data
+
+
+def _sink_frames(
+    model: Model,
+) -> tuple[dict[str, Any], dict[int, list[dict[str, Any]]]] | None:
+    """Read all data of a datacollector with a sink, or return None if it has no sink.
+
+    Returns:
+        The column of each model reporter, indexed by step for scheduled reporters and
+        without the steps at which they were not collected, and the agent data by step.
+    """
+    dc = getattr(model, "datacollector", None)
+    if dc is None or dc.sink is None:
+        return None
+
+    model_columns = {}
+    if dc.model_reporters:
+        model_vars = dc.get_model_vars_dataframe()
+        for param in dc.model_vars:
+            column = model_vars[param]
+            model_columns[param] = column.dropna() if param in dc.schedules else column
+
+    agent_rows = {}
+    if dc.agent_reporters:
+        agent_vars = dc.get_agent_vars_dataframe()
+        for step, group in agent_vars.groupby(level="Step", sort=False):
+            agent_rows[step] = (
+                group.droplevel("Step")
+                .rename_axis("AgentID")
+                .reset_index()
+                .to_dict("records")
+            )
+    return model_columns, agent_rows
@@ -0,0 +1,457 @@
+"""Fast binary checkpoints of a model.
+
+``Model.checkpoint`` and ``Model.restore`` write and read a model to and from a single
+file. Plain pickling walks the object graph one object at a time: every cell pickles its
+slots, grids recreate their dynamic cell class per cell, and ``__setstate__`` reconnects
+all cells from scratch. A checkpoint instead
+
+- stores agents, cells, and discrete spaces as empty shells in the object graph and
+  writes their state afterwards as one table per class, with one column per attribute.
+  Columns holding only ints, floats, or bools become NumPy arrays.
+- stores the connections of all cells as a compressed adjacency table that is restored
+  as is, so restoring never calls ``_connect_cells``.
+- writes NumPy arrays (property layers, columnar stores, numeric columns) as raw
+  out-of-band buffers using pickle protocol 5.
+- keeps the weak references used by the DEVS event list.
+
+Everything else, including the RNG states, is pickled as usual, so restore time tracks
+the size of the state rather than the connectivity of the space.
+
+``Model.fork`` uses the same format in memory. The model is serialized once and every
+fork is restored from that snapshot, sharing read-only arrays with the model and the
+data of writable property layers with each other until a fork writes to it.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import copyreg
+import gc
+import io
+import pickle
+import struct
+import sys
+import weakref
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from os import PathLike
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from mesa.agent import Agent
+from mesa.discrete_space import Cell, DiscreteSpace
+from mesa.discrete_space.grid import pickle_gridcell
+from mesa.discrete_space.property_layer import PropertyLayer
+
+if TYPE_CHECKING:
+    from mesa.model import Model
+
+__all__ = ["fork_model", "load_checkpoint", "save_checkpoint"]
+
+_MAGIC = b"MESACKPT"
+_VERSION = 1
+_HEADER = struct.Struct("<8sIQQ")
+
+# cached properties of cells that are cheaper to rebuild than to store
+_CELL_CACHES = ("neighborhood",)
+
+
+class _Missing:
+    """Marker for attributes that are not set on every object of a table."""
+
+    def __reduce__(self):
+        return "_MISSING"
+
+
+_MISSING = _Missing()
+
+
+class _Repeated:
+    """A column holding the same object for every row."""
+
+    __slots__ = ["n", "value"]
+
+    def __init__(self, value: Any, n: int):
+        self.value = value
+        self.n = n
+
+    def __reduce__(self):
+        return _Repeated, (self.value, self.n)
+
+
+def _encode_column(values: list) -> list | np.ndarray | _Repeated:
+    """Return the most compact representation of a column."""
+    if not values:
+        return values
+    first = values[0]
+    if all(value is first for value in values):
+        return _Repeated(first, len(values))
+
+    kind = type(first)
+    if kind in (bool, int, float) and all(type(value) is kind for value in values):
+        try:
+            return np.array(values, dtype=np.int64 if kind is int else kind)
+        except OverflowError:
+            pass
+    return values
+
+
+def _decode_column(column: list | np.ndarray | _Repeated) -> list:
+    if isinstance(column, _Repeated):
+        return [column.value] * column.n
+    if isinstance(column, np.ndarray):
+        return column.tolist()
+    return column
+
+
+def _encode_columns(dicts: list[dict]) -> tuple[dict[str, Any], bool]:
+    """Turn a list of dicts into a dict of columns, using _MISSING for absent keys.
+
+    Returns:
+        the columns and whether any of the dicts lacks a key
+
+    """
+    keys = dict.fromkeys(key for d in dicts for key in d)
+    sparse = any(len(d) != len(keys) for d in dicts)
+    columns = {
+        key: _encode_column([d.get(key, _MISSING) for d in dicts]) for key in keys
+    }
+    return columns, sparse
+
+
+def _decode_columns(columns: dict[str, Any], sparse: bool) -> Iterator[dict]:
+    keys = list(columns)
+    rows = zip(*(_decode_column(column) for column in columns.values()))
+    if sparse:
+        return (
+            {key: value for key, value in zip(keys, row) if value is not _MISSING}
+            for row in rows
+        )
+    return (dict(zip(keys, row)) for row in rows)
+
+
+class _StateTable:
+    """The state of all shells of a single class, stored column by column."""
+
+    def __init__(self, objects: list, slot_names: list[str], dicts: list[dict] | None):
+        self.objects = objects
+        self.slots = {
+            name: _encode_column([getattr(obj, name, _MISSING) for obj in objects])
+            for name in slot_names
+        }
+        self.dicts, self.sparse = _encode_columns(dicts) if dicts else ({}, False)
+
+    def restore(self) -> None:
+        objects = self.objects
+        cls = type(objects[0])
+        for name, column in self.slots.items():
+            set_slot = getattr(cls, name).__set__
+            if isinstance(column, _Repeated):
+                if column.value is not _MISSING:
+                    for obj in objects:
+                        set_slot(obj, column.value)
+                continue
+            for obj, value in zip(objects, _decode_column(column)):
+                if value is not _MISSING:
+                    set_slot(obj, value)
+        if self.dicts:
+            for obj, state in zip(objects, _decode_columns(self.dicts, self.sparse)):
+                obj.__dict__.update(state)
+
+
+class _CellTable(_StateTable):
+    """A _StateTable for cells that stores all connections as one adjacency table."""
+
+    def __init__(self, cells: list[Cell], slot_names: list[str]):
+        dicts = [
+            {k: v for k, v in cell.__dict__.items() if k not in _CELL_CACHES}
+            for cell in cells
+        ]
+        super().__init__(
+            cells, [name for name in slot_names if name != "connections"], dicts
+        )
+
+        key_codes: dict[Any, int] = {}
+        codes = []
+        self.neighbors = []
+        for cell in cells:
+            for key, neighbor in cell.connections.items():
+                codes.append(key_codes.setdefault(key, len(key_codes)))
+                self.neighbors.append(neighbor)
+        self.keys = list(key_codes)
+        self.codes = np.array(codes, dtype=np.int32)
+        self.n_connections = np.fromiter(
+            (len(cell.connections) for cell in cells), dtype=np.int32, count=len(cells)
+        )
+
+    def restore(self) -> None:
+        super().restore()
+        keys = self.keys
+        connection_keys = iter([keys[code] for code in self.codes.tolist()])
+        neighbors = iter(self.neighbors)
+        for cell, n in zip(self.objects, self.n_connections.tolist()):
+            cell.connections = dict(
+                zip(islice(connection_keys, n), islice(neighbors, n))
+            )
+
+
+def _has_default_state(cls: type) -> bool:
+    """Check whether instances of cls pickle their __dict__ and slots as is."""
+    return (
+        cls.__reduce_ex__ is object.__reduce_ex__
+        and cls.__reduce__ is object.__reduce__
+        and cls.__getstate__ is object.__getstate__
+        and getattr(cls, "__setstate__", None) is None
+    )
+
+
+def _is_importable(cls: type) -> bool:
+    module = sys.modules.get(cls.__module__)
+    obj = module
+    for name in cls.__qualname__.split("."):
+        obj = getattr(obj, name, None)
+    return obj is cls
+
+
+def _make_cell_class(name: str, bases: tuple[type, ...], namespace: dict) -> type:
+    """Recreate a dynamically created cell class such as the GridCell class of a grid."""
+    cell_klass = type(name, bases, namespace)
+    copyreg.pickle(cell_klass, pickle_gridcell)
+    return cell_klass
+
+
+def _dead_reference() -> weakref.ref:
+    class Gone:
+        pass
+
+    return weakref.ref(Gone())
+
+
+class _CheckpointPickler(pickle.Pickler):
+    """Pickler that replaces agents, cells, and spaces with shells and tracks them."""
+
+    def __init__(self, file, **kwargs):
+        super().__init__(file, protocol=5, **kwargs)
+        self.pending: dict[type, list] = defaultdict(list)
+        self._reducers = {
+            type: self._reduce_class,
+            weakref.ref: self._reduce_reference,
+            weakref.WeakMethod: self._reduce_reference,
+        }
+
+    def reducer_override(self, obj):
+        cls = type(obj)
+        try:
+            reduce = self._reducers[cls]
+        except KeyError:
+            reduce = self._reducers[cls] = self._reducer_for(cls)
+        return NotImplemented if reduce is None else reduce(obj)
+
+    def _reducer_for(self, cls: type):
+        if issubclass(cls, Cell | DiscreteSpace) or (
+            issubclass(cls, Agent) and _has_default_state(cls)
+        ):
+            return self._reduce_shell
+        return None
+
+    def _reduce_shell(self, obj):
+        self.pending[type(obj)].append(obj)
+        return copyreg.__newobj__, (type(obj),)
+
+    def _reduce_class(self, cls: type):
+        if issubclass(cls, Cell) and not _is_importable(cls):
+            namespace = {
+                k: v
+                for k, v in vars(cls).items()
+                if k not in ("__dict__", "__weakref__")
+            }
+            return _make_cell_class, (cls.__name__, cls.__bases__, namespace)
+        return NotImplemented
+
+    def _reduce_reference(self, reference: weakref.ref):
+        target = reference()
+        if target is None:
+            return _dead_reference, ()
+        return type(reference), (target,)
+
+    def tables(self) -> list[_StateTable]:
+        """Return the tables for all pending shells and clear the pending shells."""
+        pending, self.pending = self.pending, defaultdict(list)
+        tables = []
+        for cls, objects in pending.items():
+            slot_names = [
+                name
+                for name in copyreg._slotnames(cls)
+                if name not in ("__dict__", "__weakref__")
+            ]
+            if issubclass(cls, Cell):
+                tables.append(_CellTable(objects, slot_names))
+            else:
+                dicts = (
+                    [obj.__dict__ for obj in objects]
+                    if hasattr(objects[0], "__dict__")
+                    else None
+                )
+                tables.append(_StateTable(objects, slot_names, dicts))
+        return tables
+
+
+@contextlib.contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Pause the cyclic garbage collector, which otherwise runs over and over on the new objects."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _dump(model: Model, pickler: _CheckpointPickler) -> None:
+    with _gc_paused():
+        pickler.dump(model)
+        # pickling a table can run into shells not seen before, so we repeat until done
+        while pickler.pending:
+            pickler.dump(pickler.tables())
+        pickler.dump(None)
+
+
+def _load(payload: bytes | memoryview, buffers: Iterable) -> Model:
+    unpickler = pickle.Unpickler(io.BytesIO(payload), buffers=buffers)  # noqa: S301
+    with _gc_paused():
+        model = unpickler.load()
+        tables = []
+        while (loaded := unpickler.load()) is not None:
+            tables.extend(loaded)
+        for table in tables:
+            table.restore()
+    return model
+
+
+def save_checkpoint(model: Model, path: str | PathLike) -> None:
+    """Write a checkpoint of the model to path.
+
+    Args:
+        model: the model to checkpoint
+        path: the file to write the checkpoint to
+
+    """
+    buffers: list[pickle.PickleBuffer] = []
+    stream = io.BytesIO()
+    _dump(model, _CheckpointPickler(stream, buffer_callback=buffers.append))
+
+    raw_buffers = [buffer.raw() for buffer in buffers]
+    payload = stream.getbuffer()
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, payload.nbytes, len(raw_buffers)))
+        file.write(np.array([raw.nbytes for raw in raw_buffers], dtype="<u8").tobytes())
+        file.write(payload)
+        for raw in raw_buffers:
+            file.write(raw)
+
+
+def load_checkpoint(path: str | PathLike) -> Model:
+    """Read a model from a checkpoint written by save_checkpoint.
+
+    Args:
+        path: the file to read the checkpoint from
+
+    Returns:
+        the restored model
+
+    """
+    with open(path, "rb") as file:
+        magic, version, payload_size, n_buffers = _HEADER.unpack(
+            file.read(_HEADER.size)
+        )
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a Mesa checkpoint")
+        if version != _VERSION:
+            raise ValueError(f"Unsupported checkpoint version {version}")
+        sizes = np.frombuffer(file.read(8 * n_buffers), dtype="<u8").tolist()
+        payload = file.read(payload_size)
+        buffers = []
+        for size in sizes:
+            buffer = bytearray(size)
+            file.readinto(buffer)
+            buffers.append(buffer)
+
+    return _load(payload, buffers)
+
+
+def _restore_layer(
+    cls: type[PropertyLayer], state: dict, copy_on_write: bool
+) -> PropertyLayer:
+    layer = cls.__new__(cls)
+    layer.__dict__.update(state)
+    layer._mesa_copy_on_write = copy_on_write and not layer._mesa_data.flags.writeable
+    return layer
+
+
+def _address(buffer: memoryview) -> int:
+    return np.frombuffer(buffer, dtype=np.uint8).ctypes.data
+
+
+class _ForkPickler(_CheckpointPickler):
+    """_CheckpointPickler that lets the forks share arrays with each other where possible.
+
+    Read-only arrays are shared with the parent model. The data of writable property layers
+    is copied once and shared between the forks, each of which copies it when first writing
+    to it. All other writable arrays are copied for each fork.
+    """
+
+    def __init__(self, file):
+        super().__init__(file, buffer_callback=self._keep_buffer)
+        self.buffers: list[tuple[memoryview | bytes, bool]] = []
+        self._layer_addresses: set[int] = set()
+
+    def _reducer_for(self, cls: type):
+        if issubclass(cls, PropertyLayer):
+            return self._reduce_layer
+        return super()._reducer_for(cls)
+
+    def _reduce_layer(self, layer: PropertyLayer):
+        data = layer._mesa_data
+        copy_on_write = data.flags.writeable or layer._mesa_copy_on_write
+        if data.flags.writeable and data.size:
+            self._layer_addresses.add(data.ctypes.data)
+        return _restore_layer, (type(layer), layer.__dict__, copy_on_write)
+
+    def _keep_buffer(self, buffer: pickle.PickleBuffer) -> None:
+        raw = buffer.raw()
+        if raw.readonly:
+            self.buffers.append((raw, True))
+        elif raw.nbytes and _address(raw) in self._layer_addresses:
+            self.buffers.append((memoryview(bytes(raw)), True))
+        else:
+            self.buffers.append((bytes(raw), False))
+
+
+def fork_model(model: Model, n_forks: int) -> list[Model]:
+    """Return independent copies of the model that share read-only state.
+
+    Args:
+        model: the model to fork
+        n_forks: the number of forks
+
+    Returns:
+        a list of forked models
+
+    """
+    stream = io.BytesIO()
+    pickler = _ForkPickler(stream)
+    _dump(model, pickler)
+    payload = stream.getvalue()
+    return [
+        _load(
+            payload,
+            [
+                buffer if shared else bytearray(buffer)
+                for buffer, shared in pickler.buffers
+            ],
+        )
+        for _ in range(n_forks)
+    ]
@@ -23,19 +23,47 @@ The DataCollector then stores the data it collects in dictionaries:
     * tables maps each table to a dictionary, with each column as a key with a
       list as its value.
     * _agent_records maps each model step to a list of each agent's id
-      and its values.
+      and its values. With ``agent_storage="columnar"``, the agent records are
+      instead stored as chunked NumPy arrays, one per reporter plus one each for
+      the step and the agent id. With ``agent_storage="delta"``, only the records
+      of agents that entered, changed, or exited are stored, and the records of
+      each step are reconstructed from these changes when read.
     * _agenttype_records maps each model step to a dictionary of agent types,
       each containing a list of each agent's id and its values.
 
 Finally, DataCollector can create a pandas DataFrame from each collection.
+
+Instead of recording an attribute of every agent, agent_statistics collect
+summary statistics of it, such as its mean, quantiles, histogram, or Gini
+coefficient, so memory grows with the number of collections only.
+
+Model and agent reporters can be given a CollectionSchedule, so they are only
+collected every so many steps, at given steps, or when a condition holds, and
+agent reporters only for a fixed random sample of the agents.
+
+For long runs, a DataCollector can be given a sink (CSVSink, ParquetSink, or
+SQLiteSink) that the collected data is flushed to every so many collections or
+rows. Only the most recent collections then stay in memory, and the
+``get_*_dataframe`` methods read the flushed data back from the sink.
 """
 
 import contextlib
 import itertools
+import sqlite3
 import types
 import warnings
-from copy import deepcopy
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from copy import copy, deepcopy
 from functools import partial
+from operator import attrgetter, itemgetter
+from os import PathLike
+from pathlib import Path
+
+import numpy as np
+
+from mesa.agent import Agent
 
 with contextlib.suppress(ImportError):
     import pandas as pd
@@ -57,6 +85,12 @@ class DataCollector:
         agent_reporters=None,
         agenttype_reporters=None,
         tables=None,
+        agent_storage="records",
+        sink=None,
+        copy_policy="auto",
+        schedules=None,
+        agent_statistics=None,
+        merge_agenttype=False,
     ):
         """Instantiate a DataCollector with lists of model, agent, and agent-type reporters.
 
@@ -102,21 +136,93 @@ class DataCollector:
             agenttype_reporters: Dictionary of agent types to dictionaries of
                                  reporter names and attributes/funcs/methods.
             tables: Dictionary of table names to lists of column names.
+            agent_storage: How agent records are stored. "records" (the default) keeps
+                           one tuple per agent per collection, "columnar" keeps one typed
+                           NumPy array per reporter, which takes far less memory for
+                           numeric reporters. "delta" only stores a record when an agent
+                           enters, when its reports differ from its last stored ones, or
+                           when it exits, which takes far less memory for reporters that
+                           rarely change. See get_agent_changes_dataframe.
+            sink: Optional DataSink, such as a CSVSink, ParquetSink, or SQLiteSink, that the
+                  collected data is flushed to in chunks. Only the last ``sink.keep_last``
+                  collections stay in memory, except that termination criteria checked
+                  against the model keep as many model reporter values as they look at.
+            copy_policy: How the values of model reporters are copied before they are stored,
+                         either one policy for all model reporters or a dictionary mapping
+                         reporter names to policies, with "auto" for the others:
+                         - "auto" (default): immutable values, such as numbers, strings, and
+                           NumPy scalars, are stored as is, NumPy arrays of numbers are copied
+                           with ``ndarray.copy()``, and all other values are deep copied.
+                         - "none": values are stored as is.
+                         - "shallow": values are copied with ``copy.copy``.
+                         - "deep": values are copied with ``copy.deepcopy``.
+            schedules: Dictionary mapping names of model reporters, agent reporters, and
+                       agent statistics to a CollectionSchedule. A scheduled reporter is
+                       only run when its schedule fires, reporters without a schedule run
+                       at every collection.
+                       Once a model reporter has a schedule, get_model_vars_dataframe is
+                       indexed by step, with missing values for reporters not collected at
+                       a step. Agent reporters that do not fire at a step, or that do not
+                       sample an agent, report missing values in the agent records.
+            agent_statistics: Dictionary mapping names to AgentStatistics, summary statistics
+                              of an agent attribute that are collected instead of the value
+                              of each agent. See get_agent_statistics_dataframe.
+            merge_agenttype: Whether to store the agent-type records as extra columns of the
+                             columnar agent records, so each agent is traversed once per
+                             collection for both agent and agent-type reporters. Requires
+                             ``agent_storage="columnar"`` and unscheduled agent reporters.
 
         Notes:
             - If you want to pickle your model you must not use lambda functions.
             - If your model includes a large number of agents, it is recommended to
               use attribute names for the agent reporter, as it will be faster.
         """
+        if agent_storage not in ("records", "columnar", "delta"):
+            raise ValueError(
+                f"agent_storage must be 'records', 'columnar', or 'delta', not {agent_storage!r}"
+            )
+        self.agent_storage = agent_storage
+
         self.model_reporters = {}
         self.agent_reporters = {}
         self.agenttype_reporters = {}
 
+        self.copy_policy = copy_policy
+        self._copy_functions = {}  # reporter name -> function copying its values
+
+        self.schedules = dict(schedules) if schedules is not None else {}
+
         self.model_vars = {}
-        self._agent_records = {}
+        self._model_steps = {}  # reporter name -> steps at which its values were collected
+        self._agent_records = {
+            "records": dict,
+            "columnar": _ColumnarAgentRecords,
+            "delta": _DeltaAgentRecords,
+        }[agent_storage]()
         self._agenttype_records = {}
         self.tables = {}
 
+        self.agent_statistics = (
+            dict(agent_statistics) if agent_statistics is not None else {}
+        )
+        self._statistics_records = {name: [] for name in self.agent_statistics}
+
+        if merge_agenttype and agent_storage != "columnar":
+            raise ValueError("merge_agenttype requires agent_storage='columnar'")
+        self.merge_agenttype = merge_agenttype
+
+        self.sink = sink
+        self._n_unflushed = 0  # collections since the last flush
+        self._n_flushes = 0
+        self._n_model_values_kept = (
+            0  # model values a flush keeps, see _keep_model_values
+        )
+
+        # frames built by earlier calls of the get_*_dataframe methods, see _cached_model_vars
+        self._model_vars_cache = None  # (n_flushes, lengths of model_vars, frame)
+        self._agent_frame_cache = None  # (n_flushes, names, n_steps, frame)
+        self._flushed_cache = {}  # table -> data read from the sink since the last flush
+
         # add the signal of the validation of model reporter
         self._validated = False
 
@@ -137,6 +243,23 @@ class DataCollector:
             for name, columns in tables.items():
                 self._new_table(name, columns)
 
+        unknown = (
+            set(self.schedules)
+            - set(self.model_reporters)
+            - set(self.agent_reporters)
+            - set(self.agent_statistics)
+        )
+        if unknown:
+            raise ValueError(
+                f"Schedules given for unknown reporters or agent statistics: {sorted(unknown)}"
+            )
+        if merge_agenttype and any(
+            name in self.schedules for name in self.agent_reporters
+        ):
+            raise ValueError(
+                "merge_agenttype does not support scheduled agent reporters"
+            )
+
     def _validate_model_reporter(self, name, reporter, model):
         """Validate model reporter and handle validation results appropriately.
 
@@ -198,8 +321,20 @@ class DataCollector:
                 3. Method: model.get_count or Model.get_count
                 4. List of [function, [parameters]]
         """
+        policy = self.copy_policy
+        if isinstance(policy, dict):
+            policy = policy.get(name, "auto")
+        try:
+            self._copy_functions[name] = _COPY_FUNCTIONS[policy]
+        except KeyError as e:
+            raise ValueError(
+                f"Unknown copy policy {policy!r} for model reporter '{name}', "
+                f"should be one of {list(_COPY_FUNCTIONS)}"
+            ) from e
+
         self.model_reporters[name] = reporter
         self.model_vars[name] = []
+        self._model_steps[name] = []
 
     def _new_agent_reporter(self, name, reporter):
         """Add a new agent-level reporter to collect.
@@ -212,12 +347,7 @@ class DataCollector:
         """
         # Check if the reporter is an attribute string
         if isinstance(reporter, str):
-            attribute_name = reporter
-
-            def attr_reporter(agent):
-                return getattr(agent, attribute_name, None)
-
-            reporter = attr_reporter
+            reporter = _AttributeReporter(reporter)
 
         # Check if the reporter is a function with arguments placed in a list
         elif isinstance(reporter, list):
@@ -248,12 +378,7 @@ class DataCollector:
 
         # Use the same logic as _new_agent_reporter
         if isinstance(reporter, str):
-            attribute_name = reporter
-
-            def attr_reporter(agent):
-                return getattr(agent, attribute_name, None)
-
-            reporter = attr_reporter
+            reporter = _AttributeReporter(reporter)
 
         elif isinstance(reporter, list):
             func, params = reporter[0], reporter[1]
@@ -277,40 +402,157 @@ class DataCollector:
 
     def _record_agents(self, model):
         """Record agents data in a mapping of functions and agents."""
-        rep_funcs = self.agent_reporters.values()
-
-        def get_reports(agent):
-            _prefix = (agent.model.steps, agent.unique_id)
-            reports = tuple(rep(agent) for rep in rep_funcs)
-            return _prefix + reports
-
+        get_reports = _reports_getter(
+            ["unique_id", *self.agent_reporters.values()], model.steps
+        )
         agent_records = map(get_reports, model.agents)
         return agent_records
 
-    def _record_agenttype(self, model, agent_type):
-        """Record agent-type data in a mapping of functions and agents."""
-        rep_funcs = self.agenttype_reporters[agent_type].values()
+    def _record_agent_columns(self, model):
+        """Record agents data column by column into the columnar agent records.
 
-        def get_reports(agent):
-            _prefix = (agent.model.steps, agent.unique_id)
-            reports = tuple(rep(agent) for rep in rep_funcs)
-            return _prefix + reports
+        Attribute reporters are fetched with ``AgentSet.get(..., view=True)``, which returns
+        a view on the column if all agents are of a single class that stores the attribute
+        in a ``ColumnarAttribute``.
+        """
+        agents = _agent_set(model)
+        unique_ids = agents.get("unique_id")
+        columns = [_report_column(rep, agents) for rep in self.agent_reporters.values()]
+        self._agent_records.append(model.steps, unique_ids, columns)
 
-        agent_types = model.agent_types
-        if agent_type in agent_types:
-            agents = model.agents_by_type[agent_type]
-        else:
-            from mesa import Agent  # noqa: PLC0415
+    def _record_merged_agent_columns(self, model):
+        """Record agent and agent-type data together into the columnar agent records.
 
-            if issubclass(agent_type, Agent):
-                agents = [
-                    agent for agent in model.agents if isinstance(agent, agent_type)
-                ]
+        The agents are traversed once per agent class. For each agent type with reporters,
+        a boolean column marks the agents it reports on, followed by one column for each
+        of its reporters, with missing values for the other agents.
+        """
+        unique_ids = []
+        columns = [[] for _ in self._agent_column_names()]
+        for agent_class, agents in model.agents_by_type.items():
+            if not agents:
+                continue
+            unique_ids.append(_as_column(agents.get("unique_id")))
+            parts = [
+                _report_column(rep, agents) for rep in self.agent_reporters.values()
+            ]
+            for agent_type, reporters in self.agenttype_reporters.items():
+                # same agents as _record_agenttype
+                reports = agent_class is agent_type or (
+                    issubclass(agent_class, agent_type)
+                    and agent_type not in model.agents_by_type
+                )
+                parts.append(np.full(len(agents), reports))
+                parts.extend(
+                    _report_column(rep, agents)
+                    if reports
+                    else np.full(len(agents), np.nan)
+                    for rep in reporters.values()
+                )
+            for column, part in zip(columns, parts):
+                column.append(_as_column(part))
+
+        self._agent_records.append(
+            model.steps,
+            np.concatenate(unique_ids) if unique_ids else [],
+            [np.concatenate(column) if column else [] for column in columns],
+        )
+
+    def _agent_column_names(self):
+        """Return the names of the columns of the agent records, after the step and agent id."""
+        names = list(self.agent_reporters)
+        if self.merge_agenttype:
+            for agent_type, reporters in self.agenttype_reporters.items():
+                names.append(agent_type.__name__)
+                names.extend(f"{agent_type.__name__}:{name}" for name in reporters)
+        return names
+
+    def _record_scheduled_agents(self, model):
+        """Record the agent reporters whose schedule fires, on the agents they sample.
+
+        Agents that none of the firing reporters sample are left out, and reporters that
+        do not fire, or do not sample an agent, report a missing value for it. Nothing
+        is recorded if no reporter fires.
+        """
+        schedules = [self.schedules.get(name) for name in self.agent_reporters]
+        firing = [schedule is None or schedule.fires(model) for schedule in schedules]
+        if not any(firing):
+            return
+
+        agents = _agent_set(model)
+        unique_ids = np.asarray(agents.get("unique_id"))
+        samples = [
+            schedule.sampled(model, unique_ids)
+            if fires and schedule is not None and schedule.sample is not None
+            else None
+            for schedule, fires in zip(schedules, firing)
+        ]
+
+        # only keep the agents sampled by a firing reporter if all of them sample
+        rows = None
+        if all(sample is not None for sample, fires in zip(samples, firing) if fires):
+            rows = np.logical_or.reduce([s for s in samples if s is not None])
+            unique_ids = unique_ids[rows]
+            agents = list(itertools.compress(agents, rows))
+
+        missing = np.nan if self.agent_storage == "columnar" else None
+        columns = []
+        for reporter, fires, sample in zip(
+            self.agent_reporters.values(), firing, samples
+        ):
+            if not fires:
+                column = [missing] * len(unique_ids)
+            elif sample is None:
+                if rows is None and isinstance(reporter, _AttributeReporter):
+                    column = agents.get(
+                        reporter.attribute, handle_missing="default", view=True
+                    )
+                else:
+                    column = [reporter(agent) for agent in agents]
             else:
+                keep = sample if rows is None else sample[rows]
+                column = [
+                    reporter(agent) if kept else missing
+                    for agent, kept in zip(agents, keep)
+                ]
+            columns.append(column)
+
+        if self.agent_storage == "columnar":
+            self._agent_records.append(model.steps, unique_ids, columns)
+        else:
+            columns = [
+                column.tolist() if isinstance(column, np.ndarray) else column
+                for column in columns
+            ]
+            self._store_agent_records(
+                model.steps,
+                zip(itertools.repeat(model.steps), unique_ids.tolist(), *columns),
+            )
+
+    def _store_agent_records(self, step, agent_records):
+        """Store the record tuples of the agents at step."""
+        if self.agent_storage == "delta":
+            self._agent_records.append(step, agent_records)
+        else:
+            self._agent_records[step] = list(agent_records)
+
+    def _record_agenttype(self, model, agent_type):
+        """Record agent-type data in a mapping of functions and agents."""
+        get_reports = _reports_getter(
+            ["unique_id", *self.agenttype_reporters[agent_type].values()], model.steps
+        )
+
+        agents = model.agents_by_type.get(agent_type)
+        if agents is None:
+            if not issubclass(agent_type, Agent):
                 # Raise error if agent_type is not in model.agent_types
                 raise ValueError(
-                    f"Agent type {agent_type} is not recognized as an Agent type in the model or Agent subclass. Use an Agent (sub)class, like {agent_types}."
+                    f"Agent type {agent_type} is not recognized as an Agent type in the model or Agent subclass. Use an Agent (sub)class, like {model.agent_types}."
                 )
+            # the agents of all registered subclasses
+            agents = itertools.chain.from_iterable(
+                model._agentsets_by_class.get(agent_type, ())
+            )
 
         agenttype_records = map(get_reports, agents)
         return agenttype_records
@@ -323,28 +565,37 @@ class DataCollector:
                     self._validate_model_reporter(name, reporter, model)
 
             for var, reporter in self.model_reporters.items():
+                schedule = self.schedules.get(var)
+                if schedule is not None and not schedule.fires(model):
+                    continue
                 # Check if lambda or partial function
                 if isinstance(reporter, types.LambdaType | partial):
-                    # Use deepcopy to store a copy of the data,
-                    # preventing references from being updated across steps.
-                    self.model_vars[var].append(deepcopy(reporter(model)))
+                    value = reporter(model)
                 # Check if model attribute
                 elif isinstance(reporter, str):
-                    self.model_vars[var].append(
-                        deepcopy(getattr(model, reporter, None))
-                    )
+                    value = getattr(model, reporter, None)
                 # Check if function with arguments
                 elif isinstance(reporter, list):
-                    self.model_vars[var].append(deepcopy(reporter[0](*reporter[1])))
+                    value = reporter[0](*reporter[1])
                 # Assume it's a callable otherwise (e.g., method)
                 else:
-                    self.model_vars[var].append(deepcopy(reporter()))
-
-        if self.agent_reporters:
-            agent_records = self._record_agents(model)
-            self._agent_records[model.steps] = list(agent_records)
+                    value = reporter()
+                # Store a copy of the data according to the copy policy,
+                # preventing references from being updated across steps.
+                self.model_vars[var].append(self._copy_functions[var](value))
+                self._model_steps[var].append(model.steps)
+
+        if self.merge_agenttype and (self.agent_reporters or self.agenttype_reporters):
+            self._record_merged_agent_columns(model)
+        elif self.agent_reporters:
+            if any(name in self.schedules for name in self.agent_reporters):
+                self._record_scheduled_agents(model)
+            elif self.agent_storage == "columnar":
+                self._record_agent_columns(model)
+            else:
+                self._store_agent_records(model.steps, self._record_agents(model))
 
-        if self.agenttype_reporters:
+        if self.agenttype_reporters and not self.merge_agenttype:
             self._agenttype_records[model.steps] = {}
             for agent_type in self.agenttype_reporters:
                 agenttype_records = self._record_agenttype(model, agent_type)
@@ -352,6 +603,139 @@ class DataCollector:
                     agenttype_records
                 )
 
+        for name, statistics in self.agent_statistics.items():
+            schedule = self.schedules.get(name)
+            if schedule is None or schedule.fires(model):
+                self._statistics_records[name].extend(statistics.summarize(model))
+
+        if self.sink is not None:
+            self._n_unflushed += 1
+            if self.sink._is_due(self._n_unflushed, self._n_buffered_rows()):
+                keep = self.sink.keep_last
+                self._flush(keep, max(keep, self._n_model_values_kept))
+
+    def _keep_model_values(self, n):
+        """Keep at least the last n values of each model reporter in memory when flushing.
+
+        Termination criteria call this, as they only look at the values in model_vars.
+        """
+        self._n_model_values_kept = max(self._n_model_values_kept, n)
+
+    def flush(self):
+        """Write all data held in memory to the sink.
+
+        Raises:
+            ValueError: If the DataCollector has no sink.
+        """
+        if self.sink is None:
+            raise ValueError("The DataCollector has no sink to flush to.")
+        self._flush(0)
+
+    def _n_buffered_rows(self):
+        """Return the number of model, agent, and agent-type rows held in memory."""
+        n_rows = len(next(iter(self.model_vars.values()), ()))
+        if isinstance(self._agent_records, _ColumnarAgentRecords):
+            n_rows += len(self._agent_records.steps)
+        elif isinstance(self._agent_records, _DeltaAgentRecords):
+            n_rows += len(self._agent_records.changes)
+        else:
+            n_rows += sum(len(records) for records in self._agent_records.values())
+        n_rows += sum(
+            len(records)
+            for by_type in self._agenttype_records.values()
+            for records in by_type.values()
+        )
+        n_rows += sum(len(records) for records in self._statistics_records.values())
+        return n_rows
+
+    def _flush(self, keep, keep_model=None):
+        """Write all but the last keep collections, and all table rows, to the sink.
+
+        Of the model reporters, all but the last keep_model values are written, which
+        defaults to keep.
+        """
+        sink = self.sink
+        if keep_model is None:
+            keep_model = keep
+
+        for name, values in self.model_vars.items():
+            n = max(len(values) - keep_model, 0)
+            if n:
+                steps = self._model_steps[name]
+                sink.write(
+                    f"model_{name}",
+                    pd.DataFrame({"Step": steps[:n], name: values[:n]}),
+                )
+                del values[:n]
+                del steps[:n]
+
+        steps = list(self._agent_records)
+        flushed = steps[: max(len(steps) - keep, 0)]
+        if flushed and isinstance(self._agent_records, _DeltaAgentRecords):
+            collected, changes = self._agent_records.pop_steps(
+                len(flushed), ["Step", "AgentID", "Event", *self.agent_reporters]
+            )
+            sink.write("agent_steps", collected)
+            sink.write("agent_changes", changes)
+        elif flushed:
+            columns = ["Step", "AgentID", *self._agent_column_names()]
+            if isinstance(self._agent_records, _ColumnarAgentRecords):
+                frame = self._agent_records.pop_steps(len(flushed), columns)
+            else:
+                frame = pd.DataFrame.from_records(
+                    itertools.chain.from_iterable(
+                        self._agent_records.pop(step) for step in flushed
+                    ),
+                    columns=columns,
+                )
+            sink.write("agents", frame)
+
+        steps = list(self._agenttype_records)
+        flushed = [
+            (step, self._agenttype_records.pop(step))
+            for step in steps[: max(len(steps) - keep, 0)]
+        ]
+        for agent_type, reporters in self.agenttype_reporters.items():
+            records = [
+                record
+                for _, by_type in flushed
+                for record in by_type.get(agent_type, ())
+            ]
+            if records:
+                sink.write(
+                    _agenttype_table(agent_type),
+                    pd.DataFrame.from_records(
+                        records, columns=["Step", "AgentID", *reporters]
+                    ),
+                )
+
+        for name, records in self._statistics_records.items():
+            steps = list(dict.fromkeys(record[0] for record in records))
+            if len(steps) > keep:
+                # the records are in order of their step
+                last = steps[len(steps) - keep] if keep else None
+                n = next(
+                    (i for i, record in enumerate(records) if record[0] == last),
+                    len(records),
+                )
+                sink.write(
+                    f"statistics_{name}",
+                    pd.DataFrame.from_records(
+                        records[:n], columns=self.agent_statistics[name].columns
+                    ),
+                )
+                del records[:n]
+
+        for name, table in self.tables.items():
+            if any(table.values()):
+                sink.write(f"table_{name}", pd.DataFrame(table))
+                for values in table.values():
+                    values.clear()
+
+        self._n_unflushed = 0
+        self._n_flushes += 1
+        self._flushed_cache.clear()
+
     def add_table_row(self, table_name, row, ignore_missing=False):
         """Add a row dictionary to a specific table.
 
@@ -372,19 +756,101 @@ class DataCollector:
             else:
                 raise Exception("Could not insert row with missing column")
 
-    def get_model_vars_dataframe(self):
+    def get_model_vars_dataframe(self, tail=None, max_rows=None):
         """Create a pandas DataFrame from the model variables.
 
         The DataFrame has one column for each model variable, and the index is
-        (implicitly) the model tick.
+        (implicitly) the model tick. If a model reporter has a schedule, the index
+        is the step at which the values were collected instead, with missing values
+        for reporters that were not collected at a step.
+
+        Only the values collected since the previous call are converted, and appended
+        to the DataFrame built then, so calling this after every step, as plots do,
+        does not rebuild the DataFrame from scratch.
+
+        Args:
+            tail: If given, only the last tail rows are returned.
+            max_rows: If given, at most max_rows rows are returned, evenly spread over all
+                      (or the last tail) rows and including the last one.
         """
         # Check if self.model_reporters dictionary is empty, if so raise warning
         if not self.model_reporters:
             raise UserWarning(
                 "No model reporters have been defined in the DataCollector, returning empty DataFrame."
             )
+        return _select_rows(self._cached_model_vars(), tail, max_rows)
+
+    def _cached_model_vars(self):
+        """Return the DataFrame of the model variables, extending the one of the previous call."""
+        lengths = [len(values) for values in self.model_vars.values()]
+        frame = None
+        if self._model_vars_cache is not None:
+            n_flushes, cached_lengths, cached = self._model_vars_cache
+            if n_flushes == self._n_flushes and len(lengths) == len(cached_lengths):
+                if lengths == cached_lengths:
+                    frame = cached
+                elif all(n >= m for n, m in zip(lengths, cached_lengths)):
+                    frame = self._extend_model_vars(cached, cached_lengths)
+        if frame is None:
+            frame = self._model_vars_frame()
+        self._model_vars_cache = (self._n_flushes, lengths, frame)
+        return frame
+
+    def _model_vars_frame(self, offsets=None):
+        """Build the DataFrame of the model variables, or of only those after offsets if given."""
+        scheduled = any(name in self.schedules for name in self.model_reporters)
+        if not scheduled and (offsets is not None or self.sink is None):
+            offsets = offsets or [0] * len(self.model_vars)
+            return pd.DataFrame(
+                {
+                    name: values[offset:]
+                    for (name, values), offset in zip(self.model_vars.items(), offsets)
+                }
+            )
 
-        return pd.DataFrame(self.model_vars)
+        columns = []
+        for (name, values), offset in zip(
+            self.model_vars.items(), offsets or itertools.repeat(0)
+        ):
+            column = pd.Series(
+                values[offset:],
+                index=pd.Index(self._model_steps[name][offset:], name="Step"),
+                name=name,
+                dtype=object if len(values) == offset else None,
+            )
+            if offsets is None and self.sink is not None:
+                flushed = self._read_flushed(f"model_{name}")
+                if flushed is not None:
+                    column = pd.concat([flushed.set_index("Step")[name], column])
+            if scheduled:
+                column = column[~column.index.duplicated(keep="last")]
+            else:
+                column = column.reset_index(drop=True)
+            columns.append(column)
+        frame = pd.concat(columns, axis=1)
+        return frame.sort_index() if scheduled else frame
+
+    def _extend_model_vars(self, frame, offsets):
+        """Append the model variables collected after offsets to frame, or return None to rebuild it."""
+        new = self._model_vars_frame(offsets)
+        if not any(name in self.schedules for name in self.model_reporters):
+            extended = _concat([frame, new], ignore_index=True)
+        elif len(frame) and len(new) and new.index[0] <= frame.index[-1]:
+            # collected again at a step already in frame, which replaces its values
+            return None
+        else:
+            extended = _concat([frame, new])
+
+        # columns of new without values, or only missing ones, are object columns, so
+        # infer the dtype the column would have had if frame was built in one go
+        changed = [
+            name
+            for name in extended.columns
+            if extended[name].dtype == object and frame[name].dtype != object
+        ]
+        if changed:
+            extended[changed] = extended[changed].infer_objects()
+        return extended
 
     def get_agent_vars_dataframe(self):
         """Create a pandas DataFrame from the agent variables.
@@ -398,15 +864,41 @@ class DataCollector:
                 "No agent reporters have been defined in the DataCollector, returning empty DataFrame."
             )
 
-        all_records = itertools.chain.from_iterable(self._agent_records.values())
         rep_names = list(self.agent_reporters)
+        if self.merge_agenttype:
+            return self._merged_agent_dataframe()[rep_names]
+        if self.agent_storage == "delta":
+            steps, changes = [], []
+            if self.sink is not None:
+                flushed_steps = self._read_flushed("agent_steps")
+                flushed_changes = self._read_flushed("agent_changes")
+                if flushed_steps is not None:
+                    steps = flushed_steps["Step"].tolist()
+                if flushed_changes is not None:
+                    changes = list(flushed_changes.itertuples(index=False, name=None))
+            return self._agent_records.to_dataframe(rep_names, steps, changes)
+        return self._with_flushed("agents", self._cached_agent_records(rep_names))
+
+    def get_agent_changes_dataframe(self):
+        """Create a pandas DataFrame from the changes stored with ``agent_storage="delta"``.
+
+        The DataFrame is indexed by step and agent id, with an "Event" column that is
+        "enter" for the first record of an agent, "change" for a record whose reports
+        differ from the previous one, and "exit" for an agent that was no longer present,
+        followed by one column for each variable.
 
+        Raises:
+            ValueError: If the agent records are not stored as deltas.
+        """
+        if self.agent_storage != "delta":
+            raise ValueError(
+                "Agent changes are only stored with agent_storage='delta'."
+            )
         df = pd.DataFrame.from_records(
-            data=all_records,
-            columns=["Step", "AgentID", *rep_names],
-            index=["Step", "AgentID"],
-        )
-        return df
+            self._agent_records.changes,
+            columns=["Step", "AgentID", "Event", *self.agent_reporters],
+        ).set_index(["Step", "AgentID"])
+        return self._with_flushed("agent_changes", df)
 
     def get_agenttype_vars_dataframe(self, agent_type):
         """Create a pandas DataFrame from the agent-type variables for a specific agent type.
@@ -426,19 +918,41 @@ class DataCollector:
             )
             return pd.DataFrame()
 
+        rep_names = list(self.agenttype_reporters[agent_type])
+        if self.merge_agenttype:
+            df = self._merged_agent_dataframe()
+            name = agent_type.__name__
+            df = df.loc[df[name].astype(bool), [f"{name}:{rep}" for rep in rep_names]]
+            return df.set_axis(rep_names, axis=1)
+
         all_records = itertools.chain.from_iterable(
             records[agent_type]
             for records in self._agenttype_records.values()
             if agent_type in records
         )
-        rep_names = list(self.agenttype_reporters[agent_type])
 
         df = pd.DataFrame.from_records(
-            data=all_records,
-            columns=["Step", "AgentID", *rep_names],
-            index=["Step", "AgentID"],
+            data=all_records, columns=["Step", "AgentID", *rep_names]
+        ).set_index(["Step", "AgentID"])
+        return self._with_flushed(_agenttype_table(agent_type), df)
+
+    def get_agent_statistics_dataframe(self, name):
+        """Create a pandas DataFrame from the collected statistics of an agent attribute.
+
+        The DataFrame is indexed by step, and by agent type if the statistics are grouped
+        by type, with one column for each statistic. See AgentStatistics for the columns.
+
+        Args:
+            name: The name of the agent statistics.
+        """
+        statistics = self.agent_statistics[name]
+        df = pd.DataFrame.from_records(
+            self._statistics_records[name], columns=statistics.columns
         )
-        return df
+        flushed = self._read_flushed(f"statistics_{name}")
+        if flushed is not None:
+            df = pd.concat([flushed, df], ignore_index=True) if len(df) else flushed
+        return df.set_index(statistics.columns[: 2 if statistics.by_type else 1])
 
     def get_table_dataframe(self, table_name):
         """Create a pandas DataFrame from a particular table.
@@ -448,4 +962,890 @@ class DataCollector:
         """
         if table_name not in self.tables:
             raise Exception("No such table.")
-        return pd.DataFrame(self.tables[table_name])
+        df = pd.DataFrame(self.tables[table_name])
+        flushed = self._read_flushed(f"table_{table_name}")
+        if flushed is None:
+            return df
+        return pd.concat([flushed, df], ignore_index=True) if len(df) else flushed
+
+    def _merged_agent_dataframe(self):
+        """Return all columns of the agent records merged with the agent-type records."""
+        df = self._cached_agent_records(self._agent_column_names())
+        return self._with_flushed("agents", df)
+
+    def _cached_agent_records(self, names):
+        """Return the DataFrame of the agent records in memory, extending the one of the previous call.
+
+        Only the records of steps collected since the previous call are converted. The
+        records of the last step are never cached, as collecting again in the same step
+        replaces them.
+        """
+        steps = list(self._agent_records)
+        n_cached, cached = 0, None
+        if self._agent_frame_cache is not None:
+            n_flushes, cached_names, n_steps, frame = self._agent_frame_cache
+            if (
+                n_flushes == self._n_flushes
+                and cached_names == names
+                and n_steps <= len(steps)
+            ):
+                n_cached, cached = n_steps, frame
+
+        n_complete = max(len(steps) - 1, n_cached)
+        complete = self._agent_records_frame(names, steps[n_cached:n_complete])
+        if cached is not None:
+            complete = _concat([cached, complete]) if len(complete) else cached
+        self._agent_frame_cache = (self._n_flushes, names, n_complete, complete)
+        return _concat([complete, self._agent_records_frame(names, steps[n_complete:])])
+
+    def _agent_records_frame(self, names, steps):
+        """Build the DataFrame of the agent records of the given consecutive steps."""
+        if isinstance(self._agent_records, _ColumnarAgentRecords):
+            if not steps:
+                return self._agent_records.to_dataframe(names, 0, 0)
+            ranges = self._agent_records._ranges
+            return self._agent_records.to_dataframe(
+                names, ranges[steps[0]][0], ranges[steps[-1]][1]
+            )
+        records = itertools.chain.from_iterable(
+            self._agent_records[step] for step in steps
+        )
+        return pd.DataFrame.from_records(
+            data=records, columns=["Step", "AgentID", *names]
+        ).set_index(["Step", "AgentID"])
+
+    def _read_flushed(self, table):
+        """Return a copy of the data flushed to table of the sink, or None if there is none."""
+        if self.sink is None:
+            return None
+        if table not in self._flushed_cache:
+            self._flushed_cache[table] = self.sink.read(table)
+        flushed = self._flushed_cache[table]
+        return None if flushed is None else flushed.copy()
+
+    def _with_flushed(self, table, df):
+        """Prepend the agent records flushed to table of the sink to df."""
+        flushed = self._read_flushed(table)
+        if flushed is None:
+            return df
+        flushed = flushed.set_index(["Step", "AgentID"])
+        return pd.concat([flushed, df]) if len(df) else flushed
+
+
+class CollectionSchedule:
+    """When a reporter of a DataCollector is collected, and of which agents.
+
+    A schedule fires at a collection if the step of the model is a multiple of ``every``
+    or one of the steps in ``at``, and ``when`` returns True for the model. Conditions
+    that are not given always hold, so a schedule with only ``when`` fires at every
+    collection for which it returns True.
+
+    Agent reporters with a ``sample`` only report on that fraction of the agents. Whether
+    an agent is in the sample is decided by hashing its unique id with the seed, so the
+    same agents are followed for the whole run::
+
+        DataCollector(
+            model_reporters={"Gini": compute_gini},
+            agent_reporters={"Wealth": "wealth"},
+            schedules={"Wealth": CollectionSchedule(every=100, sample=0.1)},
+        )
+
+    Attributes:
+        every (int | None): collect at steps that are a multiple of every
+        at (frozenset[int] | None): collect at these steps
+        when (Callable | None): collect when this returns True for the model
+        sample (float | None): the fraction of agents agent reporters report on
+        seed (int | None): the seed for picking the sampled agents
+
+    """
+
+    def __init__(
+        self,
+        every: int | None = None,
+        at: Iterable[int] | None = None,
+        when: Callable | None = None,
+        sample: float | None = None,
+        seed: int | None = None,
+    ):
+        """Initialize a CollectionSchedule.
+
+        Args:
+            every: collect at steps that are a multiple of every
+            at: collect at these steps
+            when: a function of the model, collect when it returns True
+            sample: the fraction of agents agent reporters report on, between 0 and 1.
+                    It is ignored for model reporters.
+            seed: the seed for picking the sampled agents. If None, it is derived from
+                  the random number generator the model was seeded with, so each
+                  seed of the model samples other agents.
+
+        """
+        if every is not None and every < 1:
+            raise ValueError("every must be at least 1")
+        if sample is not None and not 0 < sample <= 1:
+            raise ValueError("sample must be larger than 0 and at most 1")
+        self.every = every
+        self.at = frozenset(at) if at is not None else None
+        self.when = when
+        self.sample = sample
+        self.seed = seed
+
+    def fires(self, model) -> bool:
+        """Return whether the reporter is collected at the current step of the model."""
+        step = model.steps
+        if (self.every is not None or self.at is not None) and not (
+            (self.every is not None and step % self.every == 0)
+            or (self.at is not None and step in self.at)
+        ):
+            return False
+        return self.when is None or bool(self.when(model))
+
+    def sampled(self, model, unique_ids: np.ndarray) -> np.ndarray:
+        """Return a boolean mask of the agents, given by their unique ids, that are in the sample."""
+        seed = self.seed
+        if seed is None:
+            seed = zlib.crc32(repr(model._rng).encode())
+
+        # splitmix64 finalizer, mapping each id to a uniformly distributed 64-bit integer
+        z = np.asarray(unique_ids, dtype=np.uint64) + np.uint64(
+            (seed * 0x9E3779B97F4A7C15) % 2**64
+        )
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z ^= z >> np.uint64(31)
+        return (z >> np.uint64(11)) < np.uint64(int(self.sample * 2**53))
+
+    def __repr__(self) -> str:  # noqa: D105
+        arguments = ", ".join(
+            f"{k}={v!r}" for k, v in vars(self).items() if v is not None
+        )
+        return f"{type(self).__name__}({arguments})"
+
+
+class AgentStatistics:
+    """Summary statistics of an agent attribute, collected instead of the value of each agent.
+
+    At each collection, the attribute of all agents is fetched in one pass, with
+    ``AgentSet.get``, and only its summary statistics are stored, so memory grows with
+    the number of collections and bins, not with the number of agents::
+
+        DataCollector(
+            agent_statistics={
+                "Wealth": AgentStatistics(
+                    "wealth", quantiles=[0.1, 0.5, 0.9], bins=range(11), gini=True
+                )
+            }
+        )
+
+    The statistics are stored in the columns ``count``, ``mean``, ``var`` (the population
+    variance), ``min``, and ``max``, followed by ``q<quantile>`` for each quantile, ``gini``,
+    and ``bin_<i>`` with the number of values in each bin ``[bins[i], bins[i + 1])``, where
+    the last bin also includes its upper edge. Missing values, such as agents that lack the
+    attribute, are not counted.
+
+    Attributes:
+        attribute (str): the name of the agent attribute
+        quantiles (tuple[float, ...]): the quantiles to compute
+        bins (np.ndarray | None): the edges of the histogram bins
+        gini (bool): whether to compute the Gini coefficient
+        by_type (bool): whether to compute the statistics for each agent type separately
+
+    """
+
+    def __init__(
+        self,
+        attribute: str,
+        quantiles: Iterable[float] = (),
+        bins: Iterable[float] | None = None,
+        gini: bool = False,
+        by_type: bool = False,
+    ):
+        """Initialize AgentStatistics.
+
+        Args:
+            attribute: the name of a numeric agent attribute
+            quantiles: the quantiles to compute, between 0 and 1
+            bins: the increasing edges of the histogram bins, or None for no histogram
+            gini: whether to compute the Gini coefficient
+            by_type: whether to compute the statistics for each agent type separately
+
+        """
+        self.attribute = attribute
+        self.quantiles = tuple(quantiles)
+        if any(not 0 <= q <= 1 for q in self.quantiles):
+            raise ValueError("quantiles must be between 0 and 1")
+        self.bins = np.asarray(bins, dtype=float) if bins is not None else None
+        if self.bins is not None and (
+            len(self.bins) < 2 or np.any(np.diff(self.bins) <= 0)
+        ):
+            raise ValueError("bins must be at least two increasing edges")
+        self.gini = gini
+        self.by_type = by_type
+
+    @property
+    def columns(self) -> list[str]:
+        """The column names of the records, starting with the step and the agent type."""
+        columns = ["Step", "AgentType"] if self.by_type else ["Step"]
+        columns += ["count", "mean", "var", "min", "max"]
+        columns += [f"q{q:g}" for q in self.quantiles]
+        if self.gini:
+            columns.append("gini")
+        if self.bins is not None:
+            columns += [f"bin_{i}" for i in range(len(self.bins) - 1)]
+        return columns
+
+    def summarize(self, model) -> list[tuple]:
+        """Return the records of the statistics for the current step of the model."""
+        if self.by_type:
+            return [
+                (model.steps, agent_type.__name__, *self._statistics(agents))
+                for agent_type, agents in model.agents_by_type.items()
+            ]
+        return [(model.steps, *self._statistics(_agent_set(model)))]
+
+    def _statistics(self, agents) -> list:
+        values = np.asarray(
+            agents.get(self.attribute, handle_missing="default", view=True),
+            dtype=float,
+        )
+        values = values[~np.isnan(values)]
+
+        if len(values):
+            mean = values.mean()
+            statistics = [
+                len(values),
+                mean,
+                np.square(values - mean).mean(),
+                values.min(),
+                values.max(),
+            ]
+            statistics += np.quantile(values, self.quantiles).tolist()
+        else:
+            statistics = [0, *[np.nan] * (4 + len(self.quantiles))]
+
+        if self.gini:
+            total = values.sum()
+            if len(values) and total:
+                n = len(values)
+                ranks = np.arange(1, n + 1)
+                gini = 2 * np.dot(ranks, np.sort(values)) / (n * total) - (n + 1) / n
+            else:
+                gini = np.nan
+            statistics.append(gini)
+
+        if self.bins is not None:
+            statistics += np.histogram(values, self.bins)[0].tolist()
+        return [float(x) if isinstance(x, np.floating) else x for x in statistics]
+
+    def __repr__(self) -> str:  # noqa: D105
+        return f"{type(self).__name__}({self.attribute!r})"
+
+
+def _concat(frames, **kwargs):
+    """Concatenate DataFrames into a new one, skipping empty ones unless all are empty."""
+    non_empty = [frame for frame in frames if len(frame)] or frames[-1:]
+    if len(non_empty) == 1:
+        frame = non_empty[0].copy()
+        return frame.reset_index(drop=True) if kwargs.get("ignore_index") else frame
+    return pd.concat(non_empty, **kwargs)
+
+
+def _select_rows(frame, tail=None, max_rows=None):
+    """Return a copy of the last tail rows of frame, evenly thinned out to at most max_rows rows."""
+    if tail is not None:
+        frame = frame.iloc[len(frame) - min(tail, len(frame)) :]
+    if max_rows is not None and len(frame) > max_rows:
+        if max_rows < 1:
+            raise ValueError("max_rows must be at least 1")
+        positions = np.linspace(len(frame) - 1, 0, max_rows).round().astype(int)
+        frame = frame.iloc[positions[::-1]]
+    return frame.copy()
+
+
+def _report_column(reporter, agents):
+    """Return the reports of reporter for the agents in an AgentSet."""
+    if isinstance(reporter, _AttributeReporter):
+        return agents.get(reporter.attribute, handle_missing="default", view=True)
+    return [reporter(agent) for agent in agents]
+
+
+def _agent_set(model):
+    """Return the agents of the model, as the AgentSet of their type if there is only one."""
+    if len(model.agents_by_type) == 1:
+        return next(iter(model.agents_by_type.values()))
+    return model.agents
+
+
+# types of which all instances are immutable, so values of these types never need copying
+_IMMUTABLE_TYPES = frozenset({int, float, bool, complex, str, bytes, type(None), range})
+
+
+def _auto_copy(value):
+    """Copy value only if it can change after being collected."""
+    kind = type(value)
+    if kind in _IMMUTABLE_TYPES or isinstance(value, np.generic):
+        return value
+    if kind is np.ndarray and value.dtype.kind != "O":
+        return value.copy()
+    return deepcopy(value)
+
+
+def _no_copy(value):
+    return value
+
+
+_COPY_FUNCTIONS = {
+    "auto": _auto_copy,
+    "none": _no_copy,
+    "shallow": copy,
+    "deep": deepcopy,
+}
+
+
+class _AttributeReporter:
+    """Agent reporter for an attribute, which reports None for agents that lack it."""
+
+    __slots__ = ["attribute"]
+
+    def __init__(self, attribute):
+        self.attribute = attribute
+
+    def __call__(self, agent):
+        return getattr(agent, self.attribute, None)
+
+    def __reduce__(self):
+        return _AttributeReporter, (self.attribute,)
+
+
+def _reports_getter(reporters, step):
+    """Return a function that turns an agent into the tuple of its step and reports.
+
+    All attribute reporters are fetched with a single ``operator.attrgetter`` call, only
+    falling back to getattr with a default for agents that lack one of the attributes.
+    Other reporters are called one by one.
+
+    Args:
+        reporters: The reporters, where attribute names stand for _AttributeReporters.
+        step: The step to put in front of the reports.
+    """
+    reporters = [
+        _AttributeReporter(rep) if isinstance(rep, str) else rep for rep in reporters
+    ]
+    attributes = [
+        rep.attribute for rep in reporters if isinstance(rep, _AttributeReporter)
+    ]
+    functions = [rep for rep in reporters if not isinstance(rep, _AttributeReporter)]
+
+    # positions of the reports in the attributes followed by the function results
+    positions = iter(range(len(attributes)))
+    function_positions = iter(range(len(attributes), len(reporters)))
+    order = [
+        next(positions)
+        if isinstance(rep, _AttributeReporter)
+        else next(function_positions)
+        for rep in reporters
+    ]
+
+    get_attributes = attrgetter(*attributes)
+    if len(attributes) == 1:
+        get_attributes = _as_tuple(get_attributes)
+    reorder = itemgetter(*order) if functions else None
+
+    def get_reports(agent):
+        try:
+            reports = get_attributes(agent)
+        except AttributeError:
+            reports = tuple(getattr(agent, name, None) for name in attributes)
+        if reorder is not None:
+            reports = reorder((*reports, *(function(agent) for function in functions)))
+        return (step, *reports)
+
+    return get_reports
+
+
+def _as_tuple(getter):
+    def get_tuple(agent):
+        return (getter(agent),)
+
+    return get_tuple
+
+
+def _agenttype_table(agent_type):
+    return f"agenttype_{agent_type.__name__}"
+
+
+class DataSink(ABC):
+    """Base class for sinks that a DataCollector flushes its collected data to.
+
+    The DataCollector writes its data as separate tables: one per model reporter
+    (``model_<name>``), ``agents`` for the agent records, one per agent type
+    (``agenttype_<class name>``), and one per table (``table_<name>``). A table is
+    replaced by the first write to it through a sink and appended to afterwards.
+
+    Attributes:
+        flush_every (int | None): flush after this many collections
+        max_rows (int | None): flush once this many model, agent, and agent-type rows are held in memory
+        keep_last (int): the number of most recent collections that stay in memory after a flush
+
+    Notes:
+        Sinks only support values that the file format can represent, such as numbers,
+        strings, and None, and return them with the types the format reads them back as.
+    """
+
+    def __init__(
+        self,
+        flush_every: int | None = 100,
+        max_rows: int | None = None,
+        keep_last: int = 1,
+    ):
+        """Initialize a DataSink.
+
+        Args:
+            flush_every: flush after this many collections; if None, only max_rows triggers a flush
+            max_rows: flush once this many rows are held in memory; if None, only flush_every triggers a flush
+            keep_last: the number of most recent collections that stay in memory after a flush
+        """
+        if keep_last < 0:
+            raise ValueError("keep_last must be at least 0")
+        self.flush_every = flush_every
+        self.max_rows = max_rows
+        self.keep_last = keep_last
+        self._written: set[str] = set()
+
+    def _is_due(self, n_collections: int, n_rows: int) -> bool:
+        return (self.flush_every is not None and n_collections >= self.flush_every) or (
+            self.max_rows is not None and n_rows >= self.max_rows
+        )
+
+    def write(self, table: str, frame: pd.DataFrame) -> None:
+        """Append the rows of frame to the table."""
+        self._write(table, frame, append=table in self._written)
+        self._written.add(table)
+
+    def read(self, table: str) -> pd.DataFrame | None:
+        """Return all rows written to the table, or None if nothing was written to it."""
+        if table not in self._written:
+            return None
+        return self._read(table)
+
+    @abstractmethod
+    def _write(self, table: str, frame: pd.DataFrame, append: bool) -> None:
+        """Write the rows of frame to the table, appending them if append is True."""
+
+    @abstractmethod
+    def _read(self, table: str) -> pd.DataFrame:
+        """Return all rows of the table."""
+
+
+class CSVSink(DataSink):
+    """DataSink that writes each table to a CSV file in a directory."""
+
+    def __init__(self, directory: str | PathLike, **kwargs):
+        """Initialize a CSVSink.
+
+        Args:
+            directory: the directory for the CSV files, which is created if needed
+            kwargs: flush_every, max_rows, and keep_last, see DataSink
+        """
+        super().__init__(**kwargs)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _write(self, table, frame, append):
+        frame.to_csv(
+            self.directory / f"{table}.csv",
+            mode="a" if append else "w",
+            header=not append,
+            index=False,
+        )
+
+    def _read(self, table):
+        return pd.read_csv(self.directory / f"{table}.csv")
+
+
+class ParquetSink(DataSink):
+    """DataSink that writes each flush of a table to a Parquet file, using pyarrow."""
+
+    def __init__(self, directory: str | PathLike, **kwargs):
+        """Initialize a ParquetSink.
+
+        Args:
+            directory: the directory for the Parquet files, which is created if needed.
+                       Each table gets a subdirectory with one file per flush.
+            kwargs: flush_every, max_rows, and keep_last, see DataSink
+
+        Raises:
+            ImportError: if pyarrow is not installed
+        """
+        try:
+            import pyarrow  # noqa: F401, PLC0415
+        except ImportError as e:
+            raise ImportError("ParquetSink requires pyarrow to be installed") from e
+        super().__init__(**kwargs)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _parts(self, table):
+        return sorted((self.directory / table).glob("part-*.parquet"))
+
+    def _write(self, table, frame, append):
+        directory = self.directory / table
+        directory.mkdir(exist_ok=True)
+        parts = self._parts(table)
+        if not append:
+            for part in parts:
+                part.unlink()
+            parts = []
+        frame.to_parquet(directory / f"part-{len(parts):06d}.parquet", index=False)
+
+    def _read(self, table):
+        return pd.concat(
+            [pd.read_parquet(part) for part in self._parts(table)], ignore_index=True
+        )
+
+
+class SQLiteSink(DataSink):
+    """DataSink that writes each table to a table in an SQLite database."""
+
+    def __init__(self, path: str | PathLike, **kwargs):
+        """Initialize an SQLiteSink.
+
+        Args:
+            path: the database file
+            kwargs: flush_every, max_rows, and keep_last, see DataSink
+        """
+        super().__init__(**kwargs)
+        self.path = Path(path)
+
+    def _write(self, table, frame, append):
+        with contextlib.closing(sqlite3.connect(self.path)) as connection:
+            frame.to_sql(
+                table,
+                connection,
+                if_exists="append" if append else "replace",
+                index=False,
+            )
+            connection.commit()
+
+    def _read(self, table):
+        with contextlib.closing(sqlite3.connect(self.path)) as connection:
+            return pd.read_sql_query(
+                f'SELECT * FROM "{table}" ORDER BY rowid',  # noqa: S608
+                connection,
+            )
+
+
+def _as_column(values: list) -> np.ndarray:
+    """Turn a list of reported values into a 1D array, using an object array for non-numeric values."""
+    with contextlib.suppress(ValueError):
+        column = np.asarray(values)
+        if column.ndim == 1 and column.dtype.kind in "biuf":
+            return column
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+class _ChunkedColumn:
+    """A typed column of values stored in fixed size NumPy chunks.
+
+    Appending never copies the values stored before, unlike growing a single array. The dtype
+    is taken from the first values appended and promoted if later values do not fit, with
+    object as the fallback for values that are not numeric.
+    """
+
+    __slots__ = ["_chunks", "chunk_size", "dtype", "n"]
+
+    def __init__(self, chunk_size: int = 65536, dtype=None):
+        self.chunk_size = chunk_size
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        self._chunks: list[np.ndarray] = []
+        self.n = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    def append(self, values: np.ndarray) -> None:
+        if not len(values):
+            return
+        self._promote(values.dtype)
+
+        start = 0
+        while start < len(values):
+            chunk, offset = divmod(self.n, self.chunk_size)
+            if chunk == len(self._chunks):
+                self._chunks.append(np.empty(self.chunk_size, dtype=self.dtype))
+            stop = min(len(values), start + self.chunk_size - offset)
+            self._chunks[chunk][offset : offset + stop - start] = values[start:stop]
+            self.n += stop - start
+            start = stop
+
+    def truncate(self, n: int) -> None:
+        """Drop all values from position n onwards."""
+        self.n = min(n, self.n)
+        del self._chunks[-(-self.n // self.chunk_size) :]
+
+    def to_array(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Return the values from start to stop as a single array."""
+        stop = self.n if stop is None else min(stop, self.n)
+        if start >= stop:
+            return np.empty(0, dtype=self.dtype or float)
+        first, last = start // self.chunk_size, (stop - 1) // self.chunk_size
+        parts = [
+            chunk[
+                max(start - i * self.chunk_size, 0) : min(
+                    stop - i * self.chunk_size, self.chunk_size
+                )
+            ]
+            for i, chunk in enumerate(self._chunks[first : last + 1], first)
+        ]
+        return parts[0].copy() if len(parts) == 1 else np.concatenate(parts)
+
+    def _promote(self, dtype: np.dtype) -> None:
+        if self.dtype is None:
+            self.dtype = dtype
+            return
+        if dtype == self.dtype or self.dtype.kind == "O":
+            return
+        promoted = (
+            np.dtype(object) if dtype.kind == "O" else np.result_type(self.dtype, dtype)
+        )
+        if promoted != self.dtype:
+            self.dtype = promoted
+            self._chunks = [chunk.astype(promoted) for chunk in self._chunks]
+
+
+class _ColumnarAgentRecords(Mapping):
+    """Agent records stored column by column, mapping each collected step to its records.
+
+    Rows of all collections are appended to one _ChunkedColumn per reporter, plus one for the
+    step and one for the agent id. Looking up a step builds the record tuples of that step, so
+    code written against the dict of records keeps working.
+    """
+
+    def __init__(self, chunk_size: int = 65536):
+        self.chunk_size = chunk_size
+        self.steps = _ChunkedColumn(chunk_size, dtype=np.int64)
+        self.unique_ids = _ChunkedColumn(chunk_size)
+        self.columns: list[_ChunkedColumn] = []
+        self._ranges: dict[int, tuple[int, int]] = {}  # step -> (start, stop) rows
+
+    def append(self, step: int, unique_ids: list, columns: list[list]) -> None:
+        """Append the records of one collection, replacing those of an earlier collection in the same step."""
+        if step in self._ranges and self._ranges[step][1] == len(self.steps):
+            start = self._ranges.pop(step)[0]
+            for column in self._all_columns():
+                column.truncate(start)
+
+        if not self.columns:
+            self.columns = [_ChunkedColumn(self.chunk_size) for _ in columns]
+
+        start = len(self.steps)
+        self.steps.append(np.full(len(unique_ids), step, dtype=np.int64))
+        self.unique_ids.append(_as_column(unique_ids))
+        for column, values in zip(self.columns, columns):
+            column.append(_as_column(values))
+        self._ranges[step] = (start, len(self.steps))
+
+    def _all_columns(self) -> list[_ChunkedColumn]:
+        return [self.steps, self.unique_ids, *self.columns]
+
+    def __getitem__(self, step: int) -> list[tuple]:
+        start, stop = self._ranges[step]
+        return list(
+            zip(
+                *(
+                    column.to_array(start, stop).tolist()
+                    for column in self._all_columns()
+                )
+            )
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ranges)
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def pop_steps(self, n_steps: int, names: list[str]) -> pd.DataFrame:
+        """Remove the records of the first n_steps collected steps and return them as a DataFrame."""
+        steps = list(self._ranges)[:n_steps]
+        if not steps:
+            return pd.DataFrame(columns=names)
+        cutoff = self._ranges[steps[-1]][1]
+        frame = pd.DataFrame(
+            {
+                name: column.to_array(0, cutoff)
+                for name, column in zip(names, self._all_columns())
+            }
+        )
+
+        for column in self._all_columns():
+            tail = column.to_array(cutoff)
+            column.truncate(0)
+            column.append(tail)
+        for step in steps:
+            del self._ranges[step]
+        self._ranges = {
+            step: (start - cutoff, stop - cutoff)
+            for step, (start, stop) in self._ranges.items()
+        }
+        return frame
+
+    def to_dataframe(
+        self, names: list[str], start: int = 0, stop: int | None = None
+    ) -> pd.DataFrame:
+        """Return the records in rows start to stop as a DataFrame indexed by step and agent id."""
+        index = pd.MultiIndex.from_arrays(
+            [self.steps.to_array(start, stop), self.unique_ids.to_array(start, stop)],
+            names=["Step", "AgentID"],
+        )
+        data = {
+            name: column.to_array(start, stop)
+            for name, column in zip(names, self.columns)
+        }
+        return pd.DataFrame(data, index=index, columns=names)
+
+
+_ABSENT = object()  # marks agents without stored reports
+
+
+def _same_reports(a, b):
+    """Return whether two tuples of reports are equal, treating incomparable ones as different."""
+    try:
+        return bool(a == b)
+    except ValueError:  # e.g., NumPy arrays
+        return False
+
+
+def _replay(
+    state: dict, steps: Iterable[int], changes: Iterable[tuple]
+) -> Iterator[tuple]:
+    """Apply the changes to the reports of each agent in state, yielding the records of each step."""
+    changes = iter(changes)
+    change = next(changes, None)
+    for step in steps:
+        while change is not None and change[0] == step:
+            _apply(state, change)
+            change = next(changes, None)
+        for unique_id, reports in state.items():
+            yield (step, unique_id, *reports)
+
+
+def _apply(state: dict, change: tuple) -> None:
+    if change[2] == "exit":
+        del state[change[1]]
+    else:
+        state[change[1]] = change[3:]
+
+
+class _DeltaAgentRecords(Mapping):
+    """Agent records that only store changes, mapping each collected step to its records.
+
+    A change (step, agent id, event, *reports) is stored when an agent enters, when its
+    reports differ from its last stored ones, and when it is no longer present, with the
+    event "enter", "change", or "exit", respectively. Looking up a step replays the changes
+    up to that step, continuing from the last lookup if it was for an earlier step, so
+    code written against the dict of records keeps working.
+    """
+
+    def __init__(self):
+        self.steps: list[int] = []  # collected steps
+        self.changes: list[tuple] = []
+        self._index: dict[int, int] = {}  # step -> position in steps
+        self._base: dict = {}  # reports of each agent before the first step in steps
+        self._last: dict = {}  # reports of each agent at the last step in steps
+        self._undo: list[tuple] = []  # (agent id, previous reports) for the last step
+        self._cursor = None  # (position in steps, position in changes, state)
+
+    def append(self, step: int, agent_records: Iterable[tuple]) -> None:
+        """Append the changes of one collection, replacing those of an earlier collection in the same step."""
+        self._cursor = None
+        if self.steps and self.steps[-1] == step:
+            while self.changes and self.changes[-1][0] == step:
+                self.changes.pop()
+            for unique_id, previous in reversed(self._undo):
+                if previous is _ABSENT:
+                    del self._last[unique_id]
+                else:
+                    self._last[unique_id] = previous
+        else:
+            self._index[step] = len(self.steps)
+            self.steps.append(step)
+        self._undo = []
+
+        present = set()
+        for record in agent_records:
+            unique_id, reports = record[1], record[2:]
+            present.add(unique_id)
+            previous = self._last.get(unique_id, _ABSENT)
+            if previous is _ABSENT:
+                event = "enter"
+            elif _same_reports(previous, reports):
+                continue
+            else:
+                event = "change"
+            self.changes.append((step, unique_id, event, *reports))
+            self._undo.append((unique_id, previous))
+            self._last[unique_id] = reports
+
+        for unique_id in [uid for uid in self._last if uid not in present]:
+            previous = self._last.pop(unique_id)
+            self.changes.append((step, unique_id, "exit", *(None,) * len(previous)))
+            self._undo.append((unique_id, previous))
+
+    def __getitem__(self, step: int) -> list[tuple]:
+        position = self._index[step]
+        if self._cursor is None or self._cursor[0] > position:
+            self._cursor = (-1, 0, dict(self._base))
+        current, n_applied, state = self._cursor
+        while current < position:
+            current += 1
+            while (
+                n_applied < len(self.changes)
+                and self.changes[n_applied][0] == self.steps[current]
+            ):
+                _apply(state, self.changes[n_applied])
+                n_applied += 1
+        self._cursor = (current, n_applied, state)
+        return [(step, unique_id, *reports) for unique_id, reports in state.items()]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.steps)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def pop_steps(
+        self, n_steps: int, names: list[str]
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Remove the first n_steps collected steps and return them and their changes as DataFrames."""
+        steps = self.steps[:n_steps]
+        flushed = set(steps)
+        n_changes = 0
+        while n_changes < len(self.changes) and self.changes[n_changes][0] in flushed:
+            n_changes += 1
+        changes = self.changes[:n_changes]
+
+        for change in changes:
+            _apply(self._base, change)
+        del self.steps[:n_steps]
+        del self.changes[:n_changes]
+        self._index = {step: i for i, step in enumerate(self.steps)}
+        self._cursor = None
+        if not self.steps:
+            self._undo = []
+        return (
+            pd.DataFrame({"Step": steps}),
+            pd.DataFrame.from_records(changes, columns=names),
+        )
+
+    def to_dataframe(
+        self, names: list[str], flushed_steps=(), flushed_changes=()
+    ) -> pd.DataFrame:
+        """Return the records of all steps, including flushed ones, as a DataFrame indexed by step and agent id."""
+        records = itertools.chain(
+            _replay({}, flushed_steps, flushed_changes),
+            _replay(dict(self._base), self.steps, self.changes),
+        )
+        return pd.DataFrame.from_records(
+            records, columns=["Step", "AgentID", *names]
+        ).set_index(["Step", "AgentID"])
@@ -14,6 +14,7 @@ environmental conditions.
 
 from __future__ import annotations
 
+from collections.abc import Iterable
 from functools import cache, cached_property
 from random import Random
 from typing import TYPE_CHECKING
@@ -126,6 +127,18 @@ class Cell:
         self._agents.remove(agent)
         self.empty = self.is_empty
 
+    def remove_agents(self, agents: Iterable[CellAgent]) -> None:
+        """Removes multiple agents from the cell in one operation.
+
+        Args:
+            agents (Iterable[CellAgent]): agents to remove from this cell
+
+        """
+        to_remove = set(agents)
+        # update in place, the list is shared with CellCollections
+        self._agents[:] = [agent for agent in self._agents if agent not in to_remove]
+        self.empty = self.is_empty
+
     @property
     def is_empty(self) -> bool:
         """Returns a bool of the contents of a cell."""
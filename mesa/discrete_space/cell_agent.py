@@ -13,12 +13,14 @@ creating custom cell-aware agents.
 
 from __future__ import annotations
 
+from collections import defaultdict
 from typing import TYPE_CHECKING, Protocol
 
 from mesa.agent import Agent
 
 if TYPE_CHECKING:
     from mesa.discrete_space import Cell
+    from mesa.model import Model
 
 
 class HasCellProtocol(Protocol):
@@ -98,6 +100,14 @@ class CellAgent(Agent, HasCell, BasicMovement):
         super().remove()
         self.cell = None  # ensures that we are also removed from cell
 
+    @classmethod
+    def _remove_many(cls, model: Model, agents: list[CellAgent]) -> None:
+        """Remove multiple agents from the model and their cells in one operation."""
+        super()._remove_many(model, agents)
+        _remove_from_cells(agents)
+        for agent in agents:
+            agent._mesa_cell = None
+
 
 class FixedAgent(Agent, FixedCell):
     """A patch in a 2D grid."""
@@ -110,6 +120,22 @@ class FixedAgent(Agent, FixedCell):
         #  so you cannot hijack remove() to move patches
         self.cell.remove_agent(self)
 
+    @classmethod
+    def _remove_many(cls, model: Model, agents: list[FixedAgent]) -> None:
+        """Remove multiple agents from the model and their cells in one operation."""
+        super()._remove_many(model, agents)
+        _remove_from_cells(agents)
+
+
+def _remove_from_cells(agents: list[HasCell]) -> None:
+    """Remove the agents from their cells, with one operation per cell."""
+    agents_by_cell = defaultdict(list)
+    for agent in agents:
+        if agent.cell is not None:
+            agents_by_cell[agent.cell].append(agent)
+    for cell, cell_agents in agents_by_cell.items():
+        cell.remove_agents(cell_agents)
+
 
 class Grid2DMovingAgent(CellAgent):
     """Mixin for moving agents in 2D grids."""
@@ -22,6 +22,8 @@ from functools import cached_property
 from random import Random
 from typing import TYPE_CHECKING, TypeVar
 
+from mesa.agent import _sample_positions
+
 if TYPE_CHECKING:
     from mesa.discrete_space.cell import Cell
     from mesa.discrete_space.cell_agent import CellAgent
@@ -106,9 +108,20 @@ class CellCollection[T: Cell]:
         Returns:
             CellAgent instance
 
+        Raises:
+            IndexError: If there are no agents in the collection.
 
         """
-        return self.random.choice(list(self.agents))
+        # draws the same agent as random.choice(list(self.agents)) without building the list
+        n = sum(len(agents) for agents in self._cells.values())
+        if n == 0:
+            raise IndexError("Cannot choose from an empty sequence")
+        (position,) = _sample_positions(self.random, n, 1)
+
+        for agents in self._cells.values():
+            if position < len(agents):
+                return agents[position]
+            position -= len(agents)
 
     def select(
         self,
@@ -13,8 +13,9 @@ or Hex for more uniform distances.
 
 from __future__ import annotations
 
+import contextlib
 import copyreg
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from itertools import product
 from random import Random
 from typing import Any, TypeVar
@@ -27,6 +28,28 @@ from mesa.discrete_space.property_layer import (
 
 T = TypeVar("T", bound=Cell)
 
+# connection tables of the grids built within _shared_topology, by grid class, dimensions, and torus
+_topologies: dict[tuple, list[tuple[tuple[Any, int], ...]]] | None = None
+
+
+@contextlib.contextmanager
+def _shared_topology() -> Iterator[None]:
+    """Connect grids with the same class, dimensions, and torus built within the context only once.
+
+    The first grid of each kind is connected as usual and its connections are stored as a table
+    of cell positions. All further grids of that kind copy their connections from the table.
+    """
+    global _topologies  # noqa: PLW0603
+    if _topologies is not None:
+        yield
+        return
+
+    _topologies = {}
+    try:
+        yield
+    finally:
+        _topologies = None
+
 
 def pickle_gridcell(obj):
     """Helper function for pickling GridCell instances."""
@@ -123,11 +146,28 @@ class Grid(DiscreteSpace[T], HasPropertyLayers):
         self.create_property_layer("empty", default_value=True, dtype=bool)
 
     def _connect_cells(self) -> None:
+        if _topologies is not None:
+            key = (type(self), tuple(self.dimensions), self.torus)
+            if (table := _topologies.get(key)) is not None:
+                cells = list(self._cells.values())
+                for cell, connections in zip(cells, table):
+                    cell.connections = {k: cells[i] for k, i in connections}
+                return
+
         if self._ndims == 2:
             self._connect_cells_2d()
         else:
             self._connect_cells_nd()
 
+        if _topologies is not None:
+            positions = {cell: i for i, cell in enumerate(self._cells.values())}
+            _topologies[key] = [
+                tuple(
+                    (k, positions[neighbor]) for k, neighbor in cell.connections.items()
+                )
+                for cell in self._cells.values()
+            ]
+
     def _connect_cells_2d(self) -> None: ...
 
     def _connect_cells_nd(self) -> None: ...
@@ -44,8 +44,21 @@ class PropertyLayer:
     #  in essence, this is just a numpy array with a name and fixed dimensions
     #  all other functionality seems redundant to me?
 
+    # set on the property layers of a forked model, which share their data with the parent until written
+    _mesa_copy_on_write = False
+
     @property
-    def data(self):  # noqa: D102
+    def data(self):
+        """The NumPy array holding the values of the layer.
+
+        The layers of a forked model share their data with the other forks until it is
+        written to. As the returned array can be written to, every access to ``data``
+        counts as a write and gives the layer its own copy. To read the values without
+        copying them, use cell attributes, ``select_cells``, or ``aggregate``.
+        """
+        if self._mesa_copy_on_write:
+            self._mesa_data = self._mesa_data.copy()
+            self._mesa_copy_on_write = False
         return self._mesa_data
 
     @data.setter
@@ -111,11 +124,11 @@ class PropertyLayer:
             condition: (Optional) A callable that returns a boolean array when applied to the data.
         """
         if condition is None:
-            np.copyto(self._mesa_data, value)  # In-place update
+            np.copyto(self.data, value)  # In-place update
         else:
             vectorized_condition = np.vectorize(condition)
             condition_result = vectorized_condition(self._mesa_data)
-            np.copyto(self._mesa_data, value, where=condition_result)
+            np.copyto(self.data, value, where=condition_result)
 
     def modify_cells(
         self,
@@ -153,6 +166,7 @@ class PropertyLayer:
             modified_data = vectorized_operation(self._mesa_data)
 
         self._mesa_data = np.where(condition_array, modified_data, self._mesa_data)
+        self._mesa_copy_on_write = False
 
     def select_cells(self, condition: Callable, return_list=True):
         """Find cells that meet a specified condition using NumPy's boolean indexing, in-place.
@@ -360,14 +374,14 @@ class HasPropertyLayers:
         # Apply conditions
         if conditions:
             for prop_name, condition in conditions.items():
-                prop_layer = self._mesa_property_layers[prop_name].data
+                prop_layer = self._mesa_property_layers[prop_name]._mesa_data
                 prop_mask = condition(prop_layer)
                 combined_mask = np.logical_and(combined_mask, prop_mask)
 
         # Apply extreme values
         if extreme_values:
             for property_name, mode in extreme_values.items():
-                prop_values = self._mesa_property_layers[property_name].data
+                prop_values = self._mesa_property_layers[property_name]._mesa_data
 
                 # Create a masked array using the combined_mask
                 masked_values = np.ma.masked_array(prop_values, mask=~combined_mask)
@@ -423,7 +437,7 @@ class PropertyDescriptor:
         self.layer: PropertyLayer = property_layer
 
     def __get__(self, instance: Cell, owner):  # noqa: D105
-        return self.layer.data[instance.coordinate]
+        return self.layer._mesa_data[instance.coordinate]
 
     def __set__(self, instance: Cell, value):  # noqa: D105
         self.layer.data[instance.coordinate] = value
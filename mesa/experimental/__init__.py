@@ -6,7 +6,9 @@ their APIs may change between releases without following semantic versioning.
 
 Current experimental modules:
     cell_space: Alternative API for discrete spaces with cell-centric functionality
+    columnar: Array backed storage of numeric agent attributes
     devs: Discrete event simulation system for scheduling events at arbitrary times
+    ensemble: Lockstep execution of replicates of a model in a single process
     mesa_signals: Reactive programming capabilities for tracking state changes
 
 Notes:
@@ -15,6 +17,20 @@ Notes:
     - Features graduate from experimental status once their APIs are stabilized
 """
 
-from mesa.experimental import continuous_space, devs, mesa_signals, meta_agents
+from mesa.experimental import (
+    columnar,
+    continuous_space,
+    devs,
+    ensemble,
+    mesa_signals,
+    meta_agents,
+)
 
-__all__ = ["continuous_space", "devs", "mesa_signals", "meta_agents"]
+__all__ = [
+    "columnar",
+    "continuous_space",
+    "devs",
+    "ensemble",
+    "mesa_signals",
+    "meta_agents",
+]
@@ -0,0 +1,15 @@
+"""Columnar, array backed storage of numeric agent attributes.
+
+Declaring numeric agent attributes as ``ColumnarAttribute`` makes the model store them
+in one NumPy array per attribute per agent class. This keeps ``agent.wealth`` working as
+before, while ``model.agents_by_type[MoneyAgent].get("wealth", view=True)`` returns a view
+on the underlying array and ``set`` and ``agg`` become vectorized NumPy operations.
+"""
+
+from mesa.experimental.columnar.columnar_store import (
+    AgentColumnStore,
+    ColumnarAttribute,
+    columnar_attributes,
+)
+
+__all__ = ["AgentColumnStore", "ColumnarAttribute", "columnar_attributes"]
@@ -0,0 +1,237 @@
+"""Array backed storage for numeric agent attributes.
+
+An agent class opts in by declaring its numeric attributes as ``ColumnarAttribute``
+descriptors. The model then keeps one ``AgentColumnStore`` per agent class, holding
+one NumPy array per declared attribute with one row per agent. Attribute access on
+the agent (``agent.wealth``) keeps working through the descriptor, while the AgentSet
+of that class (``model.agents_by_type[cls]``) can hand out the columns directly.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from mesa.agent import Agent
+
+__all__ = ["AgentColumnStore", "ColumnarAttribute", "columnar_attributes"]
+
+
+class ColumnarAttribute:
+    """Descriptor for a numeric agent attribute stored in a NumPy column.
+
+    Examples:
+        class MoneyAgent(Agent):
+            wealth = ColumnarAttribute(dtype=int, default=1)
+
+    Notes:
+        Values are stored in the instance dict until the agent is registered with the model,
+        and moved back into the instance dict when the agent is removed from the model. So
+        the attribute can be assigned before calling ``super().__init__`` and stays readable
+        after ``agent.remove()``. Reading it before it is assigned or the agent is registered
+        raises an AttributeError, except for agents created by ``Agent.create_agents``, which
+        are registered once all of them are created and read the default until then.
+
+    """
+
+    def __init__(self, dtype: Any = float, default: Any = 0):
+        """Initialize a ColumnarAttribute.
+
+        Args:
+            dtype: the numeric dtype of the column
+            default: the value of the attribute for agents that do not set it explicitly
+
+        """
+        self.dtype = np.dtype(dtype)
+        if not (
+            np.issubdtype(self.dtype, np.number) or np.issubdtype(self.dtype, np.bool_)
+        ):
+            raise TypeError(
+                f"ColumnarAttribute only supports numeric or boolean dtypes, got {self.dtype}"
+            )
+        self.default = default
+        self.name: str | None = None
+
+    def __set_name__(self, owner, name):  # noqa: D105
+        self.name = name
+
+    def __get__(self, instance, owner):  # noqa: D105
+        if instance is None:
+            return self
+        try:
+            store = instance._mesa_column_store
+        except AttributeError:
+            try:
+                return instance.__dict__[self.name]
+            except KeyError:
+                if _awaits_registration(instance):
+                    # the store sets the default once the agent is registered
+                    return self.default
+                raise AttributeError(
+                    f"'{type(instance).__name__}' object has no attribute '{self.name}'"
+                ) from None
+        return store._columns[self.name].item(store._index[instance])
+
+    def __set__(self, instance, value):  # noqa: D105
+        try:
+            store = instance._mesa_column_store
+        except AttributeError:
+            instance.__dict__[self.name] = value
+        else:
+            store._columns[self.name][store._index[instance]] = value
+
+
+def _awaits_registration(agent) -> bool:
+    """Check whether the agent is created within a bulk registration of its model."""
+    model = agent.__dict__.get("model")
+    return getattr(model, "_registration_buffer", None) is not None
+
+
+def columnar_attributes(agent_class: type) -> dict[str, ColumnarAttribute]:
+    """Return the ColumnarAttributes declared on the class and its base classes."""
+    attributes = {}
+    for klass in reversed(agent_class.__mro__):
+        for name, value in vars(klass).items():
+            if isinstance(value, ColumnarAttribute):
+                attributes[name] = value
+            else:
+                attributes.pop(name, None)  # overridden by something else
+    return attributes
+
+
+class AgentColumnStore:
+    """Columnar storage of the ColumnarAttributes of all agents of a single class in a model.
+
+    Rows are kept in the order in which agents were added. Removing an agent only marks
+    its row as dead; dead rows are compacted away the next time a column view is requested,
+    so removal is O(1) and the views always line up with the order of the agents.
+
+    Attributes:
+        agent_class (type): the agent class stored in this store
+        attributes (dict[str, ColumnarAttribute]): the columnar attributes of the agent class
+
+    """
+
+    def __init__(self, agent_class: type, n_agents: int = 100):
+        """Initialize an AgentColumnStore.
+
+        Args:
+            agent_class: the agent class to store the columnar attributes for
+            n_agents: the expected number of agents, used for the initial size of the arrays
+
+        """
+        self.agent_class = agent_class
+        self.attributes = columnar_attributes(agent_class)
+
+        self._columns: dict[str, np.ndarray] = {
+            name: np.empty(n_agents, dtype=attribute.dtype)
+            for name, attribute in self.attributes.items()
+        }
+        self._agents: list[Agent | None] = []  # row -> agent, None for dead rows
+        self._index: dict[Agent, int] = {}  # agent -> row
+        self._n_dead = 0
+
+    def __len__(self) -> int:
+        """Return the number of agents in the store."""
+        return len(self._index)
+
+    def __contains__(self, name: str) -> bool:
+        """Check if the store has a column for the attribute."""
+        return name in self._columns
+
+    def add(self, agent: Agent) -> None:
+        """Add an agent to the store.
+
+        Values assigned to columnar attributes before the agent was added are moved from
+        the instance dict into the columns.
+        """
+        row = len(self._agents)
+        if row >= self._capacity:
+            if self._n_dead:
+                self._compact()
+                row = len(self._agents)
+            if row >= self._capacity:
+                self._grow()
+
+        agent_dict = agent.__dict__
+        for name, attribute in self.attributes.items():
+            self._columns[name][row] = agent_dict.pop(name, attribute.default)
+
+        self._agents.append(agent)
+        self._index[agent] = row
+        agent._mesa_column_store = self
+
+    def add_agents(self, agents: list[Agent]) -> None:
+        """Add multiple agents to the store in one operation."""
+        if self._n_dead:
+            self._compact()
+        start = len(self._agents)
+        stop = start + len(agents)
+        if stop > self._capacity:
+            self._grow(stop)
+
+        for name, attribute in self.attributes.items():
+            self._columns[name][start:stop] = [
+                agent.__dict__.pop(name, attribute.default) for agent in agents
+            ]
+
+        self._agents.extend(agents)
+        self._index.update(zip(agents, range(start, stop)))
+        for agent in agents:
+            agent._mesa_column_store = self
+
+    def remove(self, agent: Agent) -> None:
+        """Remove an agent from the store.
+
+        The current values of the agent are moved back into its instance dict.
+        """
+        row = self._index.pop(agent)
+        self._agents[row] = None
+        self._n_dead += 1
+
+        del agent._mesa_column_store
+        for name, column in self._columns.items():
+            agent.__dict__[name] = column.item(row)
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a view on the column of the attribute with one entry per agent.
+
+        Args:
+            name: the name of the columnar attribute
+
+        Notes:
+            The view shares memory with the store, so writing to it changes the attribute
+            of the agents. The view is only valid until agents are added to or removed from
+            the store.
+
+        """
+        if self._n_dead:
+            self._compact()
+        return self._columns[name][: len(self._agents)]
+
+    @property
+    def _capacity(self) -> int:
+        return next(iter(self._columns.values())).shape[0] if self._columns else 0
+
+    def _grow(self, n_required: int = 0) -> None:
+        n = max(round(0.2 * self._capacity), 100)  # we add 20%
+        n = max(n, n_required - self._capacity)
+        for name, column in self._columns.items():
+            self._columns[name] = np.concatenate(
+                [column, np.empty(n, dtype=column.dtype)]
+            )
+
+    def _compact(self) -> None:
+        n = len(self._agents)
+        alive = np.fromiter(
+            (agent is not None for agent in self._agents), dtype=bool, count=n
+        )
+        n_alive = n - self._n_dead
+        for column in self._columns.values():
+            column[:n_alive] = column[:n][alive]
+
+        self._agents = [agent for agent in self._agents if agent is not None]
+        self._index = dict(zip(self._agents, range(n_alive)))
+        self._n_dead = 0
@@ -161,6 +161,28 @@ class ContinuousSpace:
         self._n_agents -= 1
         self.agent_positions = self._agent_positions[0 : self._n_agents]
 
+    def _remove_agents(self, agents: Iterable[Agent]) -> None:
+        """Remove multiple agents from the space in one operation.
+
+        This method is automatically called by ContinuousSpaceAgent._remove_many.
+
+        """
+        indices = [self._agent_to_index.pop(agent) for agent in agents]
+        keep = np.ones(self._n_agents, dtype=bool)
+        keep[indices] = False
+        n_remaining = self._n_agents - len(indices)
+
+        # we move all remaining data up in one go and rebuild the indices
+        self._agent_positions[:n_remaining] = self._agent_positions[: self._n_agents][
+            keep
+        ]
+        self.active_agents[:] = compress(self.active_agents, keep)
+        self._agent_to_index = dict(zip(self.active_agents, range(n_remaining)))
+        self._index_to_agent = dict(enumerate(self.active_agents))
+
+        self._n_agents = n_remaining
+        self.agent_positions = self._agent_positions[0 : self._n_agents]
+
     def calculate_difference_vector(self, point: np.ndarray, agents=None) -> np.ndarray:
         """Calculate the difference vector between the point and all agenents.
 
@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
+from collections import defaultdict
 from itertools import compress
-from typing import Protocol
+from typing import TYPE_CHECKING, Protocol
 
 import numpy as np
 
 from mesa.agent import Agent
 from mesa.experimental.continuous_space import ContinuousSpace
 
+if TYPE_CHECKING:
+    from mesa.model import Model
+
 
 class HasPositionProtocol(Protocol):
     """Protocol for continuous space position holders."""
@@ -73,6 +77,21 @@ class ContinuousSpaceAgent(Agent):
         self._mesa_index = None
         self.space = None
 
+    @classmethod
+    def _remove_many(cls, model: Model, agents: list[ContinuousSpaceAgent]) -> None:
+        """Remove multiple agents from the model and continuous space in one operation."""
+        super()._remove_many(model, agents)
+
+        agents_by_space = defaultdict(list)
+        for agent in agents:
+            agents_by_space[agent.space].append(agent)
+        for space, space_agents in agents_by_space.items():
+            space._remove_agents(space_agents)
+
+        for agent in agents:
+            agent._mesa_index = None
+            agent.space = None
+
     def get_neighbors_in_radius(
         self, radius: float | int = 1
     ) -> tuple[list, np.ndarray]:
@@ -0,0 +1,16 @@
+"""Lockstep execution of replicates of a model in a single process.
+
+An ``Ensemble`` creates one model per seed and steps all replicates together. Grids with
+the same class, dimensions, and torus are connected only once for the whole ensemble, and
+property layers and columnar agent attributes can be accessed as NumPy arrays with one row
+per replicate, so vectorized logic can work on all replicates at once::
+
+    ensemble = Ensemble(Sugarscape, rng=range(100), parameters={"width": 50})
+    for _ in range(10):
+        ensemble.step()
+        sugar = ensemble.property_layer("sugar")  # shape (100, 50, 50)
+"""
+
+from mesa.experimental.ensemble.ensemble import Ensemble
+
+__all__ = ["Ensemble"]
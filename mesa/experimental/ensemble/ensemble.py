@@ -0,0 +1,218 @@
+"""Replicates of a model that are created and stepped in lockstep.
+
+Running many stochastic replicates of the same parameter set as independent models pays
+the Python overhead of every replicate separately. An ``Ensemble`` keeps all replicates in
+one process and
+
+- connects grids with the same class, dimensions, and torus only once; all other replicates
+  copy the connections of their cells from that first grid.
+- moves the data of each property layer into a single array with one row per replicate, so
+  vectorized code can update the layer of every replicate in one NumPy operation.
+- gathers (columnar) agent attributes into one array with one row per replicate and writes
+  them back in bulk.
+
+Custom lockstep logic, such as a vectorized environment update, can be added by
+subclassing ``Ensemble`` and overriding ``step``.
+"""
+
+from __future__ import annotations
+
+import inspect
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from mesa.agent import AgentSet
+from mesa.discrete_space.grid import _shared_topology
+from mesa.discrete_space.property_layer import HasPropertyLayers, PropertyLayer
+
+if TYPE_CHECKING:
+    from mesa.agent import Agent
+    from mesa.model import Model
+
+__all__ = ["Ensemble"]
+
+SeedLike = int | np.integer | Sequence[int] | np.random.SeedSequence
+
+
+class Ensemble:
+    """Replicates of a model, one per seed, that are stepped together.
+
+    Attributes:
+        model_cls (type[Model]): the class of the replicates
+        parameters (dict[str, Any]): the keyword arguments passed to every replicate
+        models (list[Model]): the replicates, in the order of the seeds
+
+    """
+
+    def __init__(
+        self,
+        model_cls: type[Model],
+        rng: Iterable[SeedLike | None],
+        parameters: Mapping[str, Any] | None = None,
+    ) -> None:
+        """Create the replicates of an ensemble.
+
+        Args:
+            model_cls: the model class to replicate
+            rng: one seed per replicate, passed as ``seed`` if the model class accepts it and as ``rng`` otherwise
+            parameters: keyword arguments passed to every replicate
+
+        """
+        self.model_cls = model_cls
+        self.parameters = dict(parameters) if parameters is not None else {}
+
+        rng_kwarg_name = "rng"
+        if "seed" in inspect.signature(model_cls).parameters:
+            rng_kwarg_name = "seed"
+
+        with _shared_topology():
+            self.models: list[Model] = [
+                model_cls(**self.parameters, **{rng_kwarg_name: seed}) for seed in rng
+            ]
+
+        # stacked layer data and the rows handed to the layers of the replicates, by layer name
+        self._layers: dict[str, tuple[np.ndarray, list[np.ndarray]]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of replicates."""
+        return len(self.models)
+
+    def __iter__(self) -> Iterator[Model]:
+        """Iterate over the replicates."""
+        return iter(self.models)
+
+    def __getitem__(self, index: int) -> Model:
+        """Return the replicate at index."""
+        return self.models[index]
+
+    @property
+    def running(self) -> bool:
+        """Whether any of the replicates is still running."""
+        return any(model.running for model in self.models)
+
+    def step(self) -> None:
+        """Step all replicates that are still running once."""
+        for model in self.models:
+            if model.running:
+                model.step()
+
+    def run_model(self, max_steps: int | None = None) -> None:
+        """Step the replicates until none of them is running.
+
+        Args:
+            max_steps: the maximum number of steps; if None, there is no maximum
+
+        """
+        n_steps = 0
+        while self.running and (max_steps is None or n_steps < max_steps):
+            self.step()
+            n_steps += 1
+
+    def property_layer(self, name: str) -> np.ndarray:
+        """Return the data of a property layer with one row per replicate.
+
+        On the first call, the data of the layer in every replicate is moved into a single array,
+        after which the layer of each replicate is a view on its row of that array. Writing to the
+        returned array therefore changes the layers of the replicates, and vice versa.
+
+        Args:
+            name: the name of the property layer
+
+        Returns:
+            an array of shape ``(len(ensemble), *layer.dimensions)``
+
+        Raises:
+            KeyError: if a replicate has no space with a property layer of this name
+
+        Notes:
+            Operations that replace the data of a layer instead of writing to it, like
+            ``PropertyLayer.modify_cells``, detach it from the stacked array. The next call
+            stacks the layers again, so arrays returned earlier no longer reflect the replicates.
+
+        """
+        layers = [_find_layer(model, name) for model in self.models]
+        try:
+            stacked, rows = self._layers[name]
+        except KeyError:
+            pass
+        else:
+            if all(layer._mesa_data is row for layer, row in zip(layers, rows)):
+                return stacked
+
+        stacked = np.stack([layer._mesa_data for layer in layers])
+        rows = list(stacked)
+        for layer, row in zip(layers, rows):
+            layer._mesa_data = row
+            layer._mesa_copy_on_write = False
+        self._layers[name] = stacked, rows
+        return stacked
+
+    def get(self, agent_type: type[Agent], attr_name: str) -> np.ndarray:
+        """Return an attribute of all agents of a type with one row per replicate.
+
+        Args:
+            agent_type: the agent class, as used in ``model.agents_by_type``
+            attr_name: the name of the attribute
+
+        Returns:
+            an array of shape ``(len(ensemble), n_agents)``, with the agents of each row in the order
+            of ``model.agents_by_type[agent_type]``
+
+        Raises:
+            ValueError: if the replicates do not have the same number of agents of this type
+
+        Notes:
+            For columnar attributes, the values are copied from the column stores of the replicates
+            in one operation per replicate. The returned array is a copy, use ``set`` to write values back.
+
+        """
+        columns = [
+            _agents_of_type(model, agent_type).get(attr_name, view=True)
+            for model in self.models
+        ]
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError(
+                f"The replicates have different numbers of {agent_type.__name__} agents"
+            )
+        return np.stack(columns) if columns else np.empty((0, 0))
+
+    def set(self, agent_type: type[Agent], attr_name: str, values: np.ndarray) -> None:
+        """Set an attribute of all agents of a type from an array with one row per replicate.
+
+        Args:
+            agent_type: the agent class, as used in ``model.agents_by_type``
+            attr_name: the name of the attribute
+            values: an array of shape ``(len(ensemble), n_agents)``, as returned by ``get``
+
+        """
+        if len(values) != len(self.models):
+            raise ValueError(
+                f"Expected one row per replicate ({len(self.models)}), got {len(values)}"
+            )
+        for model, row in zip(self.models, values):
+            store = model._column_stores.get(agent_type)
+            if store is not None and attr_name in store:
+                store.column(attr_name)[:] = row
+            else:
+                for agent, value in zip(_agents_of_type(model, agent_type), row):
+                    setattr(agent, attr_name, value)
+
+
+def _find_layer(model: Model, name: str) -> PropertyLayer:
+    """Return the property layer called name of the first space of the model that has one."""
+    for value in vars(model).values():
+        if isinstance(value, HasPropertyLayers):
+            layer = value._mesa_property_layers.get(name)
+            if layer is not None:
+                return layer
+    raise KeyError(f"The model has no property layer called {name}")
+
+
+def _agents_of_type(model: Model, agent_type: type[Agent]) -> AgentSet:
+    """Return the agents of a type, or an empty AgentSet if the model never created any."""
+    try:
+        return model.agents_by_type[agent_type]
+    except KeyError:
+        return AgentSet([], random=model.random)
@@ -5,8 +5,8 @@ It is modeled on the default `logging approach that comes with Python <https://d
 
 """
 
-import inspect
 import logging
+import sys
 from functools import wraps
 from logging import DEBUG, INFO
 
@@ -18,6 +18,7 @@ __all__ = [
     "function_logger",
     "get_module_logger",
     "get_rootlogger",
+    "install_method_loggers",
     "log_to_stderr",
     "method_logger",
 ]
@@ -33,9 +34,7 @@ def create_module_logger(name: str | None = None):
 
     """
     if name is None:
-        frm = inspect.stack()[1]
-        mod = inspect.getmodule(frm[0])
-        name = mod.__name__
+        name = sys._getframe(1).f_globals["__name__"]
     logger = logging.getLogger(f"{LOGGER_NAME}.{name}")
 
     _module_loggers[name] = logger
@@ -59,6 +58,9 @@ def get_module_logger(name: str):
 
 _rootlogger = None
 _module_loggers = {}
+# methods decorated with method_logger and the function that adds logging to them
+_method_loggers = []
+_method_loggers_installed = False
 _logger = get_module_logger(__name__)
 
 
@@ -93,25 +95,38 @@ class MESAColorFormatter(logging.Formatter):
 def method_logger(name: str):
     """Decorator for adding logging to a method.
 
+    The decorator returns the method as is and registers it. The logging wrapper is installed on
+    the class of the method by install_method_loggers, which log_to_stderr calls, so methods
+    cost nothing extra while logging is not turned on.
+
     Args:
         name (str): The name of the module in which the method being decorated is located
 
     """
     logger = get_module_logger(name)
-    classname = inspect.getouterframes(inspect.currentframe())[1][3]
 
     def real_decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # hack, because log is applied to methods, we can get
-            # object instance as first arguments in args
-            logger.debug(
-                f"calling {classname}.{func.__name__} with {args[1::]} and {kwargs}"
-            )
-            res = func(*args, **kwargs)
-            return res
-
-        return wrapper
+        def add_logging(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                # hack, because log is applied to methods, we can get
+                # object instance as first arguments in args
+                if logger.isEnabledFor(DEBUG):
+                    logger.debug(
+                        "calling %s with %s and %s",
+                        func.__qualname__,
+                        args[1:],
+                        kwargs,
+                        stacklevel=2,
+                    )
+                return func(*args, **kwargs)
+
+            return wrapper
+
+        if _method_loggers_installed:
+            return add_logging(func)
+        _method_loggers.append((func, add_logging))
+        return func
 
     return real_decorator
 
@@ -128,15 +143,41 @@ def function_logger(name):
     def real_decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            logger.debug(f"calling {func.__name__} with {args} and {kwargs}")
-            res = func(*args, **kwargs)
-            return res
+            if logger.isEnabledFor(DEBUG):
+                logger.debug(
+                    "calling %s with %s and %s",
+                    func.__name__,
+                    args,
+                    kwargs,
+                    stacklevel=2,
+                )
+            return func(*args, **kwargs)
 
         return wrapper
 
     return real_decorator
 
 
+def install_method_loggers():
+    """Install the logging wrappers of all methods decorated with method_logger.
+
+    log_to_stderr calls this function. Call it yourself if you set up handlers for the MESA logger
+    in another way. Methods decorated afterwards get their logging wrapper right away.
+
+    """
+    global _method_loggers_installed  # noqa: PLW0603
+
+    _method_loggers_installed = True
+    while _method_loggers:
+        func, add_logging = _method_loggers.pop()
+        *path, name = func.__qualname__.split(".")
+        owner = sys.modules[func.__module__]
+        for attribute in path:
+            owner = getattr(owner, attribute, None)
+        if owner is not None and vars(owner).get(name) is func:
+            setattr(owner, name, add_logging(func))
+
+
 def get_rootlogger():
     """Returns root logger used by MESA.
 
@@ -167,6 +208,7 @@ def log_to_stderr(level: int | None = None, pass_root_logger_level: bool = False
     if not level:
         level = DEFAULT_LEVEL
 
+    install_method_loggers()
     logger = get_rootlogger()
 
     # avoid creation of multiple stream handlers for logging to console
@@ -7,18 +7,25 @@ Core Objects: Model
 # Remove this __future__ import once the oldest supported Python is 3.10
 from __future__ import annotations
 
+import contextlib
 import random
 import sys
-from collections.abc import Sequence
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Sequence
 
 # mypy
-from typing import Any
+from os import PathLike
+from typing import Any, Self
 
 import numpy as np
 
-from mesa.agent import Agent, AgentSet
+from mesa.agent import Agent, AgentSet, _HardKeyAgentSet
+from mesa.checkpoint import fork_model, load_checkpoint, save_checkpoint
+from mesa.experimental.columnar import AgentColumnStore, columnar_attributes
 from mesa.experimental.devs import Simulator
-from mesa.mesa_logging import create_module_logger, method_logger
+from mesa.mesa_logging import DEBUG, INFO, create_module_logger, method_logger
+from mesa.profiling import StepProfiler, _active_profilers
+from mesa.termination import TerminationCriterion, should_terminate
 
 SeedLike = int | np.integer | Sequence[int] | np.random.SeedSequence
 RNGLike = np.random.Generator | np.random.BitGenerator
@@ -82,6 +89,7 @@ class Model:
 
         # Track if a simulator is controlling time
         self._simulator: Simulator | None = None
+        self._profiler: StepProfiler | None = None
 
         if (seed is not None) and (rng is not None):
             raise ValueError("you have to pass either rng or seed, not both")
@@ -112,14 +120,26 @@ class Model:
         self._user_step = self.step
         self.step = self._wrapped_step
 
+        # unique_ids of agents are allocated per model, starting from 1
+        self._agent_ids = _AgentIdAllocator()
+
         # setup agent registration data structures
-        self._agents = {}  # the hard references to all agents in the model
+        # these agentsets hold hard references to the agents in the model
         self._agents_by_type: dict[
             type[Agent], AgentSet
         ] = {}  # a dict with an agentset for each class of agents
-        self._all_agents = AgentSet(
+        self._agentsets_by_class: dict[
+            type[Agent], list[AgentSet]
+        ] = {}  # the agentsets of each class of agents and its subclasses
+        self._all_agents = _HardKeyAgentSet(
             [], random=self.random
         )  # an agenset with all agents
+        self._column_stores: dict[
+            type[Agent], AgentColumnStore
+        ] = {}  # a dict with a column store for each class of agents with columnar attributes
+        self._registration_buffer: list[Agent] | None = (
+            None  # agents waiting for bulk registration
+        )
 
     def _wrapped_step(self, *args: Any, **kwargs: Any) -> None:
         """Automatically increments time and steps after calling the user's step method."""
@@ -129,11 +149,33 @@ class Model:
         if self._simulator is None:
             self.time += self._step_duration
 
-        _mesa_logger.info(
-            f"calling model.step for step {self.steps} at time {self.time}"
-        )
+        if _mesa_logger.isEnabledFor(INFO):
+            _mesa_logger.info(
+                "calling model.step for step %s at time %s", self.steps, self.time
+            )
         # Call the original user-defined step method
-        self._user_step(*args, **kwargs)
+        if self._profiler is not None:
+            self._profiler._profile_step(self._user_step, args, kwargs)
+        elif _active_profilers:
+            # stepped within the step of a profiled model, which should not profile this model
+            _active_profilers.append(None)
+            try:
+                self._user_step(*args, **kwargs)
+            finally:
+                _active_profilers.pop()
+        else:
+            self._user_step(*args, **kwargs)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return the state of the model for pickling, without its profiler."""
+        state = self.__dict__.copy()
+        state["_profiler"] = None
+        return state
+
+    @property
+    def _agents(self) -> dict[Agent, Any]:
+        """The hard references to all agents in the model."""
+        return self._all_agents._agents
 
     @property
     def agents(self) -> AgentSet:
@@ -169,24 +211,83 @@ class Model:
             is no need to use this if you are subclassing Agent and calling its
             super in the ``__init__`` method.
         """
-        self._agents[agent] = None
+        if self._registration_buffer is not None:
+            self._registration_buffer.append(agent)
+            return
 
         # because AgentSet requires model, we cannot use defaultdict
         # tricks with a function won't work because model then cannot be pickled
         try:
-            self._agents_by_type[type(agent)].add(agent)
+            agentset = self._agents_by_type[type(agent)]
         except KeyError:
-            self._agents_by_type[type(agent)] = AgentSet(
-                [
-                    agent,
-                ],
-                random=self.random,
+            agentset = self._new_agent_type(type(agent))
+        agentset.add(agent)
+        self._all_agents.add(agent)
+
+        if (store := self._column_stores.get(type(agent))) is not None:
+            store.add(agent)
+
+        if _mesa_logger.isEnabledFor(DEBUG):
+            _mesa_logger.debug(
+                "registered %s with agent_id %s",
+                agent.__class__.__name__,
+                agent.unique_id,
             )
 
-        self._all_agents.add(agent)
-        _mesa_logger.debug(
-            f"registered {agent.__class__.__name__} with agent_id {agent.unique_id}"
+    def register_agents(self, agents: Iterable[Agent]):
+        """Register multiple agents with the model in one operation.
+
+        Args:
+            agents: The agents to register.
+
+        Notes:
+            This method is used by ``Agent.create_agents``.
+        """
+        agents = list(agents)
+        agents_by_type = defaultdict(list)
+        for agent in agents:
+            agents_by_type[type(agent)].append(agent)
+
+        for agent_type, group in agents_by_type.items():
+            try:
+                agentset = self._agents_by_type[agent_type]
+            except KeyError:
+                agentset = self._new_agent_type(agent_type)
+            agentset._add_many(group)
+            if (store := self._column_stores.get(agent_type)) is not None:
+                store.add_agents(group)
+        self._all_agents._add_many(agents)
+
+        _mesa_logger.debug("registered %s agents", len(agents))
+
+    @contextlib.contextmanager
+    def _deferred_registration(self) -> Iterator[None]:
+        """Buffer the agents created within the context and register them in bulk on exit."""
+        if self._registration_buffer is not None:
+            # already buffering, the outermost context registers the agents
+            yield
+            return
+
+        self._registration_buffer = buffer = []
+        try:
+            yield
+        finally:
+            self._registration_buffer = None
+            self.register_agents(buffer)
+
+    def _new_agent_type(self, agent_type: type[Agent]) -> AgentSet:
+        """Set up the registration data structures for a new agent type."""
+        agentset = self._agents_by_type[agent_type] = _HardKeyAgentSet(
+            [], random=self.random
         )
+        for cls in agent_type.__mro__:
+            if issubclass(cls, Agent):
+                self._agentsets_by_class.setdefault(cls, []).append(agentset)
+        if columnar_attributes(agent_type):
+            store = AgentColumnStore(agent_type)
+            self._column_stores[agent_type] = store
+            agentset._column_store = store
+        return agentset
 
     def deregister_agent(self, agent):
         """Deregister the agent with the model.
@@ -198,18 +299,118 @@ class Model:
             This method is called automatically by ``Agent.remove``
 
         """
-        del self._agents[agent]
-        self._agents_by_type[type(agent)].remove(agent)
+        if self._registration_buffer and agent not in self._all_agents:
+            # the agent was created within Agent.create_agents and is not registered yet
+            try:
+                self._registration_buffer.remove(agent)
+            except ValueError:
+                raise KeyError(agent) from None
+            return
+
         self._all_agents.remove(agent)
-        _mesa_logger.debug(f"deregistered agent with agent_id {agent.unique_id}")
+        self._agents_by_type[type(agent)].remove(agent)
+        if (store := self._column_stores.get(type(agent))) is not None:
+            store.remove(agent)
+        if _mesa_logger.isEnabledFor(DEBUG):
+            _mesa_logger.debug("deregistered agent with agent_id %s", agent.unique_id)
+
+    def deregister_agents(self, agents: Iterable[Agent]):
+        """Deregister multiple agents with the model in one operation.
+
+        Args:
+            agents: The agents to deregister.
+
+        Raises:
+            KeyError: If any of the agents is not registered with the model. In this case,
+                      no agent is deregistered.
 
-    def run_model(self) -> None:
+        Notes:
+            This method is called automatically by ``Model.remove_agents``.
+
+        """
+        agents = list(agents)
+        buffered = set(self._registration_buffer or ())
+        agents_by_type = defaultdict(list)
+        unbuffered = set()
+        for agent in agents:
+            if agent in buffered:
+                unbuffered.add(agent)
+            elif agent not in self._all_agents:
+                raise KeyError(agent)
+            else:
+                agents_by_type[type(agent)].append(agent)
+
+        if unbuffered:
+            # agents created within Agent.create_agents that are not registered yet
+            self._registration_buffer[:] = [
+                agent for agent in self._registration_buffer if agent not in unbuffered
+            ]
+            agents = [agent for agent in agents if agent not in unbuffered]
+
+        self._all_agents.remove_many(agents)
+        for agent_type, group in agents_by_type.items():
+            self._agents_by_type[agent_type].remove_many(group)
+            if (store := self._column_stores.get(agent_type)) is not None:
+                for agent in group:
+                    store.remove(agent)
+        _mesa_logger.debug("deregistered %s agents", len(agents))
+
+    def remove_agents(self, agents: Iterable[Agent] | np.ndarray) -> None:
+        """Remove multiple agents from the model in one operation.
+
+        Args:
+            agents: The agents to remove, or a boolean mask with one entry per agent in ``model.agents``.
+                    Agents that are not registered with the model are ignored.
+
+        Notes:
+            Agents are removed per agent class through ``Agent._remove_many``, which
+            also removes the agents from their cell or continuous space in bulk. For agent classes
+            that override ``remove`` without also overriding ``_remove_many``, ``remove`` is
+            called on each agent instead.
+
+        """
+        registered = self._all_agents
+        buffered = set(self._registration_buffer or ())
+        agents_by_type = defaultdict(list)
+        for agent in registered._from_mask(agents):
+            if agent in registered or agent in buffered:
+                agents_by_type[type(agent)].append(agent)
+
+        for agent_type, group in agents_by_type.items():
+            # remove methods of earlier groups might have removed agents of this group
+            buffered = set(self._registration_buffer or ())
+            group = [  # noqa: PLW2901
+                agent for agent in group if agent in registered or agent in buffered
+            ]
+            if _supports_bulk_removal(agent_type):
+                agent_type._remove_many(self, group)
+            else:
+                for agent in group:
+                    agent.remove()
+
+    def run_model(
+        self,
+        termination: TerminationCriterion
+        | Iterable[TerminationCriterion]
+        | None = None,
+    ) -> None:
         """Run the model until the end condition is reached.
 
         Overload as needed.
+
+        Args:
+            termination: optional termination criteria, see mesa.termination. The model stops
+                         as soon as any of them is met after a step, by setting ``running`` to False.
         """
+        if termination is not None and not isinstance(
+            termination, TerminationCriterion
+        ):
+            termination = list(termination)
+
         while self.running:
             self.step()
+            if termination is not None and should_terminate(self, termination):
+                self.running = False
 
     def step(self) -> None:
         """A single step. Fill in here."""
@@ -245,11 +446,111 @@ class Model:
         """Remove all agents from the model.
 
         Notes:
-            This method calls agent.remove for all agents in the model. If you need to remove agents from
-            e.g., a SingleGrid, you can either explicitly implement your own agent.remove method or clean this up
-            near where you are calling this method.
+            This method removes all agents through ``remove_agents``, so agent.remove is called for all agents
+            of classes that override it. If you need to remove agents from e.g., a SingleGrid, you can either
+            explicitly implement your own agent.remove method or clean this up near where you are calling this method.
+
+        """
+        self.remove_agents(list(self._all_agents))
+
+    def fork(self, n_forks: int | None = None) -> Self | list[Self]:
+        """Fork the model into independent branches, e.g., for what-if scenarios.
+
+        The model is serialized once, after which each fork is restored from the same snapshot. Forks
+        share read-only NumPy arrays, such as property layers whose data has been made read-only with
+        ``layer.data.setflags(write=False)``, with the model. Writable property layers are shared
+        between the forks and only copied by a fork when it first writes to them. All other state is
+        copied, and the connections between cells are copied as is instead of being recomputed.
+
+        Forks continue the random number streams of the model. Use reset_rng and reset_randomizer
+        to give each fork its own streams. Forks are ordinary models, so they can be run in child
+        processes started with ``multiprocessing.get_context("fork")``, which share the memory of
+        the parent until it is written to.
+
+        Args:
+            n_forks: the number of forks to create. If None, a single fork is returned.
+
+        Returns:
+            a forked model, or a list of n_forks forked models
+
+        """
+        forks = fork_model(self, 1 if n_forks is None else n_forks)
+        return forks[0] if n_forks is None else forks
+
+    def checkpoint(self, path: str | PathLike) -> None:
+        """Write a binary checkpoint of the model to path.
+
+        The checkpoint holds the complete model state, including agents, spaces, property layers,
+        random number generators, and scheduled events. Agents and cells are stored as one column per
+        attribute and the connections between cells are stored as is, so restoring a checkpoint does not
+        recompute the structure of the space.
+
+        Args:
+            path: the file to write the checkpoint to
 
         """
-        # we need to wrap keys in a list to avoid a RunTimeError: dictionary changed size during iteration
-        for agent in list(self._agents.keys()):
-            agent.remove()
+        save_checkpoint(self, path)
+
+    @classmethod
+    def restore(cls, path: str | PathLike) -> Self:
+        """Restore a model from a checkpoint written by Model.checkpoint.
+
+        Args:
+            path: the file to read the checkpoint from
+
+        Returns:
+            the restored model
+
+        Raises:
+            TypeError: if the checkpoint does not hold an instance of this class
+
+        """
+        model = load_checkpoint(path)
+        if not isinstance(model, cls):
+            raise TypeError(
+                f"Checkpoint holds a {type(model).__name__}, not a {cls.__name__}"
+            )
+        return model
+
+
+class _AgentIdAllocator:
+    """Allocates the unique_ids of the agents in a model, counting from 1.
+
+    Blocks of consecutive ids can be reserved for agents that are created in bulk, each of
+    which is then assigned its id from the block before it is constructed.
+    """
+
+    __slots__ = ["_next_id", "_pending"]
+
+    def __init__(self, start: int = 1):
+        self._next_id = start
+        # the agent class and id assigned to the next agent of that class, see for_agent
+        self._pending: tuple[type[Agent], int] | None = None
+
+    def __next__(self) -> int:
+        unique_id = self._next_id
+        self._next_id += 1
+        return unique_id
+
+    def for_agent(self, agent: Agent) -> int:
+        """Return the id for a new agent, which is the assigned one if it is of the assigned class."""
+        pending = self._pending
+        if pending is not None and type(agent) is pending[0]:
+            self._pending = None
+            return pending[1]
+        return next(self)
+
+    def reserve(self, n: int) -> range:
+        """Reserve a block of n consecutive ids."""
+        start = self._next_id
+        self._next_id += n
+        return range(start, start + n)
+
+
+def _supports_bulk_removal(agent_type: type[Agent]) -> bool:
+    """Check whether _remove_many of the agent class is at least as specific as its remove."""
+
+    def defining_class(name):
+        return next(klass for klass in agent_type.__mro__ if name in vars(klass))
+
+    return issubclass(defining_class("_remove_many"), defining_class("remove"))
@@ -0,0 +1,371 @@
+"""Opt-in per-step profiling of models.
+
+A StepProfiler records for every step of a model
+
+- the wall time of the step
+- the wall time and number of agents activated through ``AgentSet.do``, ``shuffle_do``, and
+  ``map``, by agent type and method name
+- the time spent in ``DataCollector.collect``
+- the time spent in, and number of calls to, space operations such as placing, moving, and
+  removing agents, neighborhood lookups, and random cell selection
+
+Records are kept in a ring buffer and can be passed to a callback as well::
+
+    profiler = StepProfiler(model, buffer_size=100)
+    with profiler:
+        for _ in range(1000):
+            model.step()
+    profiler.to_dataframe()
+
+Profiling costs next to nothing while no profiler is enabled: the model and the AgentSet
+activation methods check a single attribute or list, and DataCollector.collect and the space
+operations are only wrapped while a profiler is enabled.
+
+Notes:
+    A profiler only records the steps of its own model. Models stepped within a profiled
+    step are not profiled, unless they have a profiler of their own. Copies of a model,
+    such as those made by pickling, checkpointing, or forking it, are not profiled.
+
+    Activation times include the time of everything the activated agents do, including space
+    operations and nested activations. Space operations and collection are timed exclusively,
+    so a space operation inside DataCollector.collect counts towards collect only.
+
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    from mesa.agent import Agent
+    from mesa.model import Model
+
+__all__ = ["StepProfiler", "StepRecord"]
+
+# the profilers of the models that are currently stepping, innermost last. Models without a
+# profiler that step within the step of a profiled model add None, so they are not profiled.
+_active_profilers: list[StepProfiler | None] = []
+
+# operations that are wrapped while a profiler is enabled, by module, class, and method name
+_TIMED_OPERATIONS = {
+    "collect": [("mesa.datacollection", "DataCollector", ["collect"])],
+    "space": [
+        (
+            "mesa.discrete_space.cell",
+            "Cell",
+            ["add_agent", "remove_agent", "remove_agents"],
+        ),
+        (
+            "mesa.discrete_space.cell_collection",
+            "CellCollection",
+            ["select", "select_random_agent", "select_random_cell"],
+        ),
+        (
+            "mesa.discrete_space.discrete_space",
+            "DiscreteSpace",
+            ["select_random_empty_cell"],
+        ),
+        ("mesa.discrete_space.grid", "Grid", ["select_random_empty_cell"]),
+        (
+            "mesa.experimental.continuous_space.continuous_space",
+            "ContinuousSpace",
+            [
+                "_add_agent",
+                "_remove_agent",
+                "_remove_agents",
+                "calculate_distances",
+                "get_agents_in_radius",
+                "get_k_nearest_agents",
+            ],
+        ),
+        (
+            "mesa.space",
+            "_Grid",
+            [
+                "get_neighborhood",
+                "get_neighbors",
+                "iter_neighbors",
+                "move_agent",
+                "move_to_empty",
+                "swap_pos",
+            ],
+        ),
+        ("mesa.space", "SingleGrid", ["place_agent", "remove_agent"]),
+        (
+            "mesa.space",
+            "MultiGrid",
+            ["iter_neighbors", "place_agent", "remove_agent"],
+        ),
+        (
+            "mesa.space",
+            "_HexGrid",
+            ["get_neighborhood", "get_neighbors", "iter_neighbors"],
+        ),
+        (
+            "mesa.space",
+            "ContinuousSpace",
+            ["get_neighbors", "move_agent", "place_agent", "remove_agent"],
+        ),
+        (
+            "mesa.space",
+            "NetworkGrid",
+            [
+                "get_neighborhood",
+                "get_neighbors",
+                "move_agent",
+                "place_agent",
+                "remove_agent",
+            ],
+        ),
+    ],
+}
+
+# the original methods of the wrapped operations, set while a profiler is enabled
+_originals: list[tuple[type, str, Callable]] = []
+_n_enabled = 0
+
+
+def _timed(function: Callable, category: str) -> Callable:
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        if not _active_profilers or (profiler := _active_profilers[-1]) is None:
+            return function(*args, **kwargs)
+        return profiler._time(category, function, args, kwargs)
+
+    return timed
+
+
+def _install_wrappers() -> None:
+    for category, operations in _TIMED_OPERATIONS.items():
+        for module_name, class_name, names in operations:
+            cls = getattr(importlib.import_module(module_name), class_name)
+            for name in names:
+                original = cls.__dict__[name]
+                _originals.append((cls, name, original))
+                setattr(cls, name, _timed(original, category))
+
+
+def _uninstall_wrappers() -> None:
+    while _originals:
+        cls, name, original = _originals.pop()
+        setattr(cls, name, original)
+
+
+def _new_activation() -> list:
+    """Return the number of activations and their wall time, a module level function so it can be pickled."""
+    return [0, 0.0]
+
+
+@dataclass(slots=True)
+class StepRecord:
+    """The timings of a single step.
+
+    Attributes:
+        step: the step number of the model
+        duration: the wall time of the step in seconds
+        activations: the number of agents activated and the wall time in seconds, by agent type and
+            method name
+        collect: the wall time spent in DataCollector.collect in seconds
+        space: the wall time spent in space operations in seconds
+        space_calls: the number of calls to space operations
+
+    """
+
+    step: int
+    duration: float
+    activations: dict[tuple[type[Agent], str], tuple[int, float]]
+    collect: float
+    space: float
+    space_calls: int
+
+
+class StepProfiler:
+    """Records the timings of each step of a model while enabled.
+
+    Attributes:
+        model: the model to profile
+        records: the records of the most recent steps
+        callback: called with the StepRecord of each step
+
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        buffer_size: int | None = 1000,
+        callback: Callable[[StepRecord], Any] | None = None,
+    ):
+        """Create a StepProfiler.
+
+        Args:
+            model: the model to profile
+            buffer_size: the number of most recent steps to keep records for. If None, all records are kept.
+            callback: a function called with the StepRecord of each step, e.g., to write records to a file
+
+        """
+        self.model = model
+        self.records: deque[StepRecord] = deque(maxlen=buffer_size)
+        self.callback = callback
+        self._activations: defaultdict[tuple[type[Agent], str], list] = defaultdict(
+            _new_activation
+        )
+        self._times = {"collect": 0.0, "space": 0.0}
+        self._space_calls = 0
+        self._in_operation = False
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the profiler is enabled."""
+        return self.model._profiler is self
+
+    def enable(self) -> None:
+        """Start profiling the steps of the model."""
+        global _n_enabled  # noqa: PLW0603
+
+        if self.enabled:
+            return
+        if self.model._profiler is not None:
+            raise ValueError("The model is already being profiled by another profiler")
+        if _n_enabled == 0:
+            _install_wrappers()
+        _n_enabled += 1
+        self.model._profiler = self
+
+    def disable(self) -> None:
+        """Stop profiling the steps of the model."""
+        global _n_enabled  # noqa: PLW0603
+
+        if not self.enabled:
+            return
+        self.model._profiler = None
+        _n_enabled -= 1
+        if _n_enabled == 0:
+            _uninstall_wrappers()
+
+    def __enter__(self) -> StepProfiler:  # noqa: D105
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:  # noqa: D105
+        self.disable()
+
+    def _profile_step(self, step: Callable, args: tuple, kwargs: dict) -> None:
+        """Run the step of the model and record its timings, called by Model._wrapped_step."""
+        self._activations.clear()
+        self._times = {"collect": 0.0, "space": 0.0}
+        self._space_calls = 0
+
+        _active_profilers.append(self)
+        start = perf_counter()
+        try:
+            step(*args, **kwargs)
+        finally:
+            duration = perf_counter() - start
+            _active_profilers.pop()
+
+        record = StepRecord(
+            step=self.model.steps,
+            duration=duration,
+            activations={
+                key: (n, seconds) for key, (n, seconds) in self._activations.items()
+            },
+            collect=self._times["collect"],
+            space=self._times["space"],
+            space_calls=self._space_calls,
+        )
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def _activate(
+        self,
+        agents: Iterable[Agent],
+        method: str | Callable,
+        args: tuple,
+        kwargs: dict,
+    ) -> list[Any]:
+        """Activate the agents while timing each activation, called by the AgentSet activation methods."""
+        name = (
+            method
+            if isinstance(method, str)
+            else getattr(method, "__qualname__", repr(method))
+        )
+        activations = self._activations
+        results = []
+        for agent in agents:
+            start = perf_counter()
+            if isinstance(method, str):
+                results.append(getattr(agent, method)(*args, **kwargs))
+            else:
+                results.append(method(agent, *args, **kwargs))
+            elapsed = perf_counter() - start
+
+            activation = activations[type(agent), name]
+            activation[0] += 1
+            activation[1] += elapsed
+        return results
+
+    def _time(self, category: str, function: Callable, args: tuple, kwargs: dict):
+        if self._in_operation:
+            return function(*args, **kwargs)
+
+        self._in_operation = True
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self._times[category] += perf_counter() - start
+            if category == "space":
+                self._space_calls += 1
+            self._in_operation = False
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Return the records as a DataFrame with one row per step."""
+        return pd.DataFrame(
+            [
+                {
+                    "step": record.step,
+                    "duration": record.duration,
+                    "activations": sum(
+                        seconds for _, seconds in record.activations.values()
+                    ),
+                    "collect": record.collect,
+                    "space": record.space,
+                    "space_calls": record.space_calls,
+                }
+                for record in self.records
+            ],
+            columns=[
+                "step",
+                "duration",
+                "activations",
+                "collect",
+                "space",
+                "space_calls",
+            ],
+        )
+
+    def activations_dataframe(self) -> pd.DataFrame:
+        """Return the activations as a DataFrame with one row per step, agent type, and method."""
+        return pd.DataFrame(
+            [
+                {
+                    "step": record.step,
+                    "agent_type": agent_type.__name__,
+                    "method": method,
+                    "n_agents": n,
+                    "seconds": seconds,
+                }
+                for record in self.records
+                for (agent_type, method), (n, seconds) in record.activations.items()
+            ],
+            columns=["step", "agent_type", "method", "n_agents", "seconds"],
+        )
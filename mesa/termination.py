@@ -0,0 +1,222 @@
+"""Termination criteria for stopping a model once its output has converged.
+
+Many models reach a steady state long before their step cap. A termination criterion
+watches one or more model variables collected by the model's DataCollector and signals
+when the model can stop::
+
+    criteria = [
+        SteadyState("Gini", window=50, threshold=1e-4),
+        CycleDetected("Happy", max_period=4),
+    ]
+    model.run_model(termination=criteria)
+    batch_run(MoneyModel, parameters, max_steps=1000, termination=criteria)
+
+Criteria only look at the values stored in ``model.datacollector.model_vars``, so they
+see whatever the model collects, and they hold no state of their own. The same criterion
+can thus be shared by many models, including the runs of ``batch_run`` in other processes.
+
+If the DataCollector has a sink, a criterion makes it keep the values it looks at in
+memory when flushing. As that only starts with the first check, the criterion can be met
+no earlier than ``n_values`` collections after it, if the sink flushed in between.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from mesa.model import Model
+
+__all__ = [
+    "CycleDetected",
+    "RelativeChange",
+    "SteadyState",
+    "TerminationCriterion",
+    "should_terminate",
+]
+
+
+class TerminationCriterion(ABC):
+    """Base class for termination criteria that watch model variables of a DataCollector.
+
+    Subclasses implement ``n_values`` and ``_is_met``, which is called with the last
+    ``n_values`` values of each watched variable once that many values have been collected.
+
+    Attributes:
+        variables (list[str]): the names of the watched model reporters
+
+    """
+
+    def __init__(self, variables: str | Sequence[str]):
+        """Initialize a TerminationCriterion.
+
+        Args:
+            variables: the name, or names, of model reporters of the model's DataCollector
+
+        """
+        self.variables = [variables] if isinstance(variables, str) else list(variables)
+
+    @property
+    @abstractmethod
+    def n_values(self) -> int:
+        """The number of most recent values of each variable the criterion needs."""
+
+    def __call__(self, model: Model) -> bool:
+        """Check whether the model can stop.
+
+        Args:
+            model: the model, which should have a ``datacollector`` attribute
+
+        Returns:
+            True if the criterion is met for all watched variables
+
+        """
+        try:
+            datacollector = model.datacollector
+        except AttributeError as e:
+            raise AttributeError(
+                "The model does not have a datacollector attribute. Please add a DataCollector to your model."
+            ) from e
+
+        n = self.n_values
+        datacollector._keep_model_values(n)
+        for variable in self.variables:
+            values = datacollector.model_vars[variable]
+            if len(values) < n or not self._is_met(
+                np.asarray(values[-n:], dtype=float)
+            ):
+                return False
+        return True
+
+    @abstractmethod
+    def _is_met(self, values: np.ndarray) -> bool:
+        """Return whether the criterion is met for the last n_values values of a variable."""
+
+    def __repr__(self) -> str:  # noqa: D105
+        arguments = ", ".join(f"{k}={v!r}" for k, v in vars(self).items())
+        return f"{type(self).__name__}({arguments})"
+
+
+class SteadyState(TerminationCriterion):
+    """Met when the variance of a variable over a sliding window drops below a threshold."""
+
+    def __init__(self, variables: str | Sequence[str], window: int, threshold: float):
+        """Initialize a SteadyState criterion.
+
+        Args:
+            variables: the name, or names, of the watched model reporters
+            window: the number of most recent values to compute the variance over
+            threshold: the variance below which the variable is considered steady
+
+        """
+        super().__init__(variables)
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.window = window
+        self.threshold = threshold
+
+    @property
+    def n_values(self) -> int:  # noqa: D102
+        return self.window
+
+    def _is_met(self, values: np.ndarray) -> bool:
+        return bool(values.var() < self.threshold)
+
+
+class RelativeChange(TerminationCriterion):
+    """Met when the relative change of a variable stays below a tolerance for a number of steps."""
+
+    def __init__(
+        self,
+        variables: str | Sequence[str],
+        tolerance: float,
+        patience: int = 1,
+    ):
+        """Initialize a RelativeChange criterion.
+
+        Args:
+            variables: the name, or names, of the watched model reporters
+            tolerance: the relative change ``|x[t] - x[t-1]| / |x[t-1]|`` below which a step counts as unchanged.
+                       For values of zero, the absolute change is used instead.
+            patience: the number of consecutive unchanged steps required
+
+        """
+        super().__init__(variables)
+        if patience < 1:
+            raise ValueError("patience must be at least 1")
+        self.tolerance = tolerance
+        self.patience = patience
+
+    @property
+    def n_values(self) -> int:  # noqa: D102
+        return self.patience + 1
+
+    def _is_met(self, values: np.ndarray) -> bool:
+        previous = np.abs(values[:-1])
+        change = np.abs(np.diff(values))
+        scale = np.where(previous > 0, previous, 1.0)
+        return bool(np.all(change / scale <= self.tolerance))
+
+
+class CycleDetected(TerminationCriterion):
+    """Met when a variable repeats the same cycle of values, with a fixed point being a cycle of period 1.
+
+    The criterion is checked once ``max_period * repeats`` values have been collected.
+    """
+
+    def __init__(
+        self,
+        variables: str | Sequence[str],
+        max_period: int,
+        repeats: int = 3,
+        atol: float = 0.0,
+    ):
+        """Initialize a CycleDetected criterion.
+
+        Args:
+            variables: the name, or names, of the watched model reporters
+            max_period: the longest cycle to look for
+            repeats: the number of times the cycle has to be seen in a row
+            atol: the absolute tolerance for considering two values equal
+
+        """
+        super().__init__(variables)
+        if max_period < 1 or repeats < 2:
+            raise ValueError("max_period must be at least 1 and repeats at least 2")
+        self.max_period = max_period
+        self.repeats = repeats
+        self.atol = atol
+
+    @property
+    def n_values(self) -> int:  # noqa: D102
+        return self.max_period * self.repeats
+
+    def _is_met(self, values: np.ndarray) -> bool:
+        for period in range(1, self.max_period + 1):
+            n = period * self.repeats
+            tail = values[-n:]
+            if np.all(np.abs(tail[period:] - tail[:-period]) <= self.atol):
+                return True
+        return False
+
+
+def should_terminate(
+    model: Model, termination: TerminationCriterion | Iterable[TerminationCriterion]
+) -> bool:
+    """Check whether any of the termination criteria is met for the model.
+
+    Args:
+        model: the model to check
+        termination: a termination criterion, or several of which any has to be met
+
+    Returns:
+        True if the model can stop
+
+    """
+    if isinstance(termination, TerminationCriterion):
+        return termination(model)
+    return any(criterion(model) for criterion in termination)
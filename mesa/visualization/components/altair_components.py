@@ -456,6 +456,8 @@ def make_altair_plot_component(
     post_process: Callable | None = None,
     page: int = 0,
     grid=False,
+    tail: int | None = None,
+    max_points: int | None = None,
 ):
     """Create a plotting function for a specified measure.
 
@@ -464,19 +466,35 @@ def make_altair_plot_component(
         post_process: a user-specified callable to do post-processing called with the Axes instance.
         page: Page number where the plot should be displayed.
         grid: Bool to draw grid or not.
+        tail: if given, only plot the last tail collected values
+        max_points: if given, plot at most this many values, evenly spread over the run
 
     Returns:
         (function, page): A tuple of a function that creates a PlotAltair component and a page number.
     """
 
     def MakePlotAltair(model):
-        return PlotAltair(model, measure, post_process=post_process, grid=grid)
+        return PlotAltair(
+            model,
+            measure,
+            post_process=post_process,
+            grid=grid,
+            tail=tail,
+            max_points=max_points,
+        )
 
     return (MakePlotAltair, page)
 
 
 @solara.component
-def PlotAltair(model, measure, post_process: Callable | None = None, grid=False):
+def PlotAltair(
+    model,
+    measure,
+    post_process: Callable | None = None,
+    grid=False,
+    tail: int | None = None,
+    max_points: int | None = None,
+):
     """Create an Altair-based plot for a measure or measures.
 
     Args:
@@ -486,12 +504,16 @@ def PlotAltair(model, measure, post_process: Callable | None = None, grid=False)
         post_process: A user-specified callable for post-processing, called
             with the Altair Chart instance.
         grid: Bool to draw grid or not.
+        tail: If given, only plot the last tail collected values.
+        max_points: If given, plot at most this many values, evenly spread over the run.
 
     Returns:
         solara.FigureAltair: A component for rendering the plot.
     """
     update_counter.get()
-    df = model.datacollector.get_model_vars_dataframe().reset_index()
+    df = model.datacollector.get_model_vars_dataframe(
+        tail=tail, max_rows=max_points
+    ).reset_index()
     df = df.rename(columns={"index": "Step"})
 
     y_title = "Value"
@@ -109,6 +109,8 @@ def make_mpl_plot_component(
     post_process: Callable | None = None,
     page: int = 0,
     save_format="png",
+    tail: int | None = None,
+    max_points: int | None = None,
 ):
     """Create a plotting function for a specified measure.
 
@@ -117,6 +119,8 @@ def make_mpl_plot_component(
         post_process: a user-specified callable to do post-processing called with the Axes instance.
         page: Page number where the plot should be displayed.
         save_format: save format of figure in solara backend
+        tail: if given, only plot the last tail collected values
+        max_points: if given, plot at most this many values, evenly spread over the run
 
     Returns:
         (function, page): A tuple of a function that creates a PlotMatplotlib component and a page number.
@@ -124,7 +128,12 @@ def make_mpl_plot_component(
 
     def MakePlotMatplotlib(model):
         return PlotMatplotlib(
-            model, measure, post_process=post_process, save_format=save_format
+            model,
+            measure,
+            post_process=post_process,
+            save_format=save_format,
+            tail=tail,
+            max_points=max_points,
         )
 
     return (MakePlotMatplotlib, page)
@@ -137,6 +146,8 @@ def PlotMatplotlib(
     dependencies: list[any] | None = None,
     post_process: Callable | None = None,
     save_format="png",
+    tail: int | None = None,
+    max_points: int | None = None,
 ):
     """Create a Matplotlib-based plot for a measure or measures.
 
@@ -146,6 +157,8 @@ def PlotMatplotlib(
         dependencies (list[any] | None): Optional dependencies for the plot.
         post_process: a user-specified callable to do post-processing called with the Axes instance.
         save_format: format used for saving the figure.
+        tail: if given, only plot the last tail collected values.
+        max_points: if given, plot at most this many values, evenly spread over the run.
 
     Returns:
         solara.FigureMatplotlib: A component for rendering the plot.
@@ -153,7 +166,7 @@ def PlotMatplotlib(
     update_counter.get()
     fig = Figure()
     ax = fig.subplots()
-    df = model.datacollector.get_model_vars_dataframe()
+    df = model.datacollector.get_model_vars_dataframe(tail=tail, max_rows=max_points)
     if isinstance(measure, str):
         ax.plot(df.loc[:, measure])
         ax.set_ylabel(measure)
@@ -539,7 +539,9 @@ def ModelController(
         visualization_pause_event.clear()
         _mesa_logger.log(
             10,
-            f"creating new {model.value.__class__} instance with {model_parameters.value}",
+            "creating new %s instance with %s",
+            model.value.__class__,
+            model_parameters.value,
         )
         model.value = model.value = model.value.__class__(**model_parameters.value)
         if renderer is not None:
@@ -1,11 +1,14 @@
 """Agent.py related tests."""
 
+import copy
+import gc
 import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import numpy as np
 import pytest
 
-from mesa.agent import Agent, AgentSet
+from mesa.agent import Agent, AgentSet, _HardKeyAgentSet
 from mesa.model import Model
 
 
@@ -126,6 +129,43 @@ def test_agentset():
     assert len(another_set) == len(other_agents)
 
 
+def test_hard_key_agentset():
+    """Test the strong reference AgentSet used by the model."""
+    model = Model()
+    agents = [AgentDoTest(model) for _ in range(10)]
+    agentset = model.agents
+
+    assert isinstance(agentset, _HardKeyAgentSet)
+    assert isinstance(model.agents_by_type[AgentDoTest], _HardKeyAgentSet)
+    assert list(agentset) == agents
+    assert agentset[3] is agents[3]
+    assert agentset[2:4] == agents[2:4]
+    assert list(reversed(agentset)) == agents[::-1]
+
+    # agents removed while iterating are skipped
+    for agent in agents:
+        agent.agent_set = agentset
+    agentset.do(lambda agent: agents[9].remove() if agent is agents[0] else None)
+    assert agents[9] not in agentset
+    assert agentset.map("get_unique_identifier") == [a.unique_id for a in agents[:9]]
+    called = []
+    agentset.shuffle_do(called.append)
+    assert sorted(called, key=agents.index) == agents[:9]
+
+    # derived agentsets hold weak references
+    assert type(copy.copy(agentset)) is AgentSet
+    assert type(agentset.select(at_most=5)) is AgentSet
+    assert type(agentset.shuffle()) is AgentSet
+
+    agentset.shuffle(inplace=True)
+    assert isinstance(agentset, _HardKeyAgentSet)
+    assert len(agentset) == 9
+
+    other = pickle.loads(pickle.dumps(model))  # noqa: S301
+    assert isinstance(other.agents, _HardKeyAgentSet)
+    assert [a.unique_id for a in other.agents] == [a.unique_id for a in agentset]
+
+
 def test_agentset_initialization():
     """Test agentset initialization."""
     model = Model()
@@ -210,6 +250,38 @@ def test_agent_create():
         assert agent.b == 7
 
 
+def test_agent_create_bulk_registration():
+    """Test that create_agents registers all agents in one operation."""
+
+    class TestAgent(Agent):
+        def __init__(self, model, value, n_children=0):
+            super().__init__(model)
+            self.value = value
+            self.n_registered = len(model.agents)
+            self.children = TestAgent.create_agents(model, n_children, value)
+
+    model = Model(seed=42)
+    AgentTest(model)
+    values = np.arange(5)
+    agents = TestAgent.create_agents(model, 5, values, n_children=[0, 2, 0, 0, 0])
+
+    assert len(agents) == 5
+    assert len(model.agents) == 1 + 5 + 2
+    assert len(model.agents_by_type[TestAgent]) == 7
+    # agents are only registered once all of them have been created
+    assert all(agent.n_registered == 1 for agent in agents)
+    assert [agent.value for agent in agents] == list(values)
+    assert all(agent.value == 1 for agent in agents[1].children)
+    # agents created in bulk get a block of consecutive ids
+    assert sorted(agent.unique_id for agent in model.agents) == list(range(1, 9))
+    assert [agent.unique_id for agent in agents] == list(range(2, 7))
+    assert [agent.unique_id for agent in agents[1].children] == [7, 8]
+    assert AgentTest(model).unique_id == 9
+
+    assert len(TestAgent.create_agents(model, 0, values)) == 0
+    assert len(model.agents) == 9
+
+
 def test_agent_add_remove_discard():
     """Test adding, removing and discarding agents from AgentSet."""
     model = Model()
@@ -244,6 +316,81 @@ def test_agentset_get_item():
         _ = agentset[20]
 
 
+def test_agentset_positional_index():
+    """Test index, count, reversed, and indexing after adding and removing agents."""
+    model = Model()
+    agents = [AgentTest(model) for _ in range(10)]
+    agentset = AgentSet(agents)
+
+    assert agentset.index(agents[3]) == 3
+    assert agentset.count(agents[3]) == 1
+    assert list(reversed(agentset)) == agents[::-1]
+    with pytest.raises(ValueError):
+        agentset.index(agents[3], 4)
+
+    new_agent = AgentTest(model)
+    agentset.add(new_agent)
+    agentset.add(new_agent)  # adding twice does not change the index
+    assert agentset[-1] is new_agent
+    assert agentset.index(new_agent) == 10
+    assert len(agentset) == 11
+
+    agentset.remove(agents[0])
+    agentset.discard(agents[5])
+    assert agentset.count(agents[0]) == 0
+    assert agentset[0] is agents[1]
+    assert agentset[4] is agents[6]
+    assert agentset.index(new_agent) == 8
+    assert agentset[2:4] == agents[3:5]
+    with pytest.raises(ValueError):
+        agentset.index(agents[0])
+
+    # removing most agents drops the index, which is rebuilt on demand
+    for agent in agents[1:9]:
+        agentset.discard(agent)
+    assert list(agentset) == [agents[9], new_agent]
+    assert agentset[1] is new_agent
+
+    # agents that are garbage collected disappear from the index
+    agentset.add(AgentTest.__new__(AgentTest))
+    assert len(agentset) == 2
+    assert agentset[-1] is new_agent
+
+
+@pytest.mark.parametrize("hard", [False, True])
+def test_agentset_positional_index_with_holes(hard):
+    """Test that positional access skips the holes left by removals without rebuilding the index."""
+    model = Model(seed=42)
+    agents = [AgentTest(model) for _ in range(100)]
+    agentset = (
+        _HardKeyAgentSet(agents, random=model.random)
+        if hard
+        else AgentSet(agents, random=model.random)
+    )
+    expected = list(agents)
+
+    sequence = agentset._get_sequence()
+    for position in [0, 7, 8, 50, 90, 3, 4]:
+        agentset.remove(expected.pop(position))
+        assert agentset[position] is expected[position]
+        assert agentset[-1] is expected[-1]
+        assert agentset._sequence is sequence
+    assert [agentset[i] for i in range(len(agentset))] == expected
+    assert agentset[5:20:3] == expected[5:20:3]
+    assert agentset[::-7] == expected[::-7]
+    assert agentset.index(expected[60]) == 60
+    with pytest.raises(IndexError):
+        agentset[len(expected)]
+    with pytest.raises(IndexError):
+        agentset[-len(expected) - 1]
+
+    # adding appends to the index
+    new_agent = AgentTest(model)
+    agentset.add(new_agent)
+    assert agentset[-1] is new_agent
+    assert agentset.index(new_agent) == len(expected)
+
+
 def test_agentset_do_str():
     """Test AgentSet.do with str."""
     model = Model()
@@ -710,3 +857,303 @@ def test_agentset_groupby():
     assert custom_result[False] == custom_agg(
         [agent.value for agent in agents if not agent.even]
     )
+
+
+class StateAgent(Agent):
+    """Agent with a categorical state."""
+
+    def __init__(self, model):
+        """Initialize the agent, every fourth agent is infected."""
+        super().__init__(model)
+        self.state = "S" if self.unique_id % 4 else "I"
+
+
+def test_agentset_index_by():
+    """Test secondary indexes on AgentSet."""
+    model = Model(seed=42)
+    agents = list(StateAgent.create_agents(model, 100))
+    other = AgentTest(model)
+
+    agentset = model.agents.index_by("state")
+    assert agentset is model.agents
+    assert len(agentset.select(where={"state": "I"})) == 25
+    assert len(agentset.select(where={"state": "R"})) == 0
+
+    # the index follows attribute changes
+    agents[1].state = "I"
+    agents[0].state = "R"
+    infected = agentset.select(where={"state": "I"})
+    assert len(infected) == 26
+    assert agents[1] in infected
+    assert agents[0] not in infected
+    assert agentset.select(where={"state": "R"})[0] is agents[0]
+
+    # the index follows membership changes
+    agents[1].remove()
+    assert agents[1] not in agentset.select(where={"state": "I"})
+    new_agent = StateAgent(model)
+    assert new_agent in agentset.select(where={"state": new_agent.state})
+
+    # where combines with the other criteria
+    selected = agentset.select(
+        lambda a: a.unique_id > 50, where={"state": "S"}, at_most=10
+    )
+    assert len(selected) == 10
+    assert all(a.state == "S" and a.unique_id > 50 for a in selected)
+    assert agentset.select(where={"state": "S", "unique_id": 3})[0] is agents[2]
+
+    # groupby on an indexed attribute, agents without the attribute are left out
+    counts = agentset.groupby("state").count()
+    assert counts == model.agents_by_type[StateAgent].groupby("state").count()
+    assert sum(counts.values()) == len(model.agents) - 1
+    assert other not in agentset.select(where={"state": "S"})
+
+    # unindexed where and weak agentsets
+    weak = AgentSet(agents[2:], random=model.random)
+    assert weak.select(where={"state": "I"}) == weak.index_by("state").select(
+        where={"state": "I"}
+    )
+    weak.select(where={"state": "S"}, inplace=True)
+    assert all(a.state == "S" for a in weak)
+    assert agents[3] not in weak
+    agents[4].state = "I"
+    assert weak.select(where={"state": "I"})[0] is agents[4]
+
+    # pickling keeps the index
+    model2 = pickle.loads(pickle.dumps(model))  # noqa: S301
+    selected = model2.agents.select(where={"state": "R"})
+    assert [a.unique_id for a in selected] == [agents[0].unique_id]
+
+    # while indexed, values have to be hashable
+    with pytest.raises(TypeError):
+        agents[5].state = ["S"]
+    agents[5].state = "S"
+
+    agentset.drop_index("state")
+    agents[0].state = "I"
+    assert agents[0] in agentset.select(where={"state": "I"})
+
+    # the descriptor is removed from the class once no index on the attribute is left
+    assert "state" in vars(StateAgent)
+    weak.drop_index("state")
+    del model2, selected
+    gc.collect()
+    assert "state" not in vars(StateAgent)
+    agents[0].state = ["I"]
+    assert agents[0].state == ["I"]
+
+    # an inherited class attribute is left on the base class
+    class BaseAgent(Agent):
+        state = "x"
+
+    class DerivedAgent(BaseAgent):
+        pass
+
+    inheriting = AgentSet([DerivedAgent(model)], random=model.random)
+    inheriting.index_by("state")
+    assert inheriting.select(where={"state": "x"})[0].state == "x"
+    BaseAgent.state = "y"
+    assert DerivedAgent.state == inheriting[0].state == "y"
+    inheriting.drop_index("state")
+    assert "state" not in vars(DerivedAgent)
+    BaseAgent.state = "z"
+    assert DerivedAgent(model).state == "z"
+
+    class SlotAgent(Agent):
+        @property
+        def state(self):
+            return "S"
+
+    SlotAgent(model)
+    with pytest.raises(TypeError):
+        model.agents.index_by("state")
+
+
+def test_agentset_query():
+    """Test lazy AgentSet queries."""
+    model = Model(seed=42)
+    agents = list(StateAgent.create_agents(model, 50))
+    others = [AgentTest(model) for _ in range(10)]
+    agentset = model.agents
+
+    query = agentset.query().select(agent_type=StateAgent)
+    assert list(query) == agents
+    assert len(query) == 50
+    assert len(agentset) == 60  # the agentset is untouched
+
+    # queries are immutable and reflect the current agentset
+    infected = query.select(where={"state": "I"})
+    assert len(query) == 50
+    assert len(infected) == 12
+    agents[0].state = "I"
+    assert len(infected) == 13
+
+    # operations match their AgentSet counterparts
+    assert list(query.select(lambda a: a.unique_id % 2, at_most=5)) == list(
+        agentset.select(agent_type=StateAgent).select(
+            lambda a: a.unique_id % 2, at_most=5
+        )
+    )
+    assert list(query.select(at_most=0.1)) == agents[:5]
+    assert list(agentset.query().select(at_most=0.5)) == agents[:30]
+    assert list(query.sort("unique_id", ascending=False)) == agents[::-1]
+    assert list(query.sort(lambda a: -a.unique_id).select(at_most=0.2)) == agents[:10]
+    assert list(query.sort("unique_id", ascending=True).select(at_most=3)) == agents[:3]
+    assert query.to_agentset() == agentset.select(agent_type=StateAgent)
+
+    shuffled = list(query.shuffle())
+    assert shuffled != agents
+    assert set(shuffled) == set(agents)
+
+    # shuffling uses the rng of the agentset
+    model.reset_randomizer(42)
+    first = list(agentset.query().shuffle())
+    model.reset_randomizer(42)
+    assert list(agentset.query().shuffle()) == first
+
+    # terminal operations
+    assert query.map(lambda a: a.unique_id) == [a.unique_id for a in agents]
+    assert query.get("state") == [a.state for a in agents]
+    assert (
+        agentset.query().get("state", handle_missing="default")
+        == [a.state for a in agents] + [None] * 10
+    )
+    assert query.agg("unique_id", [min, max]) == [1, 50]
+    with pytest.raises(ValueError):
+        query.get("state", handle_missing="unknown")
+
+    # do skips agents that are removed while it runs
+    visited = []
+
+    def remove_next(agent):
+        visited.append(agent)
+        if agent is agents[0]:
+            agents[1].remove()
+
+    assert query.do(remove_next) is query
+    assert agents[1] not in visited
+    assert len(visited) == 49
+
+    # and so does map
+    def remove_next_and_report(agent):
+        if agent is agents[0]:
+            agents[2].remove()
+        return agent.unique_id
+
+    assert query.map(remove_next_and_report) == [
+        a.unique_id for a in agents if a not in (agents[1], agents[2])
+    ]
+    agentset.query().select(agent_type=AgentTest).do("remove")
+    assert all(agent not in agentset for agent in others)
+
+
+def _score(agent, offset=0, rng=None):
+    """Module level function, so it can be pickled for process pools."""
+    noise = 0 if rng is None else rng.random()
+    return agent.unique_id + offset + noise
+
+
+def test_agentset_parallel():
+    """Test map_parallel and do_parallel."""
+    model = Model(seed=42)
+    agents = list(StateAgent.create_agents(model, 101))
+    agentset = model.agents
+
+    expected = agentset.map(_score, offset=1)
+    assert agentset.map_parallel(_score, offset=1, n_partitions=4) == expected
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert (
+            agentset.map_parallel(_score, offset=1, executor=executor, n_partitions=7)
+            == expected
+        )
+    assert agentset.map_parallel("__str__") == agentset.map("__str__")
+    assert AgentSet([], random=model.random).map_parallel(_score) == []
+
+    # rng streams are reproducible and independent of the executor and the partitions
+    model.reset_randomizer(1)
+    first = agentset.map_parallel(_score, rng=True, n_partitions=4)
+    model.reset_randomizer(1)
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        second = agentset.map_parallel(
+            _score, rng=True, n_partitions=4, executor=executor
+        )
+    assert first == second
+    for n_partitions in (1, 3, 200):
+        model.reset_randomizer(1)
+        assert (
+            agentset.map_parallel(_score, rng=True, n_partitions=n_partitions) == first
+        )
+    assert first != expected
+    assert agentset.map_parallel(_score, rng=True, n_partitions=4) != first
+
+    def infect(agent, rng):
+        agent.state = "I" if rng.random() < 0.5 else "S"
+
+    model.reset_randomizer(1)
+    assert agentset.do_parallel(infect, rng=True, n_partitions=5) is agentset
+    states = agentset.get("state")
+    model.reset_randomizer(1)
+    agentset.do_parallel(infect, rng=True, n_partitions=5)
+    assert agentset.get("state") == states
+    assert set(states) == {"I", "S"}
+
+    with pytest.raises(ValueError):
+        agentset.do_parallel(infect, executor="process")
+    with pytest.raises(ValueError):
+        agentset.map_parallel(_score, executor="fiber")
+    with pytest.raises(ValueError):
+        agentset.map_parallel(_score, n_partitions=0)
+
+    groups = agentset.groupby("state")
+    assert groups.map_parallel(len) == groups.map(len)
+    assert groups.map_parallel("agg", "unique_id", sum) == groups.map(
+        "agg", "unique_id", sum
+    )
+    assert len(agents) == 101
+
+
+def test_agentset_sample():
+    """Test AgentSet.sample."""
+    model = Model(seed=42)
+    agents = list(StateAgent.create_agents(model, 100))
+    agentset = model.agents
+
+    sample = agentset.sample(10)
+    assert len(sample) == 10
+    assert len(set(sample)) == 10
+    assert all(agent in agentset for agent in sample)
+    assert len(agentset.sample()) == 1
+
+    # the same as random.sample on the agents
+    model.reset_randomizer(3)
+    sample = agentset.sample(5)
+    model.reset_randomizer(3)
+    assert sample == model.random.sample(agents, 5)
+
+    with_replacement = agentset.sample(150, replace=True)
+    assert len(with_replacement) == 150
+    assert len(set(with_replacement)) < 100
+
+    with pytest.raises(ValueError):
+        agentset.sample(101)
+
+    # weights
+    weights = [1 if agent.state == "I" else 0 for agent in agentset]
+    assert all(a.state == "I" for a in agentset.sample(25, weights=weights))
+    assert all(
+        a.state == "I" for a in agentset.sample(50, replace=True, weights=weights)
+    )
+    with pytest.raises(ValueError):
+        agentset.sample(26, weights=weights)
+    with pytest.raises(ValueError):
+        agentset.sample(5, weights=weights[:-1])
+
+    for agent in agents:
+        agent.weight = 1000 if agent.unique_id == 7 else 1
+    counts = [agentset.sample(1, weights="weight")[0].unique_id for _ in range(100)]
+    assert counts.count(7) > 50
+
+    # removed agents are never sampled
+    for agent in agents[::2]:
+        agent.remove()
+    assert all(agent in agentset for agent in agentset.sample(50))
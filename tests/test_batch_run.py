@@ -5,8 +5,9 @@ import pytest
 import mesa
 from mesa.agent import Agent
 from mesa.batchrunner import _make_model_kwargs
-from mesa.datacollection import DataCollector
+from mesa.datacollection import CollectionSchedule, CSVSink, DataCollector
 from mesa.model import Model
+from mesa.termination import SteadyState
 
 
 def test_make_model_kwargs():  # noqa: D103
@@ -354,3 +355,78 @@ def test_batch_run_unhashable_param():  # noqa: D103
             **template,
         },
     ]
+
+
+def test_batch_run_termination():  # noqa: D103
+    termination = SteadyState("reported_model_param", window=5, threshold=1e-9)
+    result = mesa.batch_run(
+        MockModel,
+        {"n_agents": 2},
+        number_processes=2,
+        rng=[1, 2],
+        data_collection_period=1,
+        termination=termination,
+        display_progress=False,
+    )
+    assert {entry["Step"] for entry in result} == {0, 1, 2, 3, 4}
+
+
+class ScheduledModel(Model):
+    """Model with a model reporter that is only collected every other step."""
+
+    def __init__(self, seed=None):
+        """Initialize the model and collect its initial state."""
+        super().__init__(seed=seed)
+        self.datacollector = DataCollector(
+            model_reporters={"steps": "steps", "even": "steps"},
+            schedules={"even": CollectionSchedule(every=2)},
+        )
+        self.datacollector.collect(self)
+
+    def step(self):
+        """Collect the data."""
+        self.datacollector.collect(self)
+
+
+def test_batch_run_schedules():  # noqa: D103
+    result = mesa.batch_run(
+        ScheduledModel,
+        {},
+        number_processes=1,
+        max_steps=4,
+        data_collection_period=1,
+        display_progress=False,
+    )
+    assert [entry["steps"] for entry in result] == [0, 1, 2, 3, 4]
+    assert [entry["even"] for entry in result] == [0, None, 2, None, 4]
+
+
+class SinkModel(MockModel):
+    """MockModel whose datacollector flushes to a CSVSink."""
+
+    def __init__(self, directory, agent_storage="records", seed=None):
+        """Initialize the model with a datacollector that flushes every 5 collections."""
+        super().__init__(seed=seed)
+        self.datacollector = DataCollector(
+            model_reporters={"steps": "steps"},
+            agent_reporters={"agent_local": "local"},
+            agent_storage=agent_storage,
+            sink=CSVSink(directory, flush_every=5),
+        )
+        self.datacollector.collect(self)
+
+
+@pytest.mark.parametrize("agent_storage", ["records", "columnar", "delta"])
+def test_batch_run_sink(tmp_path, agent_storage):  # noqa: D103
+    result = mesa.batch_run(
+        SinkModel,
+        {"directory": str(tmp_path / agent_storage), "agent_storage": agent_storage},
+        number_processes=1,
+        max_steps=20,
+        data_collection_period=1,
+        display_progress=False,
+    )
+    assert len(result) == 21 * 3
+    assert [entry["steps"] for entry in result[::3]] == list(range(21))
+    assert [entry["AgentID"] for entry in result[:3]] == [1, 2, 3]
+    assert [entry["agent_local"] for entry in result[-3:]] == [5.0] * 3
@@ -0,0 +1,292 @@
+"""Tests for model checkpoints and forks."""
+
+import multiprocessing
+import pickle
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from mesa import Agent, Model
+from mesa.discrete_space import CellAgent, Network, OrthogonalMooreGrid
+from mesa.discrete_space.grid import Grid
+from mesa.experimental.columnar import ColumnarAttribute
+from mesa.experimental.continuous_space import ContinuousSpace, ContinuousSpaceAgent
+from mesa.experimental.devs import DEVSimulator
+
+
+class Walker(CellAgent):
+    """Agent that walks to a random neighboring cell and eats."""
+
+    def __init__(self, model, cell):
+        """Initialize the agent on a cell."""
+        super().__init__(model)
+        self.cell = cell
+        self.wealth = model.random.randint(0, 10)
+        self.energy = model.rng.random()
+        self.name = f"walker {self.unique_id}"
+
+    def step(self):
+        """Move to a random neighbor."""
+        self.cell = self.cell.neighborhood.select_random_cell()
+        self.energy += self.cell.food
+        self.cell.food = 0.0
+        self.wealth += self.model.random.randint(-1, 1)
+
+
+class GridModel(Model):
+    """Model with agents walking on a torus grid with a property layer."""
+
+    def __init__(self, seed=42):
+        """Initialize the model."""
+        super().__init__(seed=seed)
+        self.grid = OrthogonalMooreGrid((10, 10), torus=True, random=self.random)
+        self.grid.create_property_layer("food", default_value=1.0)
+        cells = self.random.sample(list(self.grid.all_cells), 20)
+        Walker.create_agents(self, 20, cells)
+
+    def step(self):
+        """Step all agents and regrow the food."""
+        self.agents.shuffle_do("step")
+        self.grid.food.data += self.rng.random(self.grid.food.data.shape)
+
+
+def state(model):
+    """Return a summary of the state of a GridModel."""
+    return (
+        [(a.unique_id, a.cell.coordinate, a.wealth, a.energy) for a in model.agents],
+        model.grid.food.data.tolist(),
+    )
+
+
+def test_checkpoint_grid(tmp_path, monkeypatch):
+    """Test restoring a model on a grid."""
+    model = GridModel()
+    for _ in range(3):
+        model.step()
+    path = tmp_path / "model.ckpt"
+    model.checkpoint(path)
+
+    def connect_cells(self):
+        raise AssertionError("restore should not reconnect the cells")
+
+    monkeypatch.setattr(Grid, "_connect_cells", connect_cells)
+    restored = GridModel.restore(path)
+    monkeypatch.undo()
+
+    assert restored is not model
+    assert restored.steps == 3
+    assert state(restored) == state(model)
+
+    grid = restored.grid
+    for coordinate, cell in grid._cells.items():
+        original = model.grid._cells[coordinate]
+        assert type(cell) is grid.cell_klass
+        assert cell.coordinate == coordinate
+        assert cell.random is restored.random
+        assert {k: c.coordinate for k, c in cell.connections.items()} == {
+            k: c.coordinate for k, c in original.connections.items()
+        }
+        assert all(c is grid._cells[c.coordinate] for c in cell.connections.values())
+        assert [a.unique_id for a in cell.agents] == [
+            a.unique_id for a in original.agents
+        ]
+        assert cell.empty == original.empty
+    for agent in restored.agents:
+        assert agent.model is restored
+        assert agent in agent.cell.agents
+        assert agent.cell is grid._cells[agent.cell.coordinate]
+    assert restored.agents_by_type[Walker].get("name") == model.agents_by_type[
+        Walker
+    ].get("name")
+
+    # the random number generators continue where they were
+    for _ in range(3):
+        model.step()
+        restored.step()
+    assert state(restored) == state(model)
+
+    # a restored model can be checkpointed and pickled again
+    restored.checkpoint(path)
+    assert state(GridModel.restore(path)) == state(restored)
+    assert state(pickle.loads(pickle.dumps(restored)))  # noqa: S301 == state(restored)
+
+
+class Saver(Agent):
+    """Agent with columnar and regular attributes."""
+
+    savings = ColumnarAttribute(dtype=float, default=1.0)
+
+    def __init__(self, model, friend=None):
+        """Initialize the agent."""
+        super().__init__(model)
+        self.friend = friend
+        self.history = []
+
+    def save(self, amount):
+        """Add amount to the savings."""
+        self.savings += amount
+        self.history.append(self.model.time)
+
+
+class EventModel(Model):
+    """Model with events scheduled on agents, and agents in several spaces."""
+
+    def __init__(self, seed=42):
+        """Initialize the model."""
+        super().__init__(seed=seed)
+        self.simulator = DEVSimulator()
+        self.simulator.setup(self)
+
+        self.network = Network(nx.cycle_graph(10), random=self.random)
+        self.space = ContinuousSpace([[0, 1], [0, 1]], random=self.random)
+        for cell in self.network.all_cells:
+            agent = CellAgent(self)
+            agent.cell = cell
+        for _ in range(5):
+            agent = ContinuousSpaceAgent(self.space, self)
+            agent.position = self.rng.random(2)
+
+        self.savers = Saver.create_agents(self, 5)
+        gone = Saver(self)
+        self.savers[0].friend = gone
+        gone.remove()
+        for i, saver in enumerate(self.savers):
+            self.simulator.schedule_event_absolute(saver.save, i, function_args=[i])
+
+
+def test_checkpoint_events_and_spaces(tmp_path):
+    """Test restoring scheduled events, networks, continuous spaces, and columnar stores."""
+    model = EventModel()
+    model.simulator.run_until(2)
+    path = tmp_path / "model.ckpt"
+    model.checkpoint(path)
+    restored = EventModel.restore(path)
+
+    assert restored.time == 2
+    assert len(restored.simulator.event_list) == 2
+    assert restored.simulator.model is restored
+
+    savers = list(restored.agents_by_type[Saver])
+    assert [s.savings for s in savers] == [1.0, 2.0, 3.0, 1.0, 1.0]
+    assert savers[0].friend not in restored.agents
+    assert savers[0].friend.model is restored
+
+    restored.simulator.run_until(5)
+    assert [s.savings for s in savers] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert [s.history for s in savers] == [[0], [1], [2], [3], [4]]
+    np.testing.assert_array_equal(
+        restored.agents_by_type[Saver].get("savings"), [1.0, 2.0, 3.0, 4.0, 5.0]
+    )
+
+    network = restored.network
+    for node, cell in network._cells.items():
+        assert sorted(cell.connections) == sorted(model.network.G.neighbors(node))
+        assert len(cell.agents) == 1
+    assert list(network.G.edges) == list(model.network.G.edges)
+
+    space = restored.space
+    np.testing.assert_array_equal(space.agent_positions, model.space.agent_positions)
+    assert [a.unique_id for a in space.active_agents] == [
+        a.unique_id for a in model.space.active_agents
+    ]
+    for agent in space.active_agents:
+        assert agent.space is space
+        np.testing.assert_array_equal(
+            agent.position, space.agent_positions[space._agent_to_index[agent]]
+        )
+
+
+def test_checkpoint_errors(tmp_path):
+    """Test restoring from invalid files."""
+    path = tmp_path / "model.ckpt"
+    GridModel().checkpoint(path)
+    with pytest.raises(TypeError):
+        EventModel.restore(path)
+    assert isinstance(Model.restore(path), GridModel)
+
+    path.write_bytes(b"not a checkpoint" * 10)
+    with pytest.raises(ValueError):
+        Model.restore(path)
+
+
+def run_steps(model, n=3):
+    """Run a GridModel for n steps and return its state."""
+    for _ in range(n):
+        model.step()
+    return state(model)
+
+
+def test_fork():
+    """Test forking a model."""
+    model = GridModel()
+    model.grid.create_property_layer("elevation", default_value=0.0)
+    model.grid.elevation.data[:] = np.arange(100).reshape(10, 10)
+    model.grid.elevation.data.setflags(write=False)
+    model.step()
+
+    fork = model.fork()
+    assert isinstance(fork, GridModel)
+    assert state(fork) == state(model)
+
+    first, second = model.fork(2)
+    # read-only layers are shared with the model, writable layers between the forks
+    assert np.shares_memory(first.grid.elevation.data, model.grid.elevation.data)
+    assert not first.grid.elevation.data.flags.writeable
+    assert first.grid._cells[(2, 3)].elevation == 23
+    food = first.grid.food._mesa_data
+    assert np.shares_memory(food, second.grid.food._mesa_data)
+    assert not np.shares_memory(food, model.grid.food.data)
+
+    # reading values without .data does not copy them, accessing .data does
+    assert first.grid._cells[(0, 0)].food == food[0, 0]
+    assert first.grid.food.aggregate(np.sum) == food.sum()
+    first.grid.select_cells(conditions={"food": lambda x: x > 0})
+    first.grid.select_cells(extreme_values={"food": "highest"})
+    assert first.grid.food._mesa_data is food
+    assert first.grid.food.data is not food
+
+    # forks are independent from the model and from each other
+    expected = run_steps(fork)
+    assert run_steps(first) == expected
+    assert first.grid.food.data.flags.writeable
+    assert not np.shares_memory(first.grid.food.data, second.grid.food._mesa_data)
+    assert state(second) != expected
+    assert run_steps(model) == expected
+    assert run_steps(second) == expected
+
+    second.reset_rng(1)
+    second.reset_randomizer(1)
+    assert run_steps(second) != run_steps(model)
+
+    # a fork can be forked again
+    third = first.fork()
+    assert run_steps(third) == run_steps(first)
+
+
+def run_in_child(model, queue):
+    """Run a GridModel in a child process and put its state on the queue."""
+    queue.put(run_steps(model))
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="requires the fork start method",
+)
+@pytest.mark.filterwarnings("ignore:This process .* is multi-threaded")
+def test_fork_in_child_processes():
+    """Test running forks in child processes that inherit them from the parent."""
+    model = GridModel()
+    model.step()
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    processes = [
+        context.Process(target=run_in_child, args=(fork, queue))
+        for fork in model.fork(2)
+    ]
+    for process in processes:
+        process.start()
+    results = [queue.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join()
+    assert results == [run_steps(model)] * 2
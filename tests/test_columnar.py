@@ -0,0 +1,151 @@
+"""Tests for columnar agent attributes."""
+
+import pickle
+
+import numpy as np
+import pytest
+
+from mesa import Agent, Model
+from mesa.experimental.columnar import AgentColumnStore, ColumnarAttribute
+
+
+class MoneyAgent(Agent):
+    """Agent with columnar attributes."""
+
+    wealth = ColumnarAttribute(dtype=int, default=1)
+    energy = ColumnarAttribute(dtype=float)
+
+    def __init__(self, model, wealth=None):
+        """Initialize the agent, setting wealth before registration if given."""
+        if wealth is not None:
+            self.wealth = wealth
+        super().__init__(model)
+
+
+class RichAgent(MoneyAgent):
+    """Subclass adding another columnar attribute."""
+
+    bonus = ColumnarAttribute(dtype=float, default=0.5)
+
+
+def test_columnar_attribute():
+    """Test attribute access through the descriptor."""
+    model = Model(seed=42)
+    agent = MoneyAgent(model, wealth=5)
+
+    assert isinstance(MoneyAgent.wealth, ColumnarAttribute)
+    assert agent.wealth == 5
+    assert isinstance(agent.wealth, int)
+    assert agent.energy == 0.0
+    assert "wealth" not in agent.__dict__
+
+    agent.wealth += 2
+    assert agent.wealth == 7
+
+    store = model._column_stores[MoneyAgent]
+    assert isinstance(store, AgentColumnStore)
+    assert store.column("wealth")[0] == 7
+
+    with pytest.raises(TypeError):
+        ColumnarAttribute(dtype=object)
+
+    # unregistered agents only have the values assigned to them
+    unregistered = MoneyAgent.__new__(MoneyAgent)
+    assert not hasattr(unregistered, "wealth")
+    unregistered.wealth = 3
+    assert unregistered.wealth == 3
+
+    # agents created in bulk read the default until they are registered
+    class CountingAgent(MoneyAgent):
+        def __init__(self, model):
+            super().__init__(model)
+            self.wealth += 1
+
+    assert CountingAgent.create_agents(model, 3).get("wealth") == [2, 2, 2]
+
+    # values move back to the instance dict on removal
+    agent.remove()
+    assert agent.wealth == 7
+    assert agent.__dict__["wealth"] == 7
+    assert len(store) == 0
+
+
+def test_columnar_agentset():
+    """Test the vectorized get, set and agg of column backed AgentSets."""
+    model = Model(seed=42)
+    agents = [MoneyAgent(model, wealth=i) for i in range(250)]
+    agentset = model.agents_by_type[MoneyAgent]
+
+    wealth = agentset.get("wealth")
+    assert isinstance(wealth, list)
+    assert wealth == list(range(250))
+    wealth[0] = 100
+    assert agents[0].wealth == 0
+
+    wealth = agentset.get("wealth", view=True)
+    assert isinstance(wealth, np.ndarray)
+    assert np.all(wealth == np.arange(250))
+
+    # the view is zero-copy
+    wealth[0] = 100
+    assert agents[0].wealth == 100
+
+    agentset.set("energy", 2.0)
+    assert all(agent.energy == 2.0 for agent in agents)
+    agentset.set("energy", np.arange(250))
+    assert agents[10].energy == 10.0
+
+    assert agentset.agg("wealth", sum) == sum(agent.wealth for agent in agents)
+    assert agentset.agg("wealth", [min, max]) == [1, 249]
+
+    # removal keeps the columns aligned with the agentset
+    for agent in agents[::2]:
+        agent.remove()
+    assert list(agentset.get("wealth")) == [agent.wealth for agent in agentset]
+    assert len(agentset.get("energy")) == 125
+
+    # non column backed agentsets fall back to getattr
+    assert model.agents.get("wealth") == [agent.wealth for agent in agentset]
+    assert agentset.select(lambda a: a.wealth > 200).get("wealth") == list(
+        range(201, 250, 2)
+    )
+
+    # reordering an agentset disconnects it from the column store
+    shuffled = agentset.shuffle(inplace=False)
+    assert isinstance(shuffled.get("wealth"), list)
+
+
+def test_columnar_subclass():
+    """Test that each agent class gets its own store with all inherited columns."""
+    model = Model(seed=42)
+    MoneyAgent(model)
+    rich = RichAgent(model, wealth=10)
+
+    assert rich.bonus == 0.5
+    assert rich.wealth == 10
+    assert set(model._column_stores[RichAgent].attributes) == {
+        "wealth",
+        "energy",
+        "bonus",
+    }
+    assert "bonus" not in model._column_stores[MoneyAgent]
+
+
+def test_columnar_growth_and_pickle():
+    """Test that stores grow and survive pickling."""
+    model = Model(seed=42)
+    agents = [MoneyAgent(model, wealth=i) for i in range(1000)]
+    for agent in agents[:500]:
+        agent.remove()
+    MoneyAgent.create_agents(model, 10, wealth=3)
+
+    assert len(model.agents_by_type[MoneyAgent].get("wealth")) == 510
+
+    other = pickle.loads(pickle.dumps(model))  # noqa: S301
+    assert list(other.agents_by_type[MoneyAgent].get("wealth")) == list(
+        model.agents_by_type[MoneyAgent].get("wealth")
+    )
+    other_agent = next(iter(other.agents))
+    other_agent.wealth = -1
+    assert other.agents_by_type[MoneyAgent].get("wealth")[0] == -1
+    assert model.agents_by_type[MoneyAgent].get("wealth")[0] == 500
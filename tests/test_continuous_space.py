@@ -113,6 +113,37 @@ def test_continuous_agent():
         agent.position = [1.1, 1.1]
 
 
+def test_continuous_agent_bulk_removal():
+    """Test removing many ContinuousSpaceAgents in one operation."""
+    model = Model(seed=42)
+    space = ContinuousSpace([[0, 1], [0, 1]], torus=False, random=model.random)
+
+    agents = []
+    for _ in range(50):
+        agent = ContinuousSpaceAgent(space, model)
+        agent.position = [agent.random.random(), agent.random.random()]
+        agent.coordinate = agent.position.copy()
+        agents.append(agent)
+
+    model.remove_agents(agents[::3])
+    remaining = [agent for i, agent in enumerate(agents) if i % 3]
+
+    assert space.agent_positions.shape == (len(remaining), 2)
+    assert space.active_agents == remaining
+    for index, agent in enumerate(remaining):
+        assert space._agent_to_index[agent] == index
+        assert space._index_to_agent[index] is agent
+        assert np.all(agent.position == agent.coordinate)
+    for agent in agents[::3]:
+        assert agent.space is None
+        assert agent not in model.agents
+
+    # single agent removal still works after bulk removal
+    remaining[0].remove()
+    assert space.agent_positions.shape == (len(remaining) - 1, 2)
+    assert np.all(remaining[-1].position == remaining[-1].coordinate)
+
+
 def test_continous_space_calculate_distances():
     """Test ContinuousSpace.distance method."""
     # non torus
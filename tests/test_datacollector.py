@@ -1,9 +1,28 @@
 """Test the DataCollector."""
 
+import pickle
+import tempfile
 import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
 
 from mesa import Agent, Model
-from mesa.datacollection import DataCollector
+from mesa.datacollection import (
+    AgentStatistics,
+    CollectionSchedule,
+    CSVSink,
+    DataCollector,
+    DataSink,
+    ParquetSink,
+    SQLiteSink,
+    _as_column,
+    _auto_copy,
+    _ChunkedColumn,
+    _reports_getter,
+)
+from mesa.experimental.columnar import ColumnarAttribute
 
 
 class MockAgent(Agent):
@@ -59,7 +78,7 @@ def agent_function_with_params(agent, multiplier, offset):  # noqa: D103
 class MockModel(Model):
     """Minimalistic model for testing purposes."""
 
-    def __init__(self):  # noqa: D107
+    def __init__(self, agent_storage="records"):  # noqa: D107
         super().__init__()
         self.model_val = 100
 
@@ -80,6 +99,7 @@ class MockModel(Model):
                 "value_with_params": [agent_function_with_params, [2, 3]],
             },
             tables={"Final_Values": ["agent_id", "final_value"]},
+            agent_storage=agent_storage,
         )
 
     def test_model_calc_comp(self, input1, input2):  # noqa: D102
@@ -97,7 +117,7 @@ class MockModel(Model):
 class MockModelWithAgentTypes(Model):
     """Model for testing agent-type-specific reporters."""
 
-    def __init__(self):  # noqa: D107
+    def __init__(self, **kwargs):  # noqa: D107
         super().__init__()
         self.model_val = 100
 
@@ -114,6 +134,7 @@ class MockModelWithAgentTypes(Model):
                 MockAgentA: {"type_a_val": lambda a: a.type_a_val},
                 MockAgentB: {"type_b_val": lambda a: a.type_b_val},
             },
+            **kwargs,
         )
 
     def step(self):  # noqa: D102
@@ -124,9 +145,11 @@ class MockModelWithAgentTypes(Model):
 class TestDataCollector(unittest.TestCase):
     """Tests for DataCollector."""
 
+    agent_storage = "records"
+
     def setUp(self):
         """Create the model and run it a set number of steps."""
-        self.model = MockModel()
+        self.model = MockModel(agent_storage=self.agent_storage)
         self.model.datacollector.collect(self.model)
         for i in range(7):
             if i == 4:
@@ -227,12 +250,509 @@ class TestDataCollector(unittest.TestCase):
             table_df = data_collector.get_table_dataframe("not a real table")
 
 
+class TestColumnarDataCollector(TestDataCollector):
+    """Tests for DataCollector with columnar agent records."""
+
+    agent_storage = "columnar"
+
+    def test_columnar_records(self):
+        """Test the columnar storage of agent records."""
+        data_collector = self.model.datacollector
+        records = data_collector._agent_records
+        assert records.steps.dtype == np.int64
+        assert records.unique_ids.dtype == np.int64
+        assert records.columns[0].dtype == np.int64
+        assert records[1][0] == (1, 1, 2, 2, 4, 7)
+
+        agent_table = data_collector.get_agent_vars_dataframe()
+        expected = DataCollector(agent_reporters=data_collector.agent_reporters)
+        expected._agent_records = dict(records.items())
+        pd.testing.assert_frame_equal(
+            agent_table, expected.get_agent_vars_dataframe(), check_dtype=False
+        )
+
+        # collecting twice in a step replaces the records of the step
+        self.model.agents[0].val = 100
+        data_collector.collect(self.model)
+        assert len(records) == 8
+        assert len(records[7]) == 9
+        assert records[7][0][2] == 100
+
+        with self.assertRaises(ValueError):
+            DataCollector(agent_storage="rows")
+
+    def test_chunked_column(self):
+        """Test appending to, truncating, and promoting chunked columns."""
+        column = _ChunkedColumn(chunk_size=4)
+        column.append(np.arange(3))
+        column.append(np.arange(3, 10))
+        assert len(column) == 10
+        np.testing.assert_array_equal(column.to_array(), np.arange(10))
+        np.testing.assert_array_equal(column.to_array(2, 9), np.arange(2, 9))
+
+        column.truncate(5)
+        column.append(np.array([0.5]))
+        assert column.dtype == np.float64
+        np.testing.assert_array_equal(column.to_array(), [0, 1, 2, 3, 4, 0.5])
+
+        column.append(_as_column(["a", None]))
+        assert column.dtype == object
+        assert column.to_array(5).tolist() == [0.5, "a", None]
+        assert _as_column([(1, 2), (3, 4)]).tolist() == [(1, 2), (3, 4)]
+
+
+class TestAttributeReporters(unittest.TestCase):
+    """Tests for the fast path of attribute reporters."""
+
+    def test_reports_getter(self):
+        """Test fetching attribute and function reporters in the reporter order."""
+        model = MockModel()
+        agent = model.agents[0]
+        get_reports = _reports_getter(
+            ["unique_id", MockAgent.double_val, "val", "missing", lambda a: 5], 3
+        )
+        assert get_reports(agent) == (3, 1, 2, 1, None, 5)
+        assert _reports_getter(["unique_id"], 1)(agent) == (1, 1)
+        assert _reports_getter(["unique_id", "val2"], 1)(agent) == (1, 1, 1)
+
+    def test_string_reporters_pickle(self):
+        """Test that a DataCollector with attribute reporters can be pickled."""
+        data_collector = DataCollector(
+            agent_reporters={"value": "val"},
+            agenttype_reporters={MockAgentA: {"value": "val"}},
+        )
+        data_collector = pickle.loads(pickle.dumps(data_collector))  # noqa: S301
+        model = MockModelWithAgentTypes()
+        data_collector.collect(model)
+        assert data_collector._agent_records[0][1] == (0, 2, 1)
+        assert data_collector._agenttype_records[0][MockAgentA][0] == (0, 1, 0)
+
+    def test_columnar_attribute_reporters(self):
+        """Test collecting columnar agent attributes in columnar storage."""
+
+        class WealthAgent(Agent):
+            wealth = ColumnarAttribute(dtype=float, default=1.5)
+
+        model = Model()
+        WealthAgent.create_agents(model, 5)
+        model.agents[0].remove()
+        data_collector = DataCollector(
+            agent_reporters={"wealth": "wealth", "id": lambda a: a.unique_id},
+            agent_storage="columnar",
+        )
+        data_collector.collect(model)
+        model.step()
+        model.agents.set("wealth", 2.5)
+        data_collector.collect(model)
+
+        agent_vars = data_collector.get_agent_vars_dataframe()
+        assert agent_vars["wealth"].dtype == np.float64
+        assert agent_vars["wealth"].tolist() == [1.5] * 4 + [2.5] * 4
+        assert agent_vars.index.get_level_values("AgentID").tolist() == [2, 3, 4, 5] * 2
+        assert agent_vars["id"].tolist() == [2, 3, 4, 5] * 2
+
+
+class TestDeltaDataCollector(TestDataCollector):
+    """Tests for DataCollector with delta-encoded agent records."""
+
+    agent_storage = "delta"
+
+    def run_delta_model(self, **kwargs):
+        """Collect a model whose agents rarely change, enter, and exit."""
+        model = Model()
+        for i in range(5):
+            MockAgent(model, val=i)
+        data_collector = DataCollector(
+            agent_reporters={"value": "val", "even": lambda a: a.val % 2 == 0},
+            **kwargs,
+        )
+        data_collector.collect(model)
+        for _ in range(4):
+            model.step()
+            if model.steps == 2:
+                model.agents[0].val += 1
+                model.agents[1].remove()
+            if model.steps == 3:
+                MockAgent(model, val=10)
+            data_collector.collect(model)
+        return model, data_collector
+
+    def test_delta_records(self):
+        """Test that only changes are stored and that full panels are reconstructed."""
+        model, data_collector = self.run_delta_model(agent_storage="delta")
+        _, expected = self.run_delta_model()
+
+        changes = data_collector.get_agent_changes_dataframe()
+        assert changes["Event"].tolist() == ["enter"] * 5 + ["change", "exit", "enter"]
+        assert changes.index[5:].tolist() == [(2, 1), (2, 2), (3, 6)]
+        assert changes.loc[(2, 1), "value"] == 1
+
+        pd.testing.assert_frame_equal(
+            data_collector.get_agent_vars_dataframe(),
+            expected.get_agent_vars_dataframe(),
+        )
+        records = data_collector._agent_records
+        assert list(records) == [0, 1, 2, 3, 4]
+        for step in (3, 1, 4):
+            assert records[step] == expected._agent_records[step]
+
+        # collecting twice in a step replaces the changes of the step
+        model.agents[0].val = 100
+        data_collector.collect(model)
+        model.agents[0].val = 1
+        data_collector.collect(model)
+        assert len(data_collector.get_agent_changes_dataframe()) == 8
+        assert records[4] == expected._agent_records[4]
+
+        with self.assertRaises(ValueError):
+            expected.get_agent_changes_dataframe()
+
+    def test_delta_sink(self):
+        """Test flushing delta-encoded agent records to a sink."""
+        _, expected = self.run_delta_model()
+        with tempfile.TemporaryDirectory() as directory:
+            _, data_collector = self.run_delta_model(
+                agent_storage="delta", sink=CSVSink(directory, flush_every=2)
+            )
+            assert list(data_collector._agent_records) == [3, 4]
+            # the exit records make the flushed value column a float column
+            pd.testing.assert_frame_equal(
+                data_collector.get_agent_vars_dataframe(),
+                expected.get_agent_vars_dataframe(),
+                check_dtype=False,
+            )
+            assert len(data_collector.get_agent_changes_dataframe()) == 8
+
+
+class TestIncrementalDataFrames(unittest.TestCase):
+    """Tests for extending the DataFrames of earlier calls."""
+
+    def test_model_vars(self):
+        """Test that extended model DataFrames equal rebuilt ones."""
+        for schedules in ({}, {"steps": CollectionSchedule(every=2)}):
+            model = Model()
+            data_collector = DataCollector(
+                model_reporters={"steps": "steps", "double": lambda m: 2 * m.steps},
+                schedules=schedules,
+            )
+            for _ in range(5):
+                data_collector.collect(model)
+                df = data_collector.get_model_vars_dataframe()
+                # changing a returned DataFrame does not change later ones
+                df.iloc[0, 0] = -1
+                model.step()
+            data_collector.collect(model)
+
+            df = data_collector.get_model_vars_dataframe()
+            data_collector._model_vars_cache = None
+            pd.testing.assert_frame_equal(df, data_collector.get_model_vars_dataframe())
+            assert df["double"].tolist() == [0, 2, 4, 6, 8, 10]
+
+        assert len(data_collector.get_model_vars_dataframe(tail=2)) == 2
+        df = data_collector.get_model_vars_dataframe(max_rows=3)
+        assert df["double"].tolist() == [0, 4, 10]
+        df = data_collector.get_model_vars_dataframe(tail=4, max_rows=2)
+        assert df["double"].tolist() == [4, 10]
+
+    def test_agent_vars(self):
+        """Test that extended agent DataFrames equal rebuilt ones."""
+        for agent_storage in ("records", "columnar"):
+            model = Model()
+            for i in range(3):
+                MockAgent(model, val=i)
+            data_collector = DataCollector(
+                agent_reporters={"value": "val"}, agent_storage=agent_storage
+            )
+            data_collector.collect(model)
+            assert len(data_collector.get_agent_vars_dataframe()) == 3
+            for _ in range(3):
+                model.step()
+                for agent in model.agents:
+                    agent.val += 1
+                data_collector.collect(model)
+                data_collector.get_agent_vars_dataframe()
+
+            # collecting again in a step replaces the records of the last step
+            model.agents[0].val = 100
+            data_collector.collect(model)
+            df = data_collector.get_agent_vars_dataframe()
+            assert df.loc[(3, 1), "value"] == 100
+            assert data_collector._agent_frame_cache[2] == 3
+            data_collector._agent_frame_cache = None
+            pd.testing.assert_frame_equal(df, data_collector.get_agent_vars_dataframe())
+
+
+class TestCopyPolicy(unittest.TestCase):
+    """Tests for the copy policies of model reporters."""
+
+    def test_copy_policies(self):
+        """Test how each copy policy stores mutable and immutable values."""
+        model = Model()
+        model.values = [[1], [2]]
+        model.array = np.arange(3)
+        reporters = {
+            "auto": "values",
+            "none": "values",
+            "shallow": "values",
+            "deep": "values",
+            "array": "array",
+            "scalar": lambda m: np.float64(1.5),
+        }
+        data_collector = DataCollector(
+            model_reporters=reporters,
+            copy_policy={name: name for name in ("none", "shallow", "deep")},
+        )
+        data_collector.collect(model)
+        model.values[0].append(3)
+        model.values.append([4])
+        model.array[0] = 10
+
+        model_vars = data_collector.model_vars
+        assert model_vars["auto"][0] == [[1], [2]]
+        assert model_vars["none"][0] is model.values
+        assert model_vars["shallow"][0] == [[1, 3], [2]]
+        assert model_vars["deep"][0] == [[1], [2]]
+        assert model_vars["array"][0].tolist() == [0, 1, 2]
+        assert isinstance(model_vars["scalar"][0], np.float64)
+
+        assert _auto_copy(model.array) is not model.array
+        value = (1, "a")
+        assert _auto_copy(value) == value
+
+        data_collector = DataCollector(
+            model_reporters={"values": "values"}, copy_policy="none"
+        )
+        data_collector.collect(model)
+        assert data_collector.model_vars["values"][0] is model.values
+
+        with self.assertRaises(ValueError):
+            DataCollector(model_reporters={"values": "values"}, copy_policy="full")
+
+
+class TestCollectionSchedule(unittest.TestCase):
+    """Tests for the collection schedules of reporters."""
+
+    def make_model(self, agent_storage="records", **schedules):
+        """Create a model with 100 agents and scheduled reporters."""
+        model = Model(seed=42)
+        for i in range(100):
+            MockAgent(model, val=i)
+        model.datacollector = DataCollector(
+            model_reporters={
+                "total": lambda m: sum(a.val for a in m.agents),
+                "count": lambda m: len(m.agents),
+            },
+            agent_reporters={"value": "val", "double": lambda a: 2 * a.val},
+            agent_storage=agent_storage,
+            schedules=schedules,
+        )
+        return model
+
+    def run_model(self, model, n_steps):
+        """Collect at step 0 and after each of n_steps steps."""
+        model.datacollector.collect(model)
+        for _ in range(n_steps):
+            model.step()
+            for agent in model.agents:
+                agent.val += 1
+            model.datacollector.collect(model)
+
+    def test_schedule(self):
+        """Test when a schedule fires."""
+        model = Model()
+        schedule = CollectionSchedule(every=3, at=[4], when=lambda m: m.steps < 6)
+        fired = []
+        for _ in range(8):
+            if schedule.fires(model):
+                fired.append(model.steps)
+            model.step()
+        assert fired == [0, 3, 4]
+        assert CollectionSchedule().fires(model)
+        assert repr(CollectionSchedule(every=2)) == "CollectionSchedule(every=2)"
+
+        with self.assertRaises(ValueError):
+            CollectionSchedule(every=0)
+        with self.assertRaises(ValueError):
+            CollectionSchedule(sample=1.5)
+        with self.assertRaises(ValueError):
+            DataCollector(schedules={"missing": CollectionSchedule(every=2)})
+
+    def test_model_reporter_schedules(self):
+        """Test that scheduled model reporters are only run when they fire."""
+        calls = []
+
+        def total(m):
+            calls.append(m.steps)
+            return m.steps
+
+        model = Model()
+        model.datacollector = DataCollector(
+            model_reporters={"total": total, "steps": "steps"},
+            schedules={"total": CollectionSchedule(every=2)},
+        )
+        self.run_model(model, 4)
+        assert set(calls) == {0, 2, 4}
+        assert model.datacollector.model_vars["total"] == [0, 2, 4]
+
+        df = model.datacollector.get_model_vars_dataframe()
+        assert df.index.name == "Step"
+        assert list(df.index) == [0, 1, 2, 3, 4]
+        assert df["steps"].tolist() == [0, 1, 2, 3, 4]
+        assert df["total"].isna().tolist() == [False, True, False, True, False]
+
+    def test_agent_reporter_schedules(self):
+        """Test scheduled agent reporters in both agent storages."""
+        for agent_storage in ("records", "columnar"):
+            model = self.make_model(agent_storage, double=CollectionSchedule(at=[2]))
+            self.run_model(model, 3)
+            df = model.datacollector.get_agent_vars_dataframe()
+            assert len(df) == 400
+            assert df.loc[2, "double"].tolist() == [2 * (i + 2) for i in range(100)]
+            assert df.loc[1, "double"].isna().all()
+            assert df.loc[3, "value"].tolist() == [i + 3 for i in range(100)]
+
+            # nothing is recorded at steps where no agent reporter fires
+            model = self.make_model(
+                agent_storage,
+                value=CollectionSchedule(every=2),
+                double=CollectionSchedule(every=2),
+            )
+            self.run_model(model, 3)
+            assert list(model.datacollector._agent_records) == [0, 2]
+
+    def test_sampled_agent_reporters(self):
+        """Test that sampled agent reporters follow the same agents."""
+        for agent_storage in ("records", "columnar"):
+            sample = CollectionSchedule(sample=0.2)
+            model = self.make_model(agent_storage, value=sample, double=sample)
+            self.run_model(model, 2)
+            df = model.datacollector.get_agent_vars_dataframe()
+            ids = [df.loc[step].index.tolist() for step in range(3)]
+            assert ids[0] == ids[1] == ids[2]
+            assert 5 < len(ids[0]) < 40
+
+            # agents sampled by only one of the reporters have missing values for the other
+            model = self.make_model(
+                agent_storage,
+                value=CollectionSchedule(sample=0.2, seed=1),
+                double=CollectionSchedule(sample=0.2, seed=2),
+            )
+            self.run_model(model, 0)
+            df = model.datacollector.get_agent_vars_dataframe()
+            assert df["value"].isna().any()
+            assert df["double"].isna().any()
+            assert not (df["value"].isna() & df["double"].isna()).any()
+
+        # the sample depends on the seed of the model
+        ids = np.arange(1000)
+        mask = sample.sampled(Model(seed=1), ids)
+        assert (mask == sample.sampled(Model(seed=1), ids)).all()
+        assert (mask != sample.sampled(Model(seed=2), ids)).any()
+        assert CollectionSchedule(sample=1.0).sampled(Model(), ids).all()
+
+    def test_scheduled_sink(self):
+        """Test flushing scheduled model reporters to a sink."""
+        with tempfile.TemporaryDirectory() as directory:
+            model = Model()
+            model.datacollector = DataCollector(
+                model_reporters={"steps": "steps", "odd": "steps"},
+                schedules={"odd": CollectionSchedule(when=lambda m: m.steps % 2)},
+                sink=CSVSink(directory, flush_every=2),
+            )
+            self.run_model(model, 5)
+            df = model.datacollector.get_model_vars_dataframe()
+            assert df["steps"].tolist() == list(range(6))
+            assert df["odd"].tolist()[1::2] == [1, 3, 5]
+            assert df["odd"].isna().tolist()[::2] == [True] * 3
+
+
+class TestAgentStatistics(unittest.TestCase):
+    """Tests for the summary statistics of agent attributes."""
+
+    def test_statistics(self):
+        """Test the statistics of an attribute of all agents."""
+        model = Model()
+        for i in range(10):
+            MockAgent(model, val=i)
+        Agent(model)  # has no val attribute
+        data_collector = DataCollector(
+            agent_statistics={
+                "val": AgentStatistics(
+                    "val", quantiles=[0.5, 0.9], bins=[0, 5, 10], gini=True
+                )
+            }
+        )
+        data_collector.collect(model)
+        model.step()
+        for agent in model.agents_by_type[MockAgent]:
+            agent.val = 1
+        data_collector.collect(model)
+
+        df = data_collector.get_agent_statistics_dataframe("val")
+        values = np.arange(10)
+        assert list(df.columns) == [
+            "count",
+            "mean",
+            "var",
+            "min",
+            "max",
+            "q0.5",
+            "q0.9",
+            "gini",
+            "bin_0",
+            "bin_1",
+        ]
+        assert list(df.index) == [0, 1]
+        first = df.loc[0]
+        assert first["count"] == 10
+        assert first["mean"] == values.mean()
+        assert first["var"] == values.var()
+        assert (first["min"], first["max"]) == (0, 9)
+        assert first["q0.9"] == np.quantile(values, 0.9)
+        differences = np.abs(values[:, None] - values[None, :]).sum()
+        assert np.isclose(first["gini"], differences / (2 * 10**2 * values.mean()))
+        assert (first["bin_0"], first["bin_1"]) == (5, 5)
+        assert df.loc[1, "gini"] == 0
+        assert df.loc[1, "var"] == 0
+
+        with self.assertRaises(ValueError):
+            AgentStatistics("val", quantiles=[2])
+        with self.assertRaises(ValueError):
+            AgentStatistics("val", bins=[1, 0])
+
+    def test_statistics_by_type(self):
+        """Test statistics grouped by agent type, with a schedule and a sink."""
+        with tempfile.TemporaryDirectory() as directory:
+            model = Model()
+            for i in range(4):
+                MockAgentA(model, val=i)
+            Agent(model)
+            data_collector = DataCollector(
+                agent_statistics={"a": AgentStatistics("val", by_type=True)},
+                schedules={"a": CollectionSchedule(every=2)},
+                sink=CSVSink(directory, flush_every=2),
+            )
+            data_collector.collect(model)
+            for _ in range(4):
+                model.step()
+                data_collector.collect(model)
+
+            df = data_collector.get_agent_statistics_dataframe("a")
+            assert df.index.names == ["Step", "AgentType"]
+            assert df.loc[(4, "MockAgentA"), "mean"] == 1.5
+            assert df.loc[(0, "Agent"), "count"] == 0
+            assert np.isnan(df.loc[(2, "Agent"), "mean"])
+            assert list(df.index.get_level_values("Step")) == [0, 0, 2, 2, 4, 4]
+
+
 class TestDataCollectorWithAgentTypes(unittest.TestCase):
     """Tests for DataCollector with agent-type-specific reporters."""
 
+    datacollector_kwargs = {}
+
     def setUp(self):
         """Create the model and run it a set number of steps."""
-        self.model = MockModelWithAgentTypes()
+        self.model = MockModelWithAgentTypes(**self.datacollector_kwargs)
         for _ in range(5):
             self.model.step()
 
@@ -352,6 +872,149 @@ class TestDataCollectorWithAgentTypes(unittest.TestCase):
         self.assertTrue(super_data.equals(agent_data))
 
 
+class TestMergedAgentTypeRecords(TestDataCollectorWithAgentTypes):
+    """Tests for agent-type records merged into the columnar agent records."""
+
+    datacollector_kwargs = {"agent_storage": "columnar", "merge_agenttype": True}
+
+    def test_merged_records(self):
+        """Test that merged records match separately stored ones."""
+        expected = MockModelWithAgentTypes()
+        for _ in range(5):
+            expected.step()
+        data_collector = self.model.datacollector
+        assert data_collector._agenttype_records == {}
+        assert len(data_collector._agent_records.columns) == 5
+
+        for agent_type in (MockAgentA, MockAgentB):
+            pd.testing.assert_frame_equal(
+                data_collector.get_agenttype_vars_dataframe(agent_type).sort_index(),
+                expected.datacollector.get_agenttype_vars_dataframe(
+                    agent_type
+                ).sort_index(),
+                check_dtype=False,
+            )
+        pd.testing.assert_frame_equal(
+            data_collector.get_agent_vars_dataframe().sort_index(),
+            expected.datacollector.get_agent_vars_dataframe().sort_index(),
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            model = MockModelWithAgentTypes(
+                sink=CSVSink(directory, flush_every=2), **self.datacollector_kwargs
+            )
+            for _ in range(5):
+                model.step()
+            assert (
+                len(model.datacollector.get_agenttype_vars_dataframe(MockAgentA)) == 25
+            )
+
+        with self.assertRaises(ValueError):
+            DataCollector(merge_agenttype=True)
+
+
+class TestDataCollectorSinks(unittest.TestCase):
+    """Tests for flushing collected data to sinks."""
+
+    def run_model(self, sink, agent_storage="records"):
+        """Run a MockModelWithAgentTypes with a sink and return the model and a model without one."""
+        models = []
+        for model_sink in (sink, None):
+            model = MockModelWithAgentTypes()
+            model.datacollector = DataCollector(
+                model_reporters={"total_agents": lambda m: len(m.agents)},
+                agent_reporters={"value": lambda a: a.val},
+                agenttype_reporters={MockAgentA: {"type_a_val": "type_a_val"}},
+                tables={"events": ["step", "kind"]},
+                agent_storage=agent_storage,
+                sink=model_sink,
+            )
+            for _ in range(7):
+                model.step()
+                if model.steps == 4:
+                    model.agents[2].remove()
+                model.datacollector.add_table_row(
+                    "events", {"step": model.steps, "kind": "tick"}
+                )
+            models.append(model)
+        return models
+
+    def assert_same_data(self, model, expected):
+        """Check that all data of the model matches the data of the expected model."""
+        data_collector = model.datacollector
+        expected = expected.datacollector
+        pd.testing.assert_frame_equal(
+            data_collector.get_model_vars_dataframe(),
+            expected.get_model_vars_dataframe(),
+            check_dtype=False,
+        )
+        pd.testing.assert_frame_equal(
+            data_collector.get_agent_vars_dataframe(),
+            expected.get_agent_vars_dataframe(),
+            check_dtype=False,
+        )
+        pd.testing.assert_frame_equal(
+            data_collector.get_agenttype_vars_dataframe(MockAgentA),
+            expected.get_agenttype_vars_dataframe(MockAgentA),
+            check_dtype=False,
+        )
+        pd.testing.assert_frame_equal(
+            data_collector.get_table_dataframe("events"),
+            expected.get_table_dataframe("events"),
+            check_dtype=False,
+        )
+
+    def test_sinks(self):
+        """Test that data read back from each sink matches data kept in memory."""
+        for sink_class, target in (
+            (CSVSink, ""),
+            (ParquetSink, ""),
+            (SQLiteSink, "data.db"),
+        ):
+            for agent_storage in ("records", "columnar"):
+                with (
+                    self.subTest(sink=sink_class.__name__, agent_storage=agent_storage),
+                    tempfile.TemporaryDirectory() as directory,
+                ):
+                    sink = sink_class(
+                        Path(directory) / target, flush_every=3, keep_last=2
+                    )
+                    model, expected = self.run_model(sink, agent_storage)
+                    data_collector = model.datacollector
+
+                    # flushed at steps 3 and 6, keeping the last 2 collections
+                    assert len(data_collector.model_vars["total_agents"]) == 3
+                    assert list(data_collector._agent_records) == [5, 6, 7]
+                    assert len(data_collector.tables["events"]["step"]) == 2
+                    self.assert_same_data(model, expected)
+
+                    data_collector.flush()
+                    assert not data_collector.model_vars["total_agents"]
+                    assert not data_collector._agent_records
+                    self.assert_same_data(model, expected)
+
+    def test_sink_max_rows(self):
+        """Test flushing when the number of rows in memory reaches max_rows."""
+        with tempfile.TemporaryDirectory() as directory:
+            sink = CSVSink(directory, flush_every=None, max_rows=25, keep_last=0)
+            model, expected = self.run_model(sink)
+            # each collection adds 1 model row, 10 or 9 agent rows, and 5 or 4 agent type rows
+            assert list(model.datacollector._agent_records) == [7]
+            self.assert_same_data(model, expected)
+
+            # a new sink replaces the tables written by an earlier one
+            sink = CSVSink(directory, flush_every=1, keep_last=0)
+            model, expected = self.run_model(sink)
+            self.assert_same_data(model, expected)
+
+        with self.assertRaises(ValueError):
+            DataCollector().flush()
+        with self.assertRaises(ValueError):
+            CSVSink(directory, keep_last=-1)
+        with self.assertRaises(TypeError):
+            DataSink()
+
+
 class MockModelForErrors(Model):
     """Test model for error handling."""
 
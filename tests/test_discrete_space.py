@@ -635,6 +635,13 @@ def test_cell_collection():
     agent = collection.select_random_agent()
     assert agent in set(collection.agents)
 
+    # draws the same agents as random.choice on the list of agents
+    for seed in range(10):
+        collection.random.seed(seed)
+        agent = collection.select_random_agent()
+        collection.random.seed(seed)
+        assert agent is collection.random.choice(list(collection.agents))
+
     agents = collection[cells[0]]
     assert agents == cells[0].agents
 
@@ -661,6 +668,8 @@ def test_empty_cell_collection():
     assert collection._capacity is None
     assert list(collection.cells) == []
     assert list(collection.agents) == []
+    with pytest.raises(IndexError):
+        collection.select_random_agent()
 
     # Test selecting from empty collection
     selected = collection.select(lambda cell: True)
@@ -967,6 +976,39 @@ def test_cell_agent():  # noqa: D103
     assert agent in cell2.agents
 
 
+def test_cell_agent_bulk_removal():
+    """Test removing many agents from cells in one operation."""
+    model = Model(seed=42)
+    grid = OrthogonalMooreGrid((5, 5), torus=False, random=model.random)
+
+    agents = list(CellAgent.create_agents(model, 50))
+    for agent in agents:
+        agent.cell = model.random.choice(grid.all_cells.cells)
+    patches = list(FixedAgent.create_agents(model, 25))
+    for patch, cell in zip(patches, grid.all_cells):
+        patch.cell = cell
+
+    cell = agents[0].cell
+    neighborhood_agents = list(cell.neighborhood.agents)
+
+    model.remove_agents(agents[:25] + patches[:10])
+    assert len(model.agents) == 40
+    for agent in agents[:25]:
+        assert agent.cell is None
+    for agent in agents[25:]:
+        assert agent in agent.cell.agents
+    assert all(agent not in c.agents for c in grid.all_cells for agent in agents[:25])
+    for patch in patches[:10]:
+        assert patch not in patch.cell.agents
+    assert sum(len(c.agents) for c in grid.all_cells) == 40
+
+    # cell collections share the agent lists of the cells
+    assert list(cell.neighborhood.agents) == [
+        agent for agent in neighborhood_agents if agent in model.agents
+    ]
+    assert cell.empty == cell.is_empty
+
+
 def test_grid2DMovingAgent():  # noqa: D103
     # we first test on a moore grid because all directions are defined
     grid = OrthogonalMooreGrid((10, 10), torus=False, random=random.Random(42))
@@ -0,0 +1,153 @@
+"""Tests for lockstep ensembles of replicate models."""
+
+import numpy as np
+import pytest
+
+from mesa import Agent, Model
+from mesa.discrete_space import OrthogonalMooreGrid
+from mesa.experimental.columnar import ColumnarAttribute
+from mesa.experimental.ensemble import Ensemble
+
+
+class WealthAgent(Agent):
+    """Agent with a columnar attribute."""
+
+    wealth = ColumnarAttribute(dtype=int, default=1)
+
+
+class PlainAgent(Agent):
+    """Agent with an ordinary attribute."""
+
+    def __init__(self, model):
+        """Initialize the agent."""
+        super().__init__(model)
+        self.energy = self.random.random()
+
+
+class GridModel(Model):
+    """Model with a grid, a property layer, and agents."""
+
+    def __init__(self, width=5, n=4, seed=None):
+        """Initialize the model."""
+        super().__init__(seed=seed)
+        self.grid = OrthogonalMooreGrid((width, width), torus=True, random=self.random)
+        self.grid.create_property_layer("sugar", default_value=1.0)
+        WealthAgent.create_agents(self, n)
+        PlainAgent.create_agents(self, n)
+
+    def step(self):
+        """Grow the sugar and stop after three steps."""
+        self.grid.sugar.data += 1
+        if self.steps == 3 + self._seed:
+            self.running = False
+
+
+def test_ensemble_creation():
+    """Test seeding and shared grid topology."""
+    ensemble = Ensemble(GridModel, rng=[0, 1, 2], parameters={"width": 4})
+
+    assert len(ensemble) == 3
+    assert [model._seed for model in ensemble] == [0, 1, 2]
+    assert ensemble[1] is ensemble.models[1]
+    assert (
+        ensemble.get(PlainAgent, "energy")[0, 0]
+        != ensemble.get(PlainAgent, "energy")[1, 0]
+    )
+
+    reference = GridModel(width=4).grid
+    for model in ensemble:
+        for cell in model.grid.all_cells:
+            ref_cell = reference._cells[cell.coordinate]
+            assert {k: c.coordinate for k, c in cell.connections.items()} == {
+                k: c.coordinate for k, c in ref_cell.connections.items()
+            }
+            # connections point to cells of the own grid
+            assert all(
+                model.grid._cells[c.coordinate] is c for c in cell.connections.values()
+            )
+        assert len(model.grid._cells[(0, 0)].neighborhood) == 8
+
+
+def test_ensemble_run():
+    """Test lockstep stepping of the replicates."""
+    ensemble = Ensemble(GridModel, rng=[0, 1])
+    ensemble.step()
+    assert [model.steps for model in ensemble] == [1, 1]
+
+    ensemble.run_model()
+    assert not ensemble.running
+    assert [model.steps for model in ensemble] == [3, 4]
+
+    ensemble = Ensemble(GridModel, rng=[5])
+    ensemble.run_model(max_steps=2)
+    assert ensemble[0].steps == 2
+
+
+def test_ensemble_property_layer():
+    """Test the stacked property layers."""
+    ensemble = Ensemble(GridModel, rng=[0, 1, 2])
+    sugar = ensemble.property_layer("sugar")
+    assert sugar.shape == (3, 5, 5)
+    assert ensemble.property_layer("sugar") is sugar
+
+    # writes go both ways
+    sugar[1] += 1
+    assert ensemble[1].grid.sugar.data[0, 0] == 2
+    assert ensemble[1].grid._cells[(0, 0)].sugar == 2
+    ensemble[2].grid._cells[(0, 0)].sugar = 10
+    assert sugar[2, 0, 0] == 10
+    ensemble.step()
+    assert np.all(sugar[0] == 2)
+
+    # replacing the data of a layer detaches it, so the layers are stacked again
+    ensemble[0].grid.sugar.modify_cells(np.multiply, 2)
+    restacked = ensemble.property_layer("sugar")
+    assert restacked is not sugar
+    assert restacked[0, 0, 0] == 4
+
+    with pytest.raises(KeyError):
+        ensemble.property_layer("water")
+
+
+def test_ensemble_agent_attributes():
+    """Test getting and setting agent attributes across replicates."""
+    ensemble = Ensemble(GridModel, rng=[0, 1])
+
+    wealth = ensemble.get(WealthAgent, "wealth")
+    assert wealth.shape == (2, 4)
+    assert np.all(wealth == 1)
+    ensemble.set(WealthAgent, "wealth", wealth + np.arange(4))
+    assert ensemble[1].agents_by_type[WealthAgent][3].wealth == 4
+
+    energy = ensemble.get(PlainAgent, "energy")
+    assert energy.shape == (2, 4)
+    ensemble.set(PlainAgent, "energy", np.zeros((2, 4)))
+    assert ensemble[0].agents_by_type[PlainAgent].get("energy") == [0.0] * 4
+
+    with pytest.raises(ValueError):
+        ensemble.set(WealthAgent, "wealth", np.zeros((1, 4)))
+
+    ensemble[0].agents_by_type[WealthAgent][0].remove()
+    with pytest.raises(ValueError):
+        ensemble.get(WealthAgent, "wealth")
+
+
+class SometimesEmptyModel(Model):
+    """Model that only creates agents for even seeds."""
+
+    def __init__(self, seed=None):
+        """Initialize the model."""
+        super().__init__(seed=seed)
+        if seed % 2 == 0:
+            PlainAgent.create_agents(self, 3)
+
+
+def test_ensemble_missing_agent_type():
+    """Test getting attributes of a type that some replicates have no agents of."""
+    ensemble = Ensemble(SometimesEmptyModel, rng=[1, 3])
+    assert ensemble.get(PlainAgent, "energy").shape == (2, 0)
+    ensemble.set(PlainAgent, "energy", np.zeros((2, 0)))
+
+    ensemble = Ensemble(SometimesEmptyModel, rng=[0, 1])
+    with pytest.raises(ValueError):
+        ensemble.get(PlainAgent, "energy")
@@ -4,7 +4,7 @@ import logging
 
 import pytest
 
-from mesa import mesa_logging
+from mesa import Agent, Model, mesa_logging
 
 
 @pytest.fixture
@@ -16,6 +16,15 @@ def tear_down():
     ema_logger.handlers = []
 
 
+class Logged:
+    """Class with a logged method."""
+
+    @mesa_logging.method_logger(__name__)
+    def method(self, value):
+        """Return the value."""
+        return value
+
+
 def test_get_logger():
     """Test get_logger."""
     mesa_logging._rootlogger = None
@@ -45,3 +54,41 @@ def test_log_to_stderr():
     logger = mesa_logging.log_to_stderr()
     assert len(logger.handlers) == 2
     assert logger.level == mesa_logging.DEFAULT_LEVEL
+
+
+def test_method_logger(caplog):
+    """Test that method loggers are installed on demand."""
+    caplog.set_level(logging.DEBUG, logger=mesa_logging.LOGGER_NAME)
+    method = Logged.__dict__["method"]
+    if not mesa_logging._method_loggers_installed:
+        assert not hasattr(method, "__wrapped__")
+    mesa_logging.install_method_loggers()
+    assert Logged.method.__wrapped__ is getattr(method, "__wrapped__", method)
+
+    assert Logged().method(5) == 5
+    assert "calling Logged.method with (5,) and {}" in caplog.messages
+
+    @mesa_logging.method_logger(__name__)
+    def later(self):
+        pass
+
+    assert hasattr(later, "__wrapped__")
+
+
+def test_hot_path_logging(caplog):
+    """Test the log messages on the step and registration hot path."""
+    caplog.set_level(logging.DEBUG, logger=mesa_logging.LOGGER_NAME)
+    model = Model(seed=42)
+    agent = Agent(model)
+    model.step()
+    agent.remove()
+    assert caplog.messages[-3:] == [
+        "registered Agent with agent_id 1",
+        "calling model.step for step 1 at time 1.0",
+        "deregistered agent with agent_id 1",
+    ]
+
+    caplog.clear()
+    caplog.set_level(logging.WARNING, logger=mesa_logging.LOGGER_NAME)
+    model.step()
+    assert not caplog.messages
@@ -288,3 +288,28 @@ def test_Computable():
         MyAgent(model, 10)
 
     # parents disappearing
+
+
+def test_observable_index():
+    """Test that AgentSet indexes follow Observables through their signals."""
+
+    class MyAgent(Agent, HasObservables):
+        state = Observable()
+
+        def __init__(self, model, value):
+            super().__init__(model)
+            self.state = value
+
+    model = Model(seed=42)
+    agents = [MyAgent(model, i % 3) for i in range(30)]
+    model.agents.index_by("state")
+
+    assert len(model.agents.select(where={"state": 0})) == 10
+    agents[1].state = 0
+    assert len(model.agents.select(where={"state": 0})) == 11
+    assert type(MyAgent.__dict__["state"]) is Observable
+
+    agents[1].remove()
+    assert len(model.agents.select(where={"state": 0})) == 10
+    agents[1].state = 2  # no longer in the agentset
+    assert agents[1] not in model.agents.select(where={"state": 2})
@@ -1,9 +1,19 @@
 """Tests for model.py."""
 
+import gc
+import logging
+import pickle
+import tracemalloc
+import weakref
+
 import numpy as np
+import pytest
 
 from mesa.agent import Agent, AgentSet
+from mesa.batchrunner import batch_run
+from mesa.datacollection import DataCollector
 from mesa.experimental.devs.simulator import DEVSimulator
+from mesa.mesa_logging import LOGGER_NAME
 from mesa.model import Model
 
 
@@ -171,6 +181,29 @@ def test_agents_by_type():
     assert len(model.agents_by_type) == 2
 
 
+def test_agentsets_by_class():
+    """Test the index of the agentsets of each class and its subclasses."""
+
+    class Animal(Agent):
+        pass
+
+    class Wolf(Animal):
+        pass
+
+    class Sheep(Animal):
+        pass
+
+    model = Model()
+    Wolf(model)
+    Sheep.create_agents(model, 2)
+
+    index = model._agentsets_by_class
+    assert index[Wolf] == [model.agents_by_type[Wolf]]
+    assert index[Animal] == [model.agents_by_type[Wolf], model.agents_by_type[Sheep]]
+    assert index[Agent] == index[Animal]
+    assert Animal not in model.agents_by_type
+
+
 def test_agent_remove():
     """Test removing all agents from the model."""
 
@@ -184,3 +217,175 @@ def test_agent_remove():
 
     model.remove_all_agents()
     assert len(model.agents) == 0
+
+
+def test_remove_agents():
+    """Test removing many agents from the model in one operation."""
+
+    class TestAgent(Agent):
+        pass
+
+    class CustomRemoveAgent(Agent):
+        def __init__(self, model):
+            super().__init__(model)
+            self.removed = False
+
+        def remove(self):
+            super().remove()
+            self.removed = True
+
+    model = Model(seed=42)
+    agents = list(TestAgent.create_agents(model, 100))
+    custom = list(CustomRemoveAgent.create_agents(model, 10))
+
+    model.remove_agents(agents[:50])
+    assert len(model.agents) == 60
+    assert len(model.agents_by_type[TestAgent]) == 50
+    assert all(agent not in model.agents for agent in agents[:50])
+
+    # removing agents that are no longer in the model is ignored
+    model.remove_agents(agents[:10])
+    assert len(model.agents) == 60
+
+    # classes overriding remove fall back to calling it for each agent
+    model.remove_agents(custom[:5])
+    assert all(agent.removed for agent in custom[:5])
+    assert not any(agent.removed for agent in custom[5:])
+
+    # boolean mask aligned with model.agents
+    mask = np.asarray([isinstance(agent, CustomRemoveAgent) for agent in model.agents])
+    model.remove_agents(mask)
+    assert len(model.agents) == 50
+    assert all(agent.removed for agent in custom)
+
+    model.deregister_agents(agents[50:60])
+    assert len(model.agents) == 40
+    with pytest.raises(KeyError):
+        model.deregister_agents(agents[55:65])
+    assert len(model.agents) == 40
+
+
+class _DyingAgent(Agent):
+    def __init__(self, model, die=False, others=()):
+        super().__init__(model)
+        if die:
+            self.remove()
+        if others:
+            model.remove_agents(others)
+
+
+def test_remove_agents_during_create_agents():
+    """Test that agents removed while create_agents runs are not registered."""
+    model = Model(seed=42)
+    agents = _DyingAgent.create_agents(model, 4, die=[True, False, True, False])
+    assert len(model.agents) == 2
+    assert [agent.unique_id for agent in model.agents] == [2, 4]
+    assert len(agents) == 2
+
+    # agents that remove agents they created themselves
+    class Remover(_DyingAgent):
+        def __init__(self, model):
+            super().__init__(model, others=_DyingAgent.create_agents(model, 2))
+
+    Remover.create_agents(model, 3)
+    assert len(model.agents) == 5
+    assert len(model.agents_by_type[_DyingAgent]) == 2
+
+    with pytest.raises(KeyError):
+        model.deregister_agent(_DyingAgent(Model(seed=42)))
+
+
+class _ShortLivedModel(Model):
+    """Model that keeps track of all its instances through weak references."""
+
+    instances = []
+
+    def __init__(self, n=10, seed=None):
+        super().__init__(seed=seed)
+        _ShortLivedModel.instances.append(weakref.ref(self))
+        Agent.create_agents(self, n)
+        Agent(self)
+        self.datacollector = DataCollector(
+            model_reporters={"n_agents": lambda m: len(m.agents)},
+            agent_reporters={"unique_id": "unique_id"},
+        )
+
+    def step(self):
+        self.datacollector.collect(self)
+        self.agents.select(at_most=1)[0].remove()
+
+
+def test_agent_ids():
+    """Test that unique_ids are allocated per model."""
+    model = Model(seed=42)
+    other = Model(seed=42)
+    assert [Agent(model).unique_id for _ in range(3)] == [1, 2, 3]
+    assert Agent(other).unique_id == 1
+
+    assert model._agent_ids.reserve(10) == range(4, 14)
+    assert Agent(model).unique_id == 14
+    agents = Agent.create_agents(model, 5)
+    assert [agent.unique_id for agent in agents] == list(range(15, 20))
+
+    copied = pickle.loads(pickle.dumps(model))  # noqa: S301
+    assert Agent(copied).unique_id == Agent(model).unique_id == 20
+
+
+class _Child(Agent):
+    pass
+
+
+class _Parent(Agent):
+    def __init__(self, model):
+        super().__init__(model)
+        self.child = _Child(model)
+
+
+def test_agent_ids_nested_creation():
+    """Test that bulk-created agents get consecutive ids when their __init__ creates agents."""
+    model = Model(seed=42)
+    parents = _Parent.create_agents(model, 3)
+    assert [parent.unique_id for parent in parents] == [1, 2, 3]
+    assert [parent.child.unique_id for parent in parents] == [4, 5, 6]
+
+    children = _Child.create_agents(model, 2)
+    assert [child.unique_id for child in children] == [7, 8]
+    assert Agent(model).unique_id == 9
+
+
+def test_short_lived_models_are_freed(caplog):
+    """Memory regression test, models should be freed once they are no longer used."""
+    # captured debug log records would otherwise show up as growing memory
+    caplog.set_level(logging.WARNING, logger=LOGGER_NAME)
+    _ShortLivedModel.instances.clear()
+    gc.collect()
+
+    batch_run(
+        _ShortLivedModel,
+        parameters={"n": [10, 50]},
+        rng=range(100),
+        max_steps=5,
+        number_processes=1,
+        display_progress=False,
+    )
+    gc.collect()
+    assert len(_ShortLivedModel.instances) == 200
+    assert all(ref() is None for ref in _ShortLivedModel.instances)
+
+    # memory allocated by mesa does not grow with the number of models that have been run
+    def mesa_memory():
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(True, "*/mesa/*")]
+        )
+        return sum(stat.size for stat in snapshot.statistics("filename"))
+
+    tracemalloc.start()
+    for seed in range(100):
+        _ShortLivedModel(seed=seed).step()
+    baseline = mesa_memory()
+    for seed in range(500):
+        _ShortLivedModel(seed=seed).step()
+    current = mesa_memory()
+    tracemalloc.stop()
+    assert current - baseline < 50_000
@@ -0,0 +1,174 @@
+"""Tests for step profiling."""
+
+import pickle
+
+import pytest
+
+from mesa import DataCollector, Model
+from mesa.agent import AgentSet
+from mesa.discrete_space import Cell, CellAgent, OrthogonalMooreGrid
+from mesa.profiling import StepProfiler
+
+
+class Walker(CellAgent):
+    """Agent that walks to a random neighboring cell."""
+
+    def step(self):
+        """Move to a random neighbor."""
+        self.cell = self.cell.neighborhood.select_random_cell()
+
+    def wealth(self):
+        """Return the wealth of the agent."""
+        return self.unique_id
+
+
+class Sitter(Walker):
+    """Agent that stays where it is."""
+
+    def step(self):
+        """Do nothing."""
+
+
+class WalkerModel(Model):
+    """Model with walking and sitting agents."""
+
+    def __init__(self, seed=42):
+        """Initialize the model."""
+        super().__init__(seed=seed)
+        self.grid = OrthogonalMooreGrid((10, 10), torus=True, random=self.random)
+        for agent_type, n in ((Walker, 5), (Sitter, 3)):
+            for cell in self.random.sample(list(self.grid.all_cells), n):
+                agent = agent_type(self)
+                agent.cell = cell
+        self.datacollector = DataCollector({"n_agents": lambda m: len(m.agents)})
+        self.wealth = []
+
+    def step(self):
+        """Step the agents and collect data."""
+        self.agents.shuffle_do("step")
+        self.wealth = AgentSet(self.agents, random=self.random).map("wealth")
+        self.agents_by_type[Walker].do(lambda agent: None)
+        self.datacollector.collect(self)
+
+
+def test_step_profiler():
+    """Test the records of a StepProfiler."""
+    model = WalkerModel()
+    add_agent = Cell.add_agent
+    collect = DataCollector.collect
+    records = []
+    profiler = StepProfiler(model, buffer_size=2, callback=records.append)
+
+    model.step()
+    assert not profiler.records
+
+    with profiler:
+        assert profiler.enabled
+        assert Cell.add_agent is not add_agent
+        for _ in range(3):
+            model.step()
+
+    assert not profiler.enabled
+    assert Cell.add_agent is add_agent
+    assert DataCollector.collect is collect
+    assert model.wealth == sorted(model.wealth) == list(range(1, 9))
+
+    model.step()
+    assert len(records) == 3
+    assert list(profiler.records) == records[1:]
+
+    record = records[0]
+    assert record.step == 2
+    assert record.duration > 0
+    assert set(record.activations) == {
+        (Walker, "step"),
+        (Sitter, "step"),
+        (Walker, "wealth"),
+        (Sitter, "wealth"),
+        (Walker, "WalkerModel.step.<locals>.<lambda>"),
+    }
+    assert record.activations[Walker, "step"][0] == 5
+    assert record.activations[Sitter, "step"][0] == 3
+    assert record.activations[Walker, "WalkerModel.step.<locals>.<lambda>"][0] == 5
+    assert record.collect > 0
+    # each walker selects a neighboring cell, leaves its cell, and enters the new one
+    assert record.space_calls == 5 * 3
+    assert 0 < record.space < record.duration
+
+    df = profiler.to_dataframe()
+    assert df["step"].tolist() == [3, 4]
+    assert (df["duration"] >= df["activations"]).all()
+
+    df = profiler.activations_dataframe()
+    assert len(df) == 10
+    assert set(df["agent_type"]) == {"Walker", "Sitter"}
+    assert df.groupby("step")["n_agents"].sum().tolist() == [21, 21]
+
+
+def test_step_profiler_enable():
+    """Test enabling and disabling StepProfilers."""
+    model = WalkerModel()
+    other_model = WalkerModel()
+    add_agent = Cell.add_agent
+
+    profiler = StepProfiler(model)
+    other = StepProfiler(other_model)
+    profiler.enable()
+    profiler.enable()
+    other.enable()
+    with pytest.raises(ValueError):
+        StepProfiler(model).enable()
+
+    profiler.disable()
+    assert Cell.add_agent is not add_agent
+    model.step()
+    other_model.step()
+    assert not profiler.records
+    assert len(other.records) == 1
+
+    other.disable()
+    other.disable()
+    assert Cell.add_agent is add_agent
+
+
+class NestingModel(WalkerModel):
+    """Model that steps another model within its own step."""
+
+    def __init__(self, seed=42):
+        """Initialize the model and the inner model."""
+        super().__init__(seed=seed)
+        self.inner = WalkerModel(seed=seed)
+
+    def step(self):
+        """Step the agents, then the inner model."""
+        super().step()
+        self.inner.step()
+
+
+def test_step_profiler_nested_models():
+    """Test that a profiler only records the steps of its own model."""
+    model = NestingModel()
+    with StepProfiler(model) as profiler:
+        model.step()
+    (record,) = profiler.records
+    assert record.activations[Walker, "step"][0] == 5
+    assert record.space_calls == 5 * 3
+
+    with StepProfiler(model) as profiler, StepProfiler(model.inner) as inner:
+        model.step()
+    assert profiler.records[0].activations[Walker, "step"][0] == 5
+    assert inner.records[0].activations[Walker, "step"][0] == 5
+    assert inner.records[0].space_calls == 5 * 3
+
+
+def test_step_profiler_pickle():
+    """Test that models can be pickled and forked while profiled, without their profiler."""
+    model = Model(seed=42)
+    profiler = StepProfiler(model)
+    with profiler:
+        model.step()
+        copied = pickle.loads(pickle.dumps(model))  # noqa: S301
+        assert copied._profiler is None
+        assert model.fork()._profiler is None
+        assert len(pickle.loads(pickle.dumps(profiler)).records) == 1  # noqa: S301
+        assert profiler.enabled
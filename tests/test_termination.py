@@ -0,0 +1,109 @@
+"""Tests for termination criteria."""
+
+import pytest
+
+from mesa import DataCollector, Model
+from mesa.datacollection import CSVSink
+from mesa.termination import (
+    CycleDetected,
+    RelativeChange,
+    SteadyState,
+    TerminationCriterion,
+    should_terminate,
+)
+
+
+class SeriesModel(Model):
+    """Model that reports the values of a fixed series, one per step."""
+
+    def __init__(self, series, seed=42):
+        """Initialize the model."""
+        super().__init__(seed=seed)
+        self.series = series
+        self.datacollector = DataCollector(
+            {"x": lambda m: m.series[m.steps - 1], "steps": "steps"}
+        )
+
+    def step(self):
+        """Collect the next value, stopping at the end of the series."""
+        self.datacollector.collect(self)
+        if self.steps == len(self.series):
+            self.running = False
+
+
+def run_until(series, termination):
+    """Run a SeriesModel with the termination criteria and return the number of steps."""
+    model = SeriesModel(series)
+    model.run_model(termination=termination)
+    return model.steps
+
+
+def test_steady_state():
+    """Test the sliding window variance criterion."""
+    series = [10, 5, 8, 3, 4, 4, 4, 4, 4, 9]
+    assert run_until(series, SteadyState("x", window=3, threshold=1e-9)) == 7
+    assert run_until(series, SteadyState("x", window=20, threshold=1e-9)) == 10
+
+    with pytest.raises(ValueError):
+        SteadyState("x", window=1, threshold=0.1)
+
+
+def test_relative_change():
+    """Test the relative change criterion."""
+    series = [100, 50, 52, 52.5, 52.6, 52.6, 0, 0, 0]
+    assert run_until(series, RelativeChange("x", tolerance=0.05)) == 3
+    assert run_until(series, RelativeChange("x", tolerance=0.05, patience=3)) == 5
+    assert run_until([1, 0, 0], RelativeChange("x", tolerance=0.01)) == 3
+
+    with pytest.raises(ValueError):
+        RelativeChange("x", tolerance=0.1, patience=0)
+
+
+def test_cycle_detected():
+    """Test cycle detection."""
+    series = [5, 1, 2, 3, 1, 2, 3, 1, 2, 3, 7, 7, 7]
+    assert run_until(series, CycleDetected("x", max_period=3)) == 10
+    assert run_until(series, CycleDetected("x", max_period=2)) == 13
+    assert run_until(series, CycleDetected("x", max_period=3, repeats=2)) == 7
+
+    fixed_point = [1, 2, 3, 3.05, 3.04, 3.06]
+    assert run_until(fixed_point, CycleDetected("x", max_period=1, atol=0.1)) == 5
+
+    with pytest.raises(ValueError):
+        CycleDetected("x", max_period=0)
+
+
+def test_termination_multiple():
+    """Test combining criteria and watching multiple variables."""
+    series = [1, 2, 3, 3, 3, 3, 3]
+    # steps keeps changing, so watching it as well never stops the model early
+    assert run_until(series, SteadyState(["x", "steps"], 2, 1e-9)) == 7
+    assert (
+        run_until(
+            series,
+            [SteadyState("steps", 2, 1e-9), CycleDetected("x", 1, repeats=2)],
+        )
+        == 4
+    )
+
+    model = SeriesModel(series)
+    assert not should_terminate(model, [])
+    assert "window=2" in repr(SteadyState("x", 2, 0.1))
+
+    with pytest.raises(AttributeError):
+        SteadyState("x", 2, 0.1)(Model(seed=42))
+    with pytest.raises(TypeError):
+        TerminationCriterion("x")
+
+
+def test_termination_with_sink(tmp_path):
+    """Test that a window longer than the flush interval of a sink can be met."""
+    model = SeriesModel([1.0] * 200)
+    model.datacollector = DataCollector(
+        {"x": lambda m: m.series[m.steps - 1]},
+        sink=CSVSink(tmp_path, flush_every=10),
+    )
+    model.run_model(termination=SteadyState("x", window=20, threshold=1e-9))
+    assert model.steps == 20
+    assert len(model.datacollector.model_vars["x"]) == 20
+    assert len(model.datacollector.get_model_vars_dataframe()) == 20